@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import asyncio
+from contextlib import suppress
 from dataclasses import dataclass, field
 from enum import Enum
+import heapq
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import uuid
 
 from ...domain.eval_runner import run_eval
@@ -13,6 +15,7 @@ from ...domain.judge import judge_scores
 from ...domain.mutations import mutate_prompt
 from ...domain.objectives import get_objectives
 from ...domain.optimize_engine import pareto_filter, pareto_v2, tournament_rank
+from ...domain.ranking import bt_rank
 from ...domain.recombination import recombine
 from ...domain.retrieval import retrieve
 from ...settings import get_settings
@@ -52,6 +55,17 @@ class JobRegistry:
         self.store = store
         self.jobs: Dict[str, Job] = {}
         self._shutdown = False
+        settings = get_settings()
+        self._ttls: Dict[JobStatus, float] = {
+            JobStatus.FINISHED: settings.JOB_TTL_FINISHED_S,
+            JobStatus.FAILED: settings.JOB_TTL_FAILED_S,
+            JobStatus.CANCELLED: settings.JOB_TTL_CANCELLED_S,
+        }
+        # Min-heap of (deadline, job_id); entries are re-validated when popped.
+        self._expiry: List[Tuple[float, str]] = []
+        self._reaper_wake = asyncio.Event()
+        # Identifies this process as the owner of the checkpoints it writes.
+        self.owner_id = uuid.uuid4().hex
 
     async def create_job(
         self,
@@ -139,6 +153,7 @@ class JobRegistry:
             job.terminal_emitted = True
             job.updated_at = fail_env["ts"]
             await self.store.save_job(job)
+            self._schedule_expiry(job)
             return
         await self.store.save_event(job.id, envelope["id"], envelope)
         if event in SSE_TERMINALS:
@@ -151,11 +166,52 @@ class JobRegistry:
                 inc("jobs_cancelled")
         job.updated_at = now
         await self.store.save_job(job)
+        if event in SSE_TERMINALS:
+            self._schedule_expiry(job)
+
+    async def _checkpoint(
+        self,
+        job: Job,
+        iterations: int,
+        payload: Dict[str, Any],
+        state: Dict[str, Any] | None,
+    ) -> None:
+        await self.store.save_checkpoint(
+            job.id,
+            self.owner_id,
+            {
+                "iterations": iterations,
+                "payload": payload,
+                "next_event_id": job.next_event_id,
+                "state": state,
+            },
+        )
+
+    async def _lease_heartbeat(self, job: Job) -> None:
+        """Renew ``job``'s checkpoint lease while it runs.
+
+        Checkpoints are only saved every ``GEPA_CHECKPOINT_EVERY_GENS``
+        generations; without this a slow generation would outlive the lease
+        and another worker starting up would resume the job a second time.
+        """
+        interval = max(0.05, get_settings().GEPA_CHECKPOINT_LEASE_S / 3)
+        while True:
+            await asyncio.sleep(interval)
+            with suppress(Exception):
+                await self.store.touch_checkpoint(job.id, self.owner_id)
 
     async def _run_job(
-        self, job: Job, iterations: int, payload: Dict[str, Any]
+        self,
+        job: Job,
+        iterations: int,
+        payload: Dict[str, Any],
+        resume: Dict[str, Any] | None = None,
     ) -> None:
         settings = get_settings()
+        checkpointed = (
+            payload.get("mode") == "gepa" and settings.GEPA_CHECKPOINT_ENABLED
+        )
+        heartbeat: asyncio.Task | None = None
         try:
             if payload.get("__eval__"):
 
@@ -186,13 +242,33 @@ class JobRegistry:
                 return
 
             job.status = JobStatus.RUNNING
-            await self._emit(job, "started", {})
+            if resume is None:
+                await self._emit(job, "started", {})
+            else:
+                state = resume.get("state") or {}
+                await self._emit(job, "resumed", {"gen": state.get("gen", 0)})
             job_start = time.perf_counter()
             if job.status == JobStatus.FAILED:
                 return
             mode = payload.get("mode", "default")
             if mode == "gepa":
-                result = await gepa_loop(job, self._emit, payload)
+                save = None
+                if checkpointed:
+                    if resume is None:
+                        # Record the payload up front so even generation 0 resumes.
+                        await self._checkpoint(job, iterations, payload, None)
+                    heartbeat = asyncio.create_task(self._lease_heartbeat(job))
+
+                    async def save(state: Dict[str, Any]) -> None:
+                        await self._checkpoint(job, iterations, payload, state)
+
+                result = await gepa_loop(
+                    job,
+                    self._emit,
+                    payload,
+                    resume=(resume or {}).get("state"),
+                    checkpoint=save,
+                )
                 job.result = result
                 job.status = JobStatus.FINISHED
                 total_ms = (time.perf_counter() - job_start) * 1000.0
@@ -265,10 +341,22 @@ class JobRegistry:
                         n=settings.PARETO_TOPN,
                         rubric=rubric,
                     )
+                elif settings.RANKING_STRATEGY == "bradley_terry":
+                    ranked = (
+                        await bt_rank(
+                            front,
+                            task,
+                            top_k=settings.PARETO_TOPN,
+                            store=self.store,
+                            stable_rounds=settings.RANKING_STABLE_ROUNDS,
+                        )
+                    ).order
                 else:
                     m = min(tournament_size * 2, len(front))
                     if m > 1:
-                        ranked = await tournament_rank(front[:m], task, tournament_size)
+                        ranked = await tournament_rank(
+                            front[:m], task, tournament_size, self.store
+                        )
                     else:
                         ranked = front
                 chosen = ranked[0] if ranked else base
@@ -327,6 +415,9 @@ class JobRegistry:
             observe("job_total_ms", total_ms)
             await self._emit(job, "finished", job.result)
         except asyncio.CancelledError:
+            if checkpointed and self._shutdown:
+                # Leave the job running in the store; the next worker resumes it.
+                return
             if not job.terminal_emitted:
                 job.status = JobStatus.CANCELLED
                 await self._emit(job, "cancelled", {})
@@ -335,26 +426,131 @@ class JobRegistry:
             await self._emit(job, "failed", {"error": str(exc)})
         finally:
             job.task = None
+            if heartbeat is not None:
+                heartbeat.cancel()
+            if checkpointed and job.terminal_emitted:
+                with suppress(Exception):
+                    await self.store.delete_checkpoint(job.id)
+
+    async def resume_interrupted(self) -> int:
+        """Restart GEPA jobs whose checkpoints were released or orphaned.
+
+        Event ids continue after the highest persisted id so SSE clients
+        reconnecting with ``Last-Event-ID`` see one uninterrupted stream.
+        """
+        settings = get_settings()
+        if not settings.GEPA_CHECKPOINT_ENABLED:
+            return 0
+        claimed = await self.store.claim_checkpoints(
+            self.owner_id, time.time() - settings.GEPA_CHECKPOINT_LEASE_S
+        )
+        resumed = 0
+        for job_id, ckpt in claimed:
+            record = await self.store.get_job(job_id)
+            if record is None or record["status"] not in (
+                JobStatus.PENDING.value,
+                JobStatus.RUNNING.value,
+            ):
+                await self.store.delete_checkpoint(job_id)
+                continue
+            persisted = await self.store.events_since(job_id, 0)
+            last_id = persisted[-1]["id"] if persisted else 0
+            job = Job(id=job_id)
+            job.created_at = record["created_at"]
+            job.next_event_id = max(int(ckpt.get("next_event_id", 1)), last_id + 1)
+            self.jobs[job_id] = job
+            job.task = asyncio.create_task(
+                self._run_job(
+                    job, int(ckpt.get("iterations", 1)), ckpt["payload"], resume=ckpt
+                )
+            )
+            resumed += 1
+        if resumed:
+            inc("jobs_resumed", resumed)
+        return resumed
+
+    async def release_checkpoints(self, timeout: float = 1.0) -> None:
+        """Let cancelled jobs unwind, then hand their checkpoints to the next worker."""
+        tasks = [j.task for j in self.jobs.values() if j.task and not j.task.done()]
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+        with suppress(Exception):
+            await self.store.release_checkpoints(self.owner_id)
+
+    def _schedule_expiry(self, job: Job) -> None:
+        ttl = self._ttls.get(job.status)
+        if ttl is None:
+            return
+        deadline = job.updated_at + ttl
+        heapq.heappush(self._expiry, (deadline, job.id))
+        if self._expiry[0] == (deadline, job.id):
+            self._reaper_wake.set()
+
+    def _reap_due(self, now: float) -> int:
+        reclaimed = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            _, job_id = heapq.heappop(self._expiry)
+            job = self.jobs.get(job_id)
+            if job is None:
+                continue
+            ttl = self._ttls.get(job.status)
+            if ttl is None:
+                continue
+            deadline = job.updated_at + ttl
+            if deadline > now:
+                # Touched after it was scheduled (e.g. a late "shutdown" event).
+                heapq.heappush(self._expiry, (deadline, job_id))
+                continue
+            self.jobs.pop(job_id, None)
+            reclaimed += 1
+        return reclaimed
+
+    async def _purge_store(self, now: float) -> None:
+        settings = get_settings()
+        start = time.perf_counter()
+        try:
+            purged = await self.store.purge_expired(
+                now,
+                job_ttls={status.value: ttl for status, ttl in self._ttls.items()},
+                idempotency_ttl=settings.IDEMPOTENCY_TTL_S,
+                judge_cache_ttl=settings.JUDGE_CACHE_TTL_S,
+                batch_size=settings.REAPER_BATCH_SIZE,
+                judge_cache_max=settings.JUDGE_CACHE_MAX_ROWS,
+            )
+        except Exception:
+            return
+        observe("reaper_purge_ms", (time.perf_counter() - start) * 1000.0)
+        for table, n in purged.items():
+            if n:
+                inc(f"reaper_{table}_purged", n)
 
     async def reaper_loop(self) -> None:
+        """Expire finished jobs exactly at their deadline and purge store rows.
+
+        In-memory jobs are tracked in a deadline heap, so the loop sleeps until
+        the next expiry (or until an earlier one is scheduled). Persisted events,
+        idempotency keys and judge cache rows are purged in batches every
+        ``JOB_REAPER_INTERVAL_S``.
+        """
         settings = get_settings()
+        loop = asyncio.get_event_loop()
+        next_purge = loop.time()
         while not self._shutdown:
-            now = asyncio.get_event_loop().time()
-            to_delete: List[str] = []
-            for job_id, job in list(self.jobs.items()):
-                if job.status == JobStatus.RUNNING:
-                    continue
-                ttl_map = {
-                    JobStatus.FINISHED: settings.JOB_TTL_FINISHED_S,
-                    JobStatus.FAILED: settings.JOB_TTL_FAILED_S,
-                    JobStatus.CANCELLED: settings.JOB_TTL_CANCELLED_S,
-                }
-                ttl = ttl_map.get(job.status)
-                if ttl is not None and now - job.updated_at > ttl:
-                    to_delete.append(job_id)
-            for job_id in to_delete:
-                self.jobs.pop(job_id, None)
-            await asyncio.sleep(settings.JOB_REAPER_INTERVAL_S)
+            self._reaper_wake.clear()
+            now = loop.time()
+            reclaimed = self._reap_due(now)
+            if reclaimed:
+                inc("reaper_jobs_reclaimed", reclaimed)
+            if now >= next_purge:
+                await self._purge_store(now)
+                next_purge = now + settings.JOB_REAPER_INTERVAL_S
+            timeout = next_purge - now
+            if self._expiry:
+                timeout = min(timeout, self._expiry[0][0] - now)
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    self._reaper_wake.wait(), timeout=max(0.0, timeout)
+                )
         for job in self.jobs.values():
             await self._emit(job, "shutdown", {})
 
@@ -1,20 +1,130 @@
 from __future__ import annotations
 
-from collections import deque
+from bisect import bisect_left
+from collections import OrderedDict, deque
+import hashlib
+from itertools import islice
 import json
-from typing import TYPE_CHECKING, Dict, List, Optional, Protocol, Tuple
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+)
+import zlib
 
 try:  # pragma: no cover - aiosqlite optional
     import aiosqlite  # type: ignore
 except Exception:  # pragma: no cover - fallback when missing
     aiosqlite = None  # type: ignore
 
+from ...domain.dedup import LSHIndex, new_lsh_index
+from ...domain.judge_prompts import PAIRWISE_TEMPLATE_VERSION
+from ...domain.retrieval import BM25Index, fts_query
+from ...domain.vectors import VectorIndex, new_vector_index
 from ...settings import get_settings
+from ..metrics import inc
 
 if TYPE_CHECKING:  # pragma: no cover - for type checking only
     from .registry import Job
 
 
+# Persisted judge verdicts only refresh their LRU stamp this often.
+_JUDGE_TOUCH_S = 60.0
+
+# ``seq`` is the explicit rowid alias that the FTS mirror and page cursors key
+# on: an implicit rowid may be renumbered by VACUUM, an aliased one may not.
+# AUTOINCREMENT stops SQLite reusing the seq of deleted tail rows, which
+# would put new rows behind cursors already handed out.
+_EXAMPLES_TABLE = """
+    CREATE TABLE IF NOT EXISTS examples (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        id TEXT NOT NULL UNIQUE,
+        input TEXT,
+        expected TEXT,
+        meta TEXT
+    )
+"""
+
+
+def judge_cache_key(
+    task: str, a: str, b: str, model: str, template: str
+) -> Tuple[bytes, bytes]:
+    """Return ``(key, verify)``: two independent 16-byte halves of one SHA-256.
+
+    ``key`` indexes the cache; ``verify`` is stored alongside and compared on
+    lookup so a key collision reads as a miss instead of a wrong verdict.
+    """
+    h = hashlib.sha256()
+    for part in (template, model, task, a, b):
+        data = part.encode("utf-8")
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    digest = h.digest()
+    return digest[:16], digest[16:]
+
+
+def _judge_key(
+    task: str, a: str, b: str, model: Optional[str], template: Optional[str]
+) -> Tuple[bytes, bytes]:
+    return judge_cache_key(
+        task,
+        a,
+        b,
+        get_settings().JUDGE_MODEL_ID if model is None else model,
+        PAIRWISE_TEMPLATE_VERSION if template is None else template,
+    )
+
+
+def _cursor_after(cursor: Optional[str]) -> int:
+    """Position a page cursor points past; ``ValueError`` if malformed."""
+    if cursor is None:
+        return 0
+    after = int(cursor)
+    if after < 0:
+        raise ValueError("negative cursor")
+    return after
+
+
+def _example_row(row: Sequence[Any]) -> dict:
+    return {
+        "id": row[0],
+        "input": row[1],
+        "expected": row[2],
+        "meta": json.loads(row[3]) if row[3] else {},
+    }
+
+
+async def _example_chunks(store: "JobStore", size: int) -> AsyncIterator[List[dict]]:
+    cursor: Optional[str] = None
+    while True:
+        docs, cursor = await store.page_examples(size, cursor)
+        if docs:
+            yield docs
+        if cursor is None:
+            return
+
+
+async def _iter_examples(
+    store: "JobStore", limit: Optional[int], batch_size: int
+) -> AsyncIterator[dict]:
+    left = limit
+    size = batch_size if limit is None else max(1, min(batch_size, limit))
+    async for chunk in store.example_chunks(size):
+        for doc in chunk:
+            if left is not None:
+                if left <= 0:
+                    return
+                left -= 1
+            yield doc
+
+
 class JobStore(Protocol):
     async def save_job(self, job: Job) -> None: ...
 
@@ -28,6 +138,8 @@ class JobStore(Protocol):
 
     async def events_since(self, job_id: str, event_id: int) -> List[dict]: ...
 
+    async def data_version(self) -> int: ...
+
     async def save_idempotency(self, key: str, job_id: str, ts: float) -> None: ...
 
     async def get_idempotent(
@@ -38,14 +150,75 @@ class JobStore(Protocol):
 
     async def list_examples(self, limit: int = 100, offset: int = 0) -> List[dict]: ...
 
+    async def page_examples(
+        self, limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]: ...
+
+    def iter_examples(
+        self, limit: Optional[int] = None, batch_size: int = 1000
+    ) -> AsyncIterator[dict]: ...
+
+    async def count_examples(self) -> int: ...
+
     async def delete_example(self, ex_id: str) -> None: ...
 
-    async def get_judge_cached(self, task: str, a: str, b: str) -> Optional[dict]: ...
+    async def delete_examples(self, ids: List[str]) -> None: ...
+
+    def example_chunks(self, size: int = 5000) -> AsyncIterator[List[dict]]: ...
+
+    async def example_index(self) -> BM25Index: ...
+
+    async def search_examples(self, query: str, k: int) -> List[dict]: ...
+
+    async def vector_index(self) -> VectorIndex: ...
+
+    async def near_dup_index(self) -> LSHIndex: ...
+
+    async def get_judge_cached(
+        self,
+        task: str,
+        a: str,
+        b: str,
+        *,
+        model: Optional[str] = None,
+        template: Optional[str] = None,
+    ) -> Optional[dict]: ...
 
     async def set_judge_cached(
-        self, task: str, a: str, b: str, winner: str, confidence: float
+        self,
+        task: str,
+        a: str,
+        b: str,
+        winner: str,
+        confidence: float,
+        *,
+        model: Optional[str] = None,
+        template: Optional[str] = None,
     ) -> None: ...
 
+    async def purge_expired(
+        self,
+        now: float,
+        *,
+        job_ttls: Dict[str, float],
+        idempotency_ttl: float,
+        judge_cache_ttl: float,
+        batch_size: int = 500,
+        judge_cache_max: Optional[int] = None,
+    ) -> Dict[str, int]: ...
+
+    async def save_checkpoint(self, job_id: str, owner: str, state: dict) -> None: ...
+
+    async def claim_checkpoints(
+        self, owner: str, stale_before: float
+    ) -> List[Tuple[str, dict]]: ...
+
+    async def touch_checkpoint(self, job_id: str, owner: str) -> None: ...
+
+    async def release_checkpoints(self, owner: str) -> None: ...
+
+    async def delete_checkpoint(self, job_id: str) -> None: ...
+
     async def close(self) -> None: ...
 
 
@@ -56,8 +229,23 @@ class MemoryJobStore:
         self.events: Dict[str, deque] = {}
         self.idempotency: Dict[str, Tuple[str, float]] = {}
         self.examples: Dict[str, dict] = {}
-        self.judge_cache: Dict[Tuple[str, str, str], dict] = {}
+        # Keyset pagination: id -> insertion sequence and the live (seq, id)
+        # pairs in order. Re-upserting an id keeps its place, as in the SQLite seq column.
+        self._example_seq: Dict[str, int] = {}
+        self._example_order: List[Tuple[int, str]] = []
+        self._example_next = 0
+        self._example_index = BM25Index()
+        self._vector_index: Optional[VectorIndex] = None
+        self._near_dup_index: Optional[LSHIndex] = None
+        # key -> (verify, verdict, created_at), least recently used first
+        self.judge_cache: "OrderedDict[bytes, Tuple[bytes, dict, float]]" = (
+            OrderedDict()
+        )
+        self.judge_cache_max = settings.JUDGE_CACHE_MAX_ROWS
+        # job_id -> (owner, saved_at, state)
+        self.checkpoints: Dict[str, Tuple[Optional[str], float, dict]] = {}
         self.buffer_size = settings.SSE_BUFFER_SIZE
+        self._version = 0
 
     async def save_job(self, job: Job) -> None:
         self.jobs[job.id] = {
@@ -80,15 +268,20 @@ class MemoryJobStore:
     async def delete_job(self, job_id: str) -> None:
         self.jobs.pop(job_id, None)
         self.events.pop(job_id, None)
+        self.checkpoints.pop(job_id, None)
 
     async def save_event(self, job_id: str, event_id: int, envelope: dict) -> None:
         buf = self.events.setdefault(job_id, deque(maxlen=self.buffer_size))
         buf.append(envelope)
+        self._version += 1
 
     async def events_since(self, job_id: str, event_id: int) -> List[dict]:
         buf = self.events.get(job_id, deque())
         return [env for env in list(buf) if env.get("id", 0) > event_id]
 
+    async def data_version(self) -> int:
+        return self._version
+
     async def save_idempotency(self, key: str, job_id: str, ts: float) -> None:
         self.idempotency[key] = (job_id, ts)
 
@@ -100,33 +293,196 @@ class MemoryJobStore:
 
     async def upsert_examples(self, items: List[dict]) -> int:
         for item in items:
+            if item["id"] not in self._example_seq:
+                self._example_next += 1
+                self._example_seq[item["id"]] = self._example_next
+                self._example_order.append((self._example_next, item["id"]))
             self.examples[item["id"]] = item
+            self._example_index.add(item)
+        if self._vector_index is not None:
+            self._vector_index.add_many(items)
+        if self._near_dup_index is not None:
+            self._near_dup_index.add_many(items)
         return len(items)
 
     async def list_examples(self, limit: int = 100, offset: int = 0) -> List[dict]:
-        vals = list(self.examples.values())
-        return vals[offset : offset + limit]
+        offset = max(0, offset)
+        return list(islice(self.examples.values(), offset, offset + max(0, limit)))
+
+    async def page_examples(
+        self, limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        start = bisect_left(self._example_order, (_cursor_after(cursor) + 1, ""))
+        page = self._example_order[start : start + max(0, limit)]
+        docs = [self.examples[ex_id] for _, ex_id in page]
+        more = bool(page) and start + len(page) < len(self._example_order)
+        return docs, str(page[-1][0]) if more else None
+
+    def iter_examples(
+        self, limit: Optional[int] = None, batch_size: int = 1000
+    ) -> AsyncIterator[dict]:
+        return _iter_examples(self, limit, batch_size)
+
+    async def count_examples(self) -> int:
+        return len(self.examples)
 
     async def delete_example(self, ex_id: str) -> None:
         self.examples.pop(ex_id, None)
+        seq = self._example_seq.pop(ex_id, None)
+        if seq is not None:
+            del self._example_order[bisect_left(self._example_order, (seq, ex_id))]
+        self._example_index.remove(ex_id)
+        if self._vector_index is not None:
+            self._vector_index.remove(ex_id)
+        if self._near_dup_index is not None:
+            self._near_dup_index.remove(ex_id)
+
+    async def delete_examples(self, ids: List[str]) -> None:
+        for ex_id in ids:
+            await self.delete_example(ex_id)
+
+    def example_chunks(self, size: int = 5000) -> AsyncIterator[List[dict]]:
+        return _example_chunks(self, size)
+
+    async def example_index(self) -> BM25Index:
+        return self._example_index
+
+    async def search_examples(self, query: str, k: int) -> List[dict]:
+        return [doc for _, doc in self._example_index.search(query, k)]
 
-    async def get_judge_cached(self, task: str, a: str, b: str) -> Optional[dict]:
-        return self.judge_cache.get((task, a, b))
+    async def vector_index(self) -> VectorIndex:
+        if self._vector_index is None:
+            index = new_vector_index()
+            index.add_many(self.examples.values())
+            self._vector_index = index
+        return self._vector_index
+
+    async def near_dup_index(self) -> LSHIndex:
+        if self._near_dup_index is None:
+            index = new_lsh_index()
+            index.add_many(self.examples.values())
+            self._near_dup_index = index
+        return self._near_dup_index
+
+    async def get_judge_cached(
+        self,
+        task: str,
+        a: str,
+        b: str,
+        *,
+        model: Optional[str] = None,
+        template: Optional[str] = None,
+    ) -> Optional[dict]:
+        key, verify = _judge_key(task, a, b, model, template)
+        entry = self.judge_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] != verify:
+            inc("judge_cache_collisions")
+            return None
+        self.judge_cache.move_to_end(key)
+        return dict(entry[1])
 
     async def set_judge_cached(
-        self, task: str, a: str, b: str, winner: str, confidence: float
+        self,
+        task: str,
+        a: str,
+        b: str,
+        winner: str,
+        confidence: float,
+        *,
+        model: Optional[str] = None,
+        template: Optional[str] = None,
     ) -> None:
-        self.judge_cache[(task, a, b)] = {"winner": winner, "confidence": confidence}
+        key, verify = _judge_key(task, a, b, model, template)
+        verdict = {"winner": winner, "confidence": confidence}
+        self.judge_cache[key] = (verify, verdict, time.time())
+        self.judge_cache.move_to_end(key)
+        while len(self.judge_cache) > max(1, self.judge_cache_max):
+            self.judge_cache.popitem(last=False)
+
+    async def purge_expired(
+        self,
+        now: float,
+        *,
+        job_ttls: Dict[str, float],
+        idempotency_ttl: float,
+        judge_cache_ttl: float,
+        batch_size: int = 500,
+        judge_cache_max: Optional[int] = None,
+    ) -> Dict[str, int]:
+        events = 0
+        for job_id, rec in self.jobs.items():
+            ttl = job_ttls.get(rec["status"])
+            if ttl is None or now - rec["updated_at"] <= ttl:
+                continue
+            buf = self.events.pop(job_id, None)
+            events += len(buf) if buf else 0
+        stale_keys = [
+            k for k, (_, ts) in self.idempotency.items() if now - ts >= idempotency_ttl
+        ]
+        for k in stale_keys:
+            del self.idempotency[k]
+        cutoff = time.time() - judge_cache_ttl
+        stale_judge = [k for k, e in self.judge_cache.items() if e[2] < cutoff]
+        for jk in stale_judge:
+            del self.judge_cache[jk]
+        judge = len(stale_judge)
+        if judge_cache_max is not None:
+            while len(self.judge_cache) > max(0, judge_cache_max):
+                self.judge_cache.popitem(last=False)
+                judge += 1
+        return {
+            "events": events,
+            "idempotency": len(stale_keys),
+            "judge_cache": judge,
+        }
+
+    async def save_checkpoint(self, job_id: str, owner: str, state: dict) -> None:
+        self.checkpoints[job_id] = (owner, time.time(), state)
+
+    async def claim_checkpoints(
+        self, owner: str, stale_before: float
+    ) -> List[Tuple[str, dict]]:
+        claimed: List[Tuple[str, dict]] = []
+        for job_id, (cur, saved_at, state) in list(self.checkpoints.items()):
+            if cur is not None and saved_at >= stale_before:
+                continue
+            self.checkpoints[job_id] = (owner, time.time(), state)
+            claimed.append((job_id, state))
+        return claimed
+
+    async def touch_checkpoint(self, job_id: str, owner: str) -> None:
+        entry = self.checkpoints.get(job_id)
+        if entry is not None and entry[0] == owner:
+            self.checkpoints[job_id] = (owner, time.time(), entry[2])
+
+    async def release_checkpoints(self, owner: str) -> None:
+        for job_id, (cur, saved_at, state) in list(self.checkpoints.items()):
+            if cur == owner:
+                self.checkpoints[job_id] = (None, saved_at, state)
+
+    async def delete_checkpoint(self, job_id: str) -> None:
+        self.checkpoints.pop(job_id, None)
 
     async def close(self) -> None:
         return None
 
 
 class SQLiteJobStore:
-    def __init__(self, db: "aiosqlite.Connection") -> None:
+    def __init__(self, db: "aiosqlite.Connection", fts: bool = False) -> None:
         settings = get_settings()
         self.db = db
+        # examples_fts mirrors examples when this SQLite build has FTS5.
+        self.fts = fts
         self.buffer_size = settings.SSE_BUFFER_SIZE
+        # PRAGMA data_version only moves on commits from *other* connections,
+        # so local event writes are counted separately.
+        self._local_version = 0
+        # Built on first retrieval, then maintained by upsert/delete.
+        self._example_index: Optional[BM25Index] = None
+        self._vector_index: Optional[VectorIndex] = None
+        self._near_dup_index: Optional[LSHIndex] = None
 
     @classmethod
     async def create(cls, path: str) -> "SQLiteJobStore":
@@ -168,30 +524,119 @@ class SQLiteJobStore:
             )
             """
         )
+        async with db.execute(
+            "SELECT sql FROM sqlite_master WHERE type='table' AND name='examples'"
+        ) as cur:
+            row = await cur.fetchone()
+        if row and "AUTOINCREMENT" not in row[0].upper():
+            # Older releases keyed examples on the implicit rowid, or on a seq
+            # that could be reused. Copy them into the current table, keeping
+            # their order, and rebuild the mirror.
+            await db.execute("BEGIN")
+            for sql in (
+                "DROP TRIGGER IF EXISTS examples_fts_ai",
+                "DROP TRIGGER IF EXISTS examples_fts_ad",
+                "DROP TRIGGER IF EXISTS examples_fts_au",
+                "DROP TABLE IF EXISTS examples_fts",
+                "ALTER TABLE examples RENAME TO examples_legacy",
+                _EXAMPLES_TABLE,
+                "INSERT INTO examples(seq, id, input, expected, meta)"
+                " SELECT rowid, id, input, expected, meta FROM examples_legacy",
+                "DROP TABLE examples_legacy",
+            ):
+                await db.execute(sql)
+            await db.commit()
+        await db.execute(_EXAMPLES_TABLE)
+        fts = await cls._ensure_examples_fts(db)
+        async with db.execute("PRAGMA table_info(judge_cache)") as cur:
+            legacy_judge_cols = {row[1] for row in await cur.fetchall()}
+        if legacy_judge_cols and "key" in legacy_judge_cols:
+            legacy_judge_cols = set()
+        if legacy_judge_cols:
+            # Older releases keyed verdicts by full text, under an older prompt
+            # template and relative to the caller's A/B order. They cannot be
+            # re-keyed faithfully, so they are dropped and re-judged on demand.
+            await db.execute("DROP TABLE judge_cache")
         await db.execute(
             """
-            CREATE TABLE IF NOT EXISTS examples (
-                id TEXT PRIMARY KEY,
-                input TEXT,
-                expected TEXT,
-                meta TEXT
+            CREATE TABLE IF NOT EXISTS judge_cache (
+                key BLOB PRIMARY KEY,
+                verify BLOB,
+                winner TEXT,
+                confidence REAL,
+                created_at REAL,
+                last_used REAL
             )
             """
         )
         await db.execute(
             """
-            CREATE TABLE IF NOT EXISTS judge_cache (
-                task TEXT,
-                a TEXT,
-                b TEXT,
-                winner TEXT,
-                confidence REAL,
-                PRIMARY KEY(task, a, b)
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                job_id TEXT PRIMARY KEY,
+                owner TEXT,
+                saved_at REAL,
+                state BLOB
             )
             """
         )
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_status_updated ON jobs(status, updated_at)"
+        )
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_idempotency_created ON idempotency(created_at)"
+        )
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_judge_cache_created ON judge_cache(created_at)"
+        )
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_judge_cache_last_used ON judge_cache(last_used)"
+        )
         await db.commit()
-        return cls(db)
+        return cls(db, fts=fts)
+
+    @staticmethod
+    async def _ensure_examples_fts(db) -> bool:
+        """Create the FTS5 mirror of ``examples`` and its sync triggers.
+
+        External-content table: only the index is stored, rows are read from
+        ``examples``. Returns False when SQLite was built without FTS5.
+        """
+        async with db.execute(
+            "SELECT 1 FROM sqlite_master WHERE name='examples_fts'"
+        ) as cur:
+            existed = await cur.fetchone() is not None
+        try:
+            await db.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS examples_fts USING fts5(
+                    input, expected, content='examples', content_rowid='seq'
+                )
+                """
+            )
+        except Exception:  # pragma: no cover - SQLite without FTS5
+            return False
+        await db.executescript(
+            """
+            CREATE TRIGGER IF NOT EXISTS examples_fts_ai AFTER INSERT ON examples BEGIN
+                INSERT INTO examples_fts(rowid, input, expected)
+                VALUES (new.seq, new.input, new.expected);
+            END;
+            CREATE TRIGGER IF NOT EXISTS examples_fts_ad AFTER DELETE ON examples BEGIN
+                INSERT INTO examples_fts(examples_fts, rowid, input, expected)
+                VALUES ('delete', old.seq, old.input, old.expected);
+            END;
+            CREATE TRIGGER IF NOT EXISTS examples_fts_au AFTER UPDATE ON examples BEGIN
+                INSERT INTO examples_fts(examples_fts, rowid, input, expected)
+                VALUES ('delete', old.seq, old.input, old.expected);
+                INSERT INTO examples_fts(rowid, input, expected)
+                VALUES (new.seq, new.input, new.expected);
+            END;
+            """
+        )
+        if not existed:
+            # Index rows written before the mirror existed.
+            await db.execute("INSERT INTO examples_fts(examples_fts) VALUES('rebuild')")
+        return True
 
     async def save_job(self, job: Job) -> None:
         await self.db.execute(
@@ -256,6 +701,7 @@ class SQLiteJobStore:
     async def delete_job(self, job_id: str) -> None:
         await self.db.execute("DELETE FROM jobs WHERE id=?", (job_id,))
         await self.db.execute("DELETE FROM events WHERE job_id=?", (job_id,))
+        await self.db.execute("DELETE FROM checkpoints WHERE job_id=?", (job_id,))
         await self.db.commit()
 
     async def save_event(self, job_id: str, event_id: int, envelope: dict) -> None:
@@ -269,6 +715,7 @@ class SQLiteJobStore:
                 "DELETE FROM events WHERE job_id=? AND id<=?", (job_id, cutoff)
             )
         await self.db.commit()
+        self._local_version += 1
 
     async def events_since(self, job_id: str, event_id: int) -> List[dict]:
         async with self.db.execute(
@@ -278,6 +725,12 @@ class SQLiteJobStore:
             rows = await cur.fetchall()
         return [json.loads(row[0]) for row in rows]
 
+    async def data_version(self) -> int:
+        async with self.db.execute("PRAGMA data_version") as cur:
+            row = await cur.fetchone()
+        external = int(row[0]) if row else 0
+        return (external << 32) | (self._local_version & 0xFFFFFFFF)
+
     async def save_idempotency(self, key: str, job_id: str, ts: float) -> None:
         await self.db.execute(
             "INSERT OR REPLACE INTO idempotency(key, job_id, created_at) VALUES(?,?,?)",
@@ -295,59 +748,317 @@ class SQLiteJobStore:
         return None
 
     async def upsert_examples(self, items: List[dict]) -> int:
-        for it in items:
-            await self.db.execute(
-                "INSERT OR REPLACE INTO examples(id, input, expected, meta) VALUES(?,?,?,?)",
+        """Write ``items`` with one ``executemany`` in a single transaction."""
+        # An upsert rather than INSERT OR REPLACE: REPLACE deletes without
+        # firing the delete trigger, which would leave stale FTS entries.
+        await self.db.executemany(
+            "INSERT INTO examples(id, input, expected, meta) VALUES(?,?,?,?)"
+            " ON CONFLICT(id) DO UPDATE SET input=excluded.input,"
+            " expected=excluded.expected, meta=excluded.meta",
+            [
                 (
                     it["id"],
                     it.get("input"),
                     it.get("expected"),
                     json.dumps(it.get("meta", {}), separators=(",", ":")),
-                ),
-            )
+                )
+                for it in items
+            ],
+        )
         await self.db.commit()
+        if self._example_index is not None:
+            self._example_index.add_many(items)
+        if self._vector_index is not None:
+            self._vector_index.add_many(items)
+        if self._near_dup_index is not None:
+            self._near_dup_index.add_many(items)
         return len(items)
 
     async def list_examples(self, limit: int = 100, offset: int = 0) -> List[dict]:
+        """Offset pagination; prefer ``page_examples``, whose cost is flat."""
         async with self.db.execute(
-            "SELECT id, input, expected, meta FROM examples LIMIT ? OFFSET ?",
+            "SELECT id, input, expected, meta FROM examples"
+            " ORDER BY seq LIMIT ? OFFSET ?",
             (limit, offset),
         ) as cur:
             rows = await cur.fetchall()
-        res: List[dict] = []
-        for row in rows:
-            res.append(
-                {
-                    "id": row[0],
-                    "input": row[1],
-                    "expected": row[2],
-                    "meta": json.loads(row[3]) if row[3] else {},
-                }
-            )
-        return res
+        return [_example_row(row) for row in rows]
+
+    async def page_examples(
+        self, limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Up to ``limit`` examples after ``cursor`` in ``seq`` order.
+
+        Returns the page and the cursor of the next one (``None`` at the
+        end). Seeks on ``seq``, so deep pages cost the same as the first and
+        cursors stay valid across VACUUM.
+        """
+        if limit <= 0:
+            return [], None
+        async with self.db.execute(
+            "SELECT seq, id, input, expected, meta FROM examples"
+            " WHERE seq > ? ORDER BY seq LIMIT ?",
+            (_cursor_after(cursor), limit + 1),
+        ) as cur:
+            rows = list(await cur.fetchall())
+        more = len(rows) > limit
+        rows = rows[:limit]
+        docs = [_example_row(row[1:]) for row in rows]
+        return docs, str(rows[-1][0]) if more else None
+
+    def iter_examples(
+        self, limit: Optional[int] = None, batch_size: int = 1000
+    ) -> AsyncIterator[dict]:
+        """Stream examples in ``seq`` order, ``batch_size`` rows per query."""
+        return _iter_examples(self, limit, batch_size)
+
+    async def count_examples(self) -> int:
+        async with self.db.execute("SELECT COUNT(*) FROM examples") as cur:
+            row = await cur.fetchone()
+        return int(row[0]) if row else 0
 
     async def delete_example(self, ex_id: str) -> None:
-        await self.db.execute("DELETE FROM examples WHERE id=?", (ex_id,))
+        await self.delete_examples([ex_id])
+
+    async def delete_examples(self, ids: List[str]) -> None:
+        await self.db.executemany(
+            "DELETE FROM examples WHERE id=?", [(ex_id,) for ex_id in ids]
+        )
         await self.db.commit()
+        for ex_id in ids:
+            if self._example_index is not None:
+                self._example_index.remove(ex_id)
+            if self._vector_index is not None:
+                self._vector_index.remove(ex_id)
+            if self._near_dup_index is not None:
+                self._near_dup_index.remove(ex_id)
+
+    def example_chunks(self, size: int = 5000) -> AsyncIterator[List[dict]]:
+        """Every example in ``seq`` order, ``size`` rows per query."""
+        return _example_chunks(self, size)
+
+    async def example_index(self) -> BM25Index:
+        """BM25 index over every example, loaded once in ``seq`` order.
+
+        Writes through this store keep it current; writes from other
+        processes sharing the file are not seen until restart.
+        """
+        if self._example_index is None:
+            index = BM25Index()
+            async for chunk in self.example_chunks():
+                index.add_many(chunk)
+            self._example_index = index
+        return self._example_index
+
+    async def vector_index(self) -> VectorIndex:
+        """Hashed-embedding index over every example, built once per process.
+
+        Like ``example_index`` it is a snapshot kept current by this store's
+        own writes only; rows written by other workers sharing the file are
+        not seen until restart.
+        """
+        if self._vector_index is None:
+            index = new_vector_index()
+            async for chunk in self.example_chunks():
+                index.add_many(chunk)
+            self._vector_index = index
+        return self._vector_index
+
+    async def near_dup_index(self) -> LSHIndex:
+        """MinHash/LSH index for ingest dedup; same lifecycle as BM25."""
+        if self._near_dup_index is None:
+            index = new_lsh_index()
+            async for chunk in self.example_chunks():
+                index.add_many(chunk)
+            self._near_dup_index = index
+        return self._near_dup_index
 
-    async def get_judge_cached(self, task: str, a: str, b: str) -> Optional[dict]:
+    async def search_examples(self, query: str, k: int) -> List[dict]:
+        """Top-``k`` examples for ``query`` by FTS5 bm25, best first."""
+        if not self.fts:
+            index = await self.example_index()
+            return [doc for _, doc in index.search(query, k)]
+        match = fts_query(query)
+        if not match or k <= 0:
+            return []
         async with self.db.execute(
-            "SELECT winner, confidence FROM judge_cache WHERE task=? AND a=? AND b=?",
-            (task, a, b),
+            "SELECT e.id, e.input, e.expected, e.meta FROM examples_fts"
+            " JOIN examples e ON e.seq = examples_fts.rowid"
+            " WHERE examples_fts MATCH ? ORDER BY bm25(examples_fts) LIMIT ?",
+            (match, k),
+        ) as cur:
+            rows = await cur.fetchall()
+        return [_example_row(row) for row in rows]
+
+    async def get_judge_cached(
+        self,
+        task: str,
+        a: str,
+        b: str,
+        *,
+        model: Optional[str] = None,
+        template: Optional[str] = None,
+    ) -> Optional[dict]:
+        key, verify = _judge_key(task, a, b, model, template)
+        async with self.db.execute(
+            "SELECT verify, winner, confidence, last_used FROM judge_cache WHERE key=?",
+            (key,),
         ) as cur:
             row = await cur.fetchone()
-        if row:
-            return {"winner": row[0], "confidence": float(row[1])}
-        return None
+        if not row:
+            return None
+        if row[0] != verify:
+            inc("judge_cache_collisions")
+            return None
+        now = time.time()
+        if (row[3] or 0.0) < now - _JUDGE_TOUCH_S:
+            await self.db.execute(
+                "UPDATE judge_cache SET last_used=? WHERE key=?", (now, key)
+            )
+            await self.db.commit()
+        return {"winner": row[1], "confidence": float(row[2])}
 
     async def set_judge_cached(
-        self, task: str, a: str, b: str, winner: str, confidence: float
+        self,
+        task: str,
+        a: str,
+        b: str,
+        winner: str,
+        confidence: float,
+        *,
+        model: Optional[str] = None,
+        template: Optional[str] = None,
     ) -> None:
+        key, verify = _judge_key(task, a, b, model, template)
+        now = time.time()
         await self.db.execute(
-            "INSERT OR REPLACE INTO judge_cache(task, a, b, winner, confidence) VALUES(?,?,?,?,?)",
-            (task, a, b, winner, confidence),
+            "INSERT OR REPLACE INTO judge_cache"
+            "(key, verify, winner, confidence, created_at, last_used) "
+            "VALUES(?,?,?,?,?,?)",
+            (key, verify, winner, confidence, now, now),
         )
         await self.db.commit()
 
+    async def _delete_batched(self, sql: str, params: tuple, batch_size: int) -> int:
+        """Run ``sql`` (which must end in ``LIMIT ?``) until it deletes < batch_size rows."""
+        total = 0
+        while True:
+            cur = await self.db.execute(sql, (*params, batch_size))
+            n = cur.rowcount or 0
+            await cur.close()
+            await self.db.commit()
+            total += n
+            if n < batch_size:
+                return total
+
+    async def purge_expired(
+        self,
+        now: float,
+        *,
+        job_ttls: Dict[str, float],
+        idempotency_ttl: float,
+        judge_cache_ttl: float,
+        batch_size: int = 500,
+        judge_cache_max: Optional[int] = None,
+    ) -> Dict[str, int]:
+        batch_size = max(1, batch_size)
+        events = 0
+        if job_ttls:
+            clause = " OR ".join("(j.status=? AND j.updated_at<?)" for _ in job_ttls)
+            params: tuple = tuple(
+                v for status, ttl in job_ttls.items() for v in (status, now - ttl)
+            )
+            events = await self._delete_batched(
+                "DELETE FROM events WHERE rowid IN ("
+                "SELECT e.rowid FROM events e JOIN jobs j ON j.id = e.job_id "
+                f"WHERE {clause} LIMIT ?)",  # nosec B608 - placeholders only
+                params,
+                batch_size,
+            )
+        idem = await self._delete_batched(
+            "DELETE FROM idempotency WHERE rowid IN ("
+            "SELECT rowid FROM idempotency WHERE created_at<=? LIMIT ?)",
+            (now - idempotency_ttl,),
+            batch_size,
+        )
+        judge = await self._delete_batched(
+            "DELETE FROM judge_cache WHERE rowid IN ("
+            "SELECT rowid FROM judge_cache WHERE created_at<? LIMIT ?)",
+            (time.time() - judge_cache_ttl,),
+            batch_size,
+        )
+        if judge_cache_max is not None:
+            async with self.db.execute("SELECT COUNT(*) FROM judge_cache") as cur:
+                excess = (await cur.fetchone())[0] - max(0, judge_cache_max)
+            while excess > 0:
+                cur = await self.db.execute(
+                    "DELETE FROM judge_cache WHERE rowid IN ("
+                    "SELECT rowid FROM judge_cache ORDER BY last_used LIMIT ?)",
+                    (min(batch_size, excess),),
+                )
+                n = cur.rowcount or 0
+                await cur.close()
+                await self.db.commit()
+                if n <= 0:
+                    break
+                judge += n
+                excess -= n
+        return {"events": events, "idempotency": idem, "judge_cache": judge}
+
+    async def save_checkpoint(self, job_id: str, owner: str, state: dict) -> None:
+        blob = zlib.compress(json.dumps(state, separators=(",", ":")).encode())
+        await self.db.execute(
+            "INSERT OR REPLACE INTO checkpoints(job_id, owner, saved_at, state) VALUES(?,?,?,?)",
+            (job_id, owner, time.time(), blob),
+        )
+        await self.db.commit()
+
+    async def claim_checkpoints(
+        self, owner: str, stale_before: float
+    ) -> List[Tuple[str, dict]]:
+        async with self.db.execute(
+            "SELECT job_id, owner, saved_at FROM checkpoints WHERE owner IS NULL OR saved_at<?",
+            (stale_before,),
+        ) as cur:
+            rows = await cur.fetchall()
+        claimed: List[Tuple[str, dict]] = []
+        for job_id, cur_owner, saved_at in rows:
+            # Compare-and-set so only one worker resumes a given job.
+            cur = await self.db.execute(
+                "UPDATE checkpoints SET owner=?, saved_at=? "
+                "WHERE job_id=? AND owner IS ? AND saved_at=?",
+                (owner, time.time(), job_id, cur_owner, saved_at),
+            )
+            won = cur.rowcount == 1
+            await cur.close()
+            await self.db.commit()
+            if not won:
+                continue
+            async with self.db.execute(
+                "SELECT state FROM checkpoints WHERE job_id=?", (job_id,)
+            ) as cur2:
+                row = await cur2.fetchone()
+            if row and row[0] is not None:
+                claimed.append((job_id, json.loads(zlib.decompress(row[0]))))
+        return claimed
+
+    async def touch_checkpoint(self, job_id: str, owner: str) -> None:
+        """Renew ``owner``'s lease on ``job_id`` without rewriting its state."""
+        await self.db.execute(
+            "UPDATE checkpoints SET saved_at=? WHERE job_id=? AND owner=?",
+            (time.time(), job_id, owner),
+        )
+        await self.db.commit()
+
+    async def release_checkpoints(self, owner: str) -> None:
+        await self.db.execute(
+            "UPDATE checkpoints SET owner=NULL WHERE owner=?", (owner,)
+        )
+        await self.db.commit()
+
+    async def delete_checkpoint(self, job_id: str) -> None:
+        await self.db.execute("DELETE FROM checkpoints WHERE job_id=?", (job_id,))
+        await self.db.commit()
+
     async def close(self) -> None:
         await self.db.close()
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Set
+
+from ...settings import get_settings
+from ..metrics import inc
+from ..sse import SSE_TERMINALS
+from .store import JobStore
+
+
+@dataclass
+class _Subscription:
+    cursor: int
+    queues: Set[asyncio.Queue[Dict[str, Any]]] = field(default_factory=set)
+
+
+class StoreTailer:
+    """Per-process poller that streams persisted events for jobs running elsewhere.
+
+    A single background task watches ``store.data_version()`` and only queries
+    ``events_since`` for subscribed jobs when the store reports a change. The
+    poll interval doubles while idle (up to ``max_interval``) and snaps back to
+    ``min_interval`` as soon as new events arrive.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        *,
+        min_interval: float | None = None,
+        max_interval: float | None = None,
+    ) -> None:
+        settings = get_settings()
+        self.store = store
+        self.min_interval = max(
+            0.001,
+            min_interval if min_interval is not None else settings.SSE_TAIL_POLL_MIN_S,
+        )
+        self.max_interval = max(
+            self.min_interval,
+            max_interval if max_interval is not None else settings.SSE_TAIL_POLL_MAX_S,
+        )
+        self.buffer_size = settings.SSE_BUFFER_SIZE
+        self._subs: Dict[str, _Subscription] = {}
+        self._version: Optional[int] = None
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, job_id: str, last_id: int) -> asyncio.Queue[Dict[str, Any]]:
+        queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(maxsize=self.buffer_size)
+        sub = self._subs.get(job_id)
+        if sub is None:
+            sub = self._subs[job_id] = _Subscription(cursor=last_id)
+        else:
+            # Re-reading a few events is harmless: consumers skip ids <= last_id.
+            sub.cursor = min(sub.cursor, last_id)
+        sub.queues.add(queue)
+        # Force a store read on the next tick so the new subscriber is not
+        # stuck behind an idle back-off.
+        self._version = None
+        self._wake.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue[Dict[str, Any]]) -> None:
+        sub = self._subs.get(job_id)
+        if sub is None:
+            return
+        sub.queues.discard(queue)
+        if not sub.queues:
+            self._subs.pop(job_id, None)
+
+    @property
+    def subscriptions(self) -> int:
+        return sum(len(s.queues) for s in self._subs.values())
+
+    async def _poll(self) -> int:
+        delivered = 0
+        for job_id, sub in list(self._subs.items()):
+            try:
+                events = await self.store.events_since(job_id, sub.cursor)
+            except Exception:
+                continue
+            for env in events:
+                for queue in list(sub.queues):
+                    if queue.full():
+                        # Mirror the store ring buffer: oldest events drop first.
+                        with suppress(asyncio.QueueEmpty):
+                            queue.get_nowait()
+                    queue.put_nowait(env)
+                sub.cursor = max(sub.cursor, int(env.get("id", 0)))
+                delivered += 1
+                if env.get("type") in SSE_TERMINALS:
+                    self._subs.pop(job_id, None)
+                    break
+        return delivered
+
+    async def _run(self) -> None:
+        interval = self.min_interval
+        while self._subs:
+            self._wake.clear()
+            try:
+                version: Optional[int] = await self.store.data_version()
+            except Exception:
+                version = None
+            delivered = 0
+            if version is None or version != self._version:
+                self._version = version
+                inc("sse_tail_polls")
+                delivered = await self._poll()
+            if delivered:
+                interval = self.min_interval
+            else:
+                interval = min(self.max_interval, interval * 2)
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout=interval)
+
+    async def close(self) -> None:
+        self._subs.clear()
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with suppress(Exception, asyncio.CancelledError):
+                await task
@@ -17,11 +17,17 @@ _counters: Dict[str, int] = {
 
 _hist: Dict[str, List[float]] = {}
 
+_gauges: Dict[str, float] = {}
+
 
 def inc(name: str, value: int = 1) -> None:
     _counters[name] = _counters.get(name, 0) + value
 
 
+def set_gauge(name: str, value: float) -> None:
+    _gauges[name] = value
+
+
 def observe(name: str, value: float) -> None:
     arr = _hist.setdefault(name, [])
     bisect.insort(arr, float(value))
@@ -35,7 +41,7 @@ def _pct(arr: List[float], p: float) -> float:
 
 
 def snapshot() -> Dict[str, float | int | dict]:
-    data: Dict[str, float | int | dict] = {**_counters}
+    data: Dict[str, float | int | dict] = {**_counters, **_gauges}
     data["ts"] = time.time()
     out: Dict[str, dict] = {}
     for k, arr in _hist.items():
@@ -61,7 +67,7 @@ def snapshot_metrics_text() -> str:
     for key, value in data.items():
         if isinstance(value, (int, float)):
             lines.append(f"# HELP {key} {key}")
-            mtype = "gauge" if key == "sse_clients" else "counter"
+            mtype = "gauge" if key == "sse_clients" or key in _gauges else "counter"
             lines.append(f"# TYPE {key} {mtype}")
             lines.append(f"{key} {value}")
     return "\n".join(lines) + "\n"
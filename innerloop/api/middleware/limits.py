@@ -11,6 +11,10 @@ from ..metrics import inc
 from ..models import ErrorCode, error_response
 
 
+# Streamed line by line with a per-line cap (EXAMPLES_INGEST_MAX_LINE_BYTES).
+_STREAMING_PATHS = {"/v1/examples/ingest"}
+
+
 class SizeLimitMiddleware(BaseHTTPMiddleware):
     """Reject requests exceeding MAX_REQUEST_BYTES."""
 
@@ -20,6 +24,8 @@ class SizeLimitMiddleware(BaseHTTPMiddleware):
         settings = get_settings()
         if request.method not in {"POST", "PUT", "PATCH"}:
             return await call_next(request)
+        if request.url.path in _STREAMING_PATHS:
+            return await call_next(request)
         limit = settings.MAX_REQUEST_BYTES
         request_id = getattr(
             request.state,
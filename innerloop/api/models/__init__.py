@@ -4,6 +4,7 @@ from .errors import APIError, ErrorCode, ErrorResponse, error_response
 from .schemas import (
     EvalStartRequest,
     Example,
+    ExampleDedupRequest,
     ExampleIn,
     JobState,
     ObjectiveSpec,
@@ -18,6 +19,7 @@ __all__ = [
     "JobState",
     "SSEEnvelope",
     "ExampleIn",
+    "ExampleDedupRequest",
     "Example",
     "EvalStartRequest",
     "ObjectiveSpec",
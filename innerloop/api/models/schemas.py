@@ -31,6 +31,13 @@ class ExampleIn(BaseModel):
     model_config = {"extra": "forbid"}
 
 
+class ExampleDedupRequest(BaseModel):
+    threshold: float | None = Field(default=None, ge=0.05, le=1.0)
+    dry_run: bool = False
+
+    model_config = {"extra": "forbid"}
+
+
 class Example(BaseModel):
     id: str
     input: str
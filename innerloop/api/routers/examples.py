@@ -1,12 +1,31 @@
 from __future__ import annotations
 
+import json
+import logging
+from typing import AsyncIterator, List, Optional, Tuple
 import uuid
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Depends, Query, Request
+from pydantic import ValidationError
 
-from ..models import ExampleIn
+from ...domain.dedup import dedup_store, split_duplicates
+from ...settings import Settings, get_settings
+from ..metrics import inc, set_gauge
+from ..models import ErrorCode, ExampleDedupRequest, ExampleIn, error_response
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
+# Per-line errors echoed back from an NDJSON ingest; the rest are counted.
+_MAX_REPORTED_ERRORS = 20
+
+
+def _row(ex: ExampleIn) -> dict:
+    return {
+        "id": ex.id or str(uuid.uuid4()),
+        "input": ex.input,
+        "expected": ex.expected,
+        "meta": ex.meta or {},
+    }
 
 
 @router.post(
@@ -18,27 +37,178 @@ router = APIRouter()
         413: {"description": "Payload too large"},
     },
 )
-async def examples_bulk(request: Request, items: list[ExampleIn]):
+async def examples_bulk(
+    request: Request,
+    items: list[ExampleIn],
+    settings: Settings = Depends(get_settings),
+):
     store = request.app.state.store
-    payload = []
-    for ex in items:
-        payload.append(
-            {
-                "id": ex.id or str(uuid.uuid4()),
-                "input": ex.input,
-                "expected": ex.expected,
-                "meta": ex.meta or {},
-            }
-        )
+    payload = [_row(ex) for ex in items]
+    merged: list[dict] = []
+    if settings.EXAMPLES_DEDUP:
+        payload, merged = split_duplicates(payload, await store.near_dup_index())
     n = await store.upsert_examples(payload)
-    return {"upserted": n}
+    return {"upserted": n, "merged": merged}
+
+
+async def _ndjson_lines(
+    chunks: AsyncIterator[bytes], max_line: int
+) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """``(line_number, line)`` per non-blank line; ``None`` if over ``max_line``.
+
+    Only the current partial line is buffered, and an oversized line is
+    skipped up to its newline rather than accumulated.
+    """
+    buf = b""
+    lineno = 0
+    skipping = False
+    async for chunk in chunks:
+        if skipping:
+            end = chunk.find(b"\n")
+            if end < 0:
+                continue
+            lineno += 1
+            skipping = False
+            yield lineno, None
+            chunk = chunk[end + 1 :]
+        *lines, buf = (buf + chunk).split(b"\n")
+        for line in lines:
+            lineno += 1
+            if len(line) > max_line:
+                yield lineno, None
+            elif line.strip():
+                yield lineno, line
+        if len(buf) > max_line:
+            skipping, buf = True, b""
+    if skipping:
+        yield lineno + 1, None
+    elif buf.strip():
+        yield lineno + 1, buf
+
+
+def _parse_line(line: bytes) -> ExampleIn:
+    obj = json.loads(line)
+    if not isinstance(obj, dict):
+        raise ValueError("expected a JSON object")
+    return ExampleIn.model_validate(obj)
+
+
+@router.post(
+    "/examples/ingest",
+    response_model=dict,
+    status_code=200,
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}}
+        }
+    },
+    responses={401: {"description": "Unauthorized"}},
+)
+async def examples_ingest(
+    request: Request, settings: Settings = Depends(get_settings)
+):
+    """Stream one example per line (NDJSON) into the store.
+
+    Lines are validated as they arrive and written every
+    ``EXAMPLES_INGEST_CHUNK`` rows, each chunk in its own transaction, so
+    memory stays flat however long the body is. Invalid lines are skipped
+    and reported; chunks already written stay written if the client drops.
+    """
+    store = request.app.state.store
+    dedup_index = await store.near_dup_index() if settings.EXAMPLES_DEDUP else None
+    received = upserted = merged = rejected = chunks = 0
+    errors: List[dict] = []
+    pending: List[dict] = []
+
+    async def flush() -> None:
+        nonlocal upserted, merged, chunks, pending
+        rows = pending
+        pending = []
+        if dedup_index is not None:
+            rows, dups = split_duplicates(rows, dedup_index)
+            merged += len(dups)
+        upserted += await store.upsert_examples(rows)
+        chunks += 1
+        set_gauge("examples_ingest_upserted", upserted)
+        logger.info(
+            "examples ingest progress",
+            extra={"received": received, "upserted": upserted},
+        )
+
+    async for lineno, line in _ndjson_lines(
+        request.stream(), settings.EXAMPLES_INGEST_MAX_LINE_BYTES
+    ):
+        received += 1
+        try:
+            if line is None:
+                raise ValueError("line exceeds EXAMPLES_INGEST_MAX_LINE_BYTES")
+            pending.append(_row(_parse_line(line)))
+        # json.loads raises RecursionError on deeply nested input.
+        except (ValueError, ValidationError, RecursionError) as exc:
+            rejected += 1
+            if len(errors) < _MAX_REPORTED_ERRORS:
+                errors.append({"line": lineno, "error": str(exc).splitlines()[0]})
+            continue
+        if len(pending) >= settings.EXAMPLES_INGEST_CHUNK:
+            await flush()
+    if pending:
+        await flush()
+    inc("examples_ingested", upserted)
+    if rejected:
+        inc("examples_ingest_rejected", rejected)
+    return {
+        "received": received,
+        "upserted": upserted,
+        "merged": merged,
+        "rejected": rejected,
+        "chunks": chunks,
+        "errors": errors,
+    }
+
+
+@router.post("/examples/dedup", response_model=dict, status_code=200)
+async def examples_dedup(request: Request, body: ExampleDedupRequest):
+    store = request.app.state.store
+    return await dedup_store(store, threshold=body.threshold, dry_run=body.dry_run)
 
 
-@router.get("/examples", response_model=dict, status_code=200)
-async def examples_list(request: Request, limit: int = 50, offset: int = 0):
+@router.get(
+    "/examples",
+    response_model=dict,
+    status_code=200,
+    responses={422: {"description": "Invalid cursor"}},
+)
+async def examples_list(
+    request: Request,
+    limit: int = Query(50, ge=0),
+    offset: int = Query(0, ge=0),
+    cursor: str | None = None,
+):
+    """Page through examples; pass ``next_cursor`` back as ``cursor``.
+
+    Cursor pages seek on the storage order, so their cost does not grow
+    with depth. A non-zero ``offset`` without a cursor keeps the old offset
+    paging and returns no cursor.
+    """
     store = request.app.state.store
-    rows = await store.list_examples(limit=limit, offset=offset)
-    return {"examples": rows, "limit": limit, "offset": offset}
+    if offset and cursor is None:
+        rows = await store.list_examples(limit=limit, offset=offset)
+        return {"examples": rows, "limit": limit, "offset": offset, "next_cursor": None}
+    try:
+        rows, next_cursor = await store.page_examples(limit, cursor)
+    except ValueError:
+        return error_response(
+            ErrorCode.validation_error,
+            "Invalid cursor",
+            422,
+            request_id=getattr(request.state, "request_id", None),
+        )
+    return {
+        "examples": rows,
+        "limit": limit,
+        "offset": offset,
+        "next_cursor": next_cursor,
+    }
 
 
 @router.delete("/examples/{example_id}", status_code=204)
@@ -8,6 +8,7 @@ from fastapi.responses import JSONResponse, StreamingResponse
 
 from ...settings import get_settings
 from ..jobs.registry import JobRegistry, JobStatus
+from ..jobs.tailer import StoreTailer
 from ..metrics import inc
 from ..models import (
     ErrorCode,
@@ -147,6 +148,7 @@ async def optimize_events(request: Request, job_id: str) -> StreamingResponse:
     registry: JobRegistry = request.app.state.registry
     store = request.app.state.store
     job = registry.jobs.get(job_id)
+    record = None
     if job is None:
         record = await store.get_job(job_id)
         if record is None:
@@ -159,6 +161,7 @@ async def optimize_events(request: Request, job_id: str) -> StreamingResponse:
     request.state.job_id = job_id
 
     settings = get_settings()
+    tailer: StoreTailer | None = getattr(request.app.state, "tailer", None)
 
     async def event_stream() -> AsyncGenerator[bytes, None]:
         last_id_header = request.headers.get(
@@ -177,13 +180,24 @@ async def optimize_events(request: Request, job_id: str) -> StreamingResponse:
             last_id = env["id"]
             if env["type"] in SSE_TERMINALS:
                 terminal_sent = True
-        if terminal_sent or not job:
+        if terminal_sent:
+            return
+        if job is not None:
+            queue = job.queue
+        elif (
+            record is not None
+            and record["status"] not in SSE_TERMINALS
+            and tailer is not None
+        ):
+            # Job is owned by another worker/process: follow it via the store.
+            queue = tailer.subscribe(job_id, last_id)
+        else:
             return
         try:
             while True:
                 try:
                     envelope = await asyncio.wait_for(
-                        job.queue.get(), timeout=settings.SSE_PING_INTERVAL_S
+                        queue.get(), timeout=settings.SSE_PING_INTERVAL_S
                     )
                     if envelope["id"] <= last_id:
                         continue
@@ -198,6 +212,8 @@ async def optimize_events(request: Request, job_id: str) -> StreamingResponse:
         except (GeneratorExit, asyncio.CancelledError):
             return
         finally:
+            if job is None and tailer is not None:
+                tailer.unsubscribe(job_id, queue)
             inc("sse_clients", -1)
 
     headers = {
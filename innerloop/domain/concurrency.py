@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager, suppress
+import re
+import time
+from typing import AsyncIterator, Deque, Dict
+
+from ..api.metrics import set_gauge
+from ..settings import Settings, get_settings
+
+# Upstream signals that we are sending too much; anything else leaves the limit alone.
+OVERLOAD_KINDS = {"rate_limited", "timeout"}
+
+
+def _gauge_suffix(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+class _Slot:
+    __slots__ = ("kind",)
+
+    def __init__(self) -> None:
+        self.kind: str | None = None
+
+    def fail(self, kind: str) -> None:
+        self.kind = kind
+
+
+class AIMDLimiter:
+    """Adaptive in-flight limit: additive increase, multiplicative decrease.
+
+    Every healthy completion under ``latency_target_s`` grows the limit by
+    ``1/limit`` (about +1 per round trip at full load). A 429 or timeout
+    multiplies it by ``backoff``, at most once per observed round trip so a
+    burst of failures from one window counts as a single congestion event.
+    Waiters are admitted in FIFO order.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        backoff: float = 0.5,
+        latency_target_s: float = 0.0,
+    ) -> None:
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(self.max_limit, max(self.min_limit, initial)))
+        self.backoff = min(0.99, max(0.1, backoff))
+        self.latency_target_s = latency_target_s
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future[None]] = deque()
+        self._last_drop = 0.0
+        self._rtt = 0.0
+        self._suffix = _gauge_suffix(name)
+        self._publish()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _publish(self) -> None:
+        set_gauge(f"provider_concurrency_limit_{self._suffix}", int(self.limit))
+        set_gauge(f"provider_queue_depth_{self._suffix}", len(self._waiters))
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            fut = self._waiters.popleft()
+            if fut.done():
+                continue
+            self.in_flight += 1
+            fut.set_result(None)
+        self._publish()
+
+    async def acquire(self) -> None:
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        self._publish()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Admitted just as we were cancelled: hand the slot on.
+                self.in_flight -= 1
+                self._wake()
+            else:
+                with suppress(ValueError):
+                    self._waiters.remove(fut)
+                self._publish()
+            raise
+
+    def release(self, latency: float, kind: str | None = None) -> None:
+        self.in_flight -= 1
+        now = time.monotonic()
+        if kind in OVERLOAD_KINDS:
+            if now - self._last_drop >= max(self._rtt, latency):
+                self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                self._last_drop = now
+        elif kind is None:
+            self._rtt = latency if not self._rtt else 0.8 * self._rtt + 0.2 * latency
+            if not self.latency_target_s or latency <= self.latency_target_s:
+                self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[_Slot]:
+        """Hold one in-flight slot; call ``fail(kind)`` on the yielded slot on error."""
+        await self.acquire()
+        slot = _Slot()
+        start = time.monotonic()
+        try:
+            yield slot
+        except asyncio.CancelledError:
+            slot.kind = slot.kind or "cancelled"
+            raise
+        finally:
+            self.release(time.monotonic() - start, slot.kind)
+
+
+_limiters: Dict[str, AIMDLimiter] = {}
+
+
+def get_limiter(name: str, settings: Settings | None = None) -> AIMDLimiter:
+    limiter = _limiters.get(name)
+    if limiter is None:
+        settings = settings or get_settings()
+        limiter = _limiters[name] = AIMDLimiter(
+            name,
+            initial=settings.PROVIDER_CONCURRENCY_INITIAL,
+            min_limit=settings.PROVIDER_CONCURRENCY_MIN,
+            max_limit=settings.PROVIDER_CONCURRENCY_MAX,
+            backoff=settings.PROVIDER_CONCURRENCY_BACKOFF,
+            latency_target_s=settings.PROVIDER_CONCURRENCY_LATENCY_TARGET_S,
+        )
+    return limiter
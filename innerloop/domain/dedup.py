@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+from array import array
+from functools import lru_cache
+import random
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import zlib
+
+try:  # pragma: no cover - numpy optional
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - fallback when missing
+    np = None  # type: ignore
+
+from ..api.metrics import inc
+from ..settings import Settings, get_settings
+
+_WORD = re.compile(r"\w+")
+_SHINGLE = 5
+_MASK64 = (1 << 64) - 1
+
+
+def _shingles(doc: Dict[str, Any]) -> Set[int]:
+    """CRC32 of the character 5-grams of normalised ``input expected``."""
+    text = " ".join(
+        _WORD.findall(f"{doc.get('input') or ''} {doc.get('expected') or ''}".lower())
+    )
+    if len(text) <= _SHINGLE:
+        return {zlib.crc32(text.encode("utf-8"))}
+    return {
+        zlib.crc32(text[i : i + _SHINGLE].encode("utf-8"))
+        for i in range(len(text) - _SHINGLE + 1)
+    }
+
+
+@lru_cache(maxsize=None)
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """``(bands, rows)`` minimising the weighted false positive/negative areas.
+
+    A pair with Jaccard similarity ``s`` shares at least one band with
+    probability ``1 - (1 - s**rows)**bands``. Candidates are verified on
+    their signatures afterwards, so misses weigh nine times more than
+    spurious candidates.
+    """
+
+    def area(lo: float, hi: float, f: Any) -> float:
+        steps = 50
+        width = (hi - lo) / steps
+        return sum(f(lo + (i + 0.5) * width) for i in range(steps)) * width
+
+    best = (float("inf"), 1, num_perm)
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        fp = area(0.0, threshold, lambda s: 1 - (1 - s**rows) ** bands)
+        fn = area(threshold, 1.0, lambda s: (1 - s**rows) ** bands)
+        best = min(best, (0.1 * fp + 0.9 * fn, bands, rows))
+    return best[1], best[2]
+
+
+class MinHasher:
+    """``num_perm`` MinHash values per example via multiply-shift hashing.
+
+    ``h_i(x) = ((a_i * x + b_i) mod 2**64) >> 32``; the numpy path computes
+    the same values, so signatures match with or without it.
+    """
+
+    def __init__(self, num_perm: int = 128, seed: int = 1) -> None:
+        rng = random.Random(seed)  # nosec B311 - hash parameters, not secrets
+        self.num_perm = num_perm
+        self._a = [rng.getrandbits(64) | 1 for _ in range(num_perm)]
+        self._b = [rng.getrandbits(64) for _ in range(num_perm)]
+        if np is not None:
+            self._na = np.array(self._a, dtype=np.uint64)[:, None]
+            self._nb = np.array(self._b, dtype=np.uint64)[:, None]
+
+    def signature(self, doc: Dict[str, Any]) -> array:
+        shingles = _shingles(doc)
+        if np is not None:
+            x = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+            with np.errstate(over="ignore"):
+                h = (self._na * x + self._nb) >> np.uint64(32)
+            return array("I", h.min(axis=1).astype(np.uint32).tobytes())
+        return array(
+            "I",
+            (
+                min(((a * x + b) & _MASK64) >> 32 for x in shingles)
+                for a, b in zip(self._a, self._b)
+            ),
+        )
+
+
+def similarity(a: array, b: array) -> float:
+    """Estimated Jaccard similarity: the share of equal MinHash values."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class LSHIndex:
+    """Banded LSH over MinHash signatures for near-duplicate lookups.
+
+    Candidates sharing a band are verified against ``threshold`` on the
+    estimated similarity, so band collisions never merge on their own.
+    Signatures are kept as 32-bit arrays (``4 * num_perm`` bytes each).
+    """
+
+    def __init__(
+        self, threshold: float = 0.9, num_perm: int = 128, seed: int = 1
+    ) -> None:
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, seed)
+        self._seed = seed
+        self.bands, self.rows = lsh_params(round(threshold, 3), num_perm)
+        self._buckets: List[Dict[int, Set[str]]] = [{} for _ in range(self.bands)]
+        self._sigs: Dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self._sigs)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self._sigs
+
+    def empty_like(self) -> "LSHIndex":
+        return LSHIndex(self.threshold, self.hasher.num_perm, self._seed)
+
+    def _keys(self, sig: array) -> Iterable[Tuple[int, int]]:
+        r = self.rows
+        for band in range(self.bands):
+            yield band, hash(tuple(sig[band * r : (band + 1) * r]))
+
+    def add(self, doc: Dict[str, Any], sig: Optional[array] = None) -> None:
+        doc_id = str(doc["id"])
+        self.remove(doc_id)
+        sig = sig if sig is not None else self.hasher.signature(doc)
+        self._sigs[doc_id] = sig
+        for band, key in self._keys(sig):
+            self._buckets[band].setdefault(key, set()).add(doc_id)
+
+    def add_many(self, docs: Iterable[Dict[str, Any]]) -> None:
+        for doc in docs:
+            self.add(doc)
+
+    def remove(self, doc_id: str) -> None:
+        sig = self._sigs.pop(doc_id, None)
+        if sig is None:
+            return
+        for band, key in self._keys(sig):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(doc_id)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def query(
+        self, sig: array, exclude: Optional[str] = None
+    ) -> Optional[Tuple[str, float]]:
+        """Most similar indexed id at or above ``threshold``, if any."""
+        seen: Set[str] = set()
+        best: Optional[Tuple[str, float]] = None
+        for band, key in self._keys(sig):
+            for doc_id in self._buckets[band].get(key, ()):
+                if doc_id in seen or doc_id == exclude:
+                    continue
+                seen.add(doc_id)
+                sim = similarity(sig, self._sigs[doc_id])
+                if sim >= self.threshold and (best is None or sim > best[1]):
+                    best = (doc_id, sim)
+        return best
+
+
+def new_lsh_index(settings: Settings | None = None) -> LSHIndex:
+    settings = settings or get_settings()
+    return LSHIndex(
+        settings.EXAMPLES_DEDUP_THRESHOLD, settings.EXAMPLES_DEDUP_NUM_PERM
+    )
+
+
+def _merged(doc_id: str, hit: Tuple[str, float]) -> Dict[str, Any]:
+    return {"id": doc_id, "duplicate_of": hit[0], "similarity": round(hit[1], 3)}
+
+
+def split_duplicates(
+    items: List[Dict[str, Any]], index: LSHIndex
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Partition ``items`` into ``(kept, merged)`` against ``index``.
+
+    Items are also checked against earlier items of the same batch. An item
+    never matches the stored version of its own id, so updates go through.
+    ``index`` is not modified; the store indexes ``kept`` on upsert.
+    """
+    batch = index.empty_like()
+    kept: List[Dict[str, Any]] = []
+    merged: List[Dict[str, Any]] = []
+    for item in items:
+        doc_id = str(item["id"])
+        sig = index.hasher.signature(item)
+        hit = index.query(sig, exclude=doc_id) or batch.query(sig, exclude=doc_id)
+        if hit is None:
+            batch.add(item, sig)
+            kept.append(item)
+        else:
+            merged.append(_merged(doc_id, hit))
+    if merged:
+        inc("examples_dedup_merged", len(merged))
+    return kept, merged
+
+
+async def dedup_store(
+    store: Any,
+    *,
+    threshold: float | None = None,
+    dry_run: bool = False,
+    chunk_size: int = 5000,
+) -> Dict[str, Any]:
+    """Stream every stored example and drop near-duplicates of earlier ones.
+
+    Examples are visited in storage order, so the first of each cluster is
+    kept. Duplicates are deleted chunk by chunk unless ``dry_run``; only
+    signatures of kept examples stay in memory.
+    """
+    settings = get_settings()
+    index = LSHIndex(
+        settings.EXAMPLES_DEDUP_THRESHOLD if threshold is None else threshold,
+        settings.EXAMPLES_DEDUP_NUM_PERM,
+    )
+    scanned = 0
+    merged: List[Dict[str, Any]] = []
+    async for chunk in store.example_chunks(chunk_size):
+        dropped: List[str] = []
+        for doc in chunk:
+            scanned += 1
+            sig = index.hasher.signature(doc)
+            hit = index.query(sig)
+            if hit is None:
+                index.add(doc, sig)
+            else:
+                merged.append(_merged(str(doc["id"]), hit))
+                dropped.append(str(doc["id"]))
+        if dropped and not dry_run:
+            await store.delete_examples(dropped)
+    if merged and not dry_run:
+        inc("examples_dedup_merged", len(merged))
+    return {
+        "scanned": scanned,
+        "merged": merged,
+        "removed": 0 if dry_run else len(merged),
+    }
+
+
+__all__ = [
+    "LSHIndex",
+    "MinHasher",
+    "dedup_store",
+    "lsh_params",
+    "new_lsh_index",
+    "similarity",
+    "split_duplicates",
+]
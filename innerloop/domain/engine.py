@@ -1,12 +1,26 @@
 from __future__ import annotations
 
-from contextlib import suppress
+from contextlib import asynccontextmanager, suppress
+import json
 import logging
-from typing import Dict, Optional, Protocol
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Protocol
 
 import httpx
 
+from ..api.metrics import inc, observe
 from ..settings import Settings, get_settings
+from .concurrency import _Slot, get_limiter
+from .hedging import get_hedger, hedged
+from .http_pool import get_transport
+from .resilience import (
+    ProviderError,
+    call_with_retry,
+    error_from_exception,
+    error_from_response,
+    get_breaker,
+)
+from .response_cache import get_response_cache
+from .singleflight import SingleFlight, request_key
 
 
 class ModelProvider(Protocol):
@@ -19,14 +33,216 @@ class LocalEchoProvider:
         return text[:50]
 
 
-class OpenRouterProvider:
+def _record_usage(usage: object) -> None:
+    """Track prompt tokens served from the provider's prefix cache."""
+    if not isinstance(usage, dict):
+        return
+    prompt_tokens = usage.get("prompt_tokens") or 0
+    details = usage.get("prompt_tokens_details") or {}
+    cached = details.get("cached_tokens") if isinstance(details, dict) else None
+    if cached is None:
+        cached = usage.get("cache_read_input_tokens") or 0
+    if not isinstance(prompt_tokens, int) or prompt_tokens <= 0:
+        return
+    cached = int(cached) if isinstance(cached, (int, float)) else 0
+    inc("provider_prompt_tokens", prompt_tokens)
+    inc("provider_cached_prompt_tokens", cached)
+    observe("provider_cached_ratio", cached / prompt_tokens)
+
+
+class _ChatCompletionsProvider:
+    """Shared request path for OpenAI-compatible ``/chat/completions`` APIs."""
+
+    URL = ""
+    SUPPORTED_KWARGS = ("model", "messages", "temperature", "max_tokens", "seed")
+    client: httpx.AsyncClient
+
+    def __init__(self) -> None:
+        self._flight: SingleFlight[str] = SingleFlight()
+
+    def _default_model(self) -> str | None:
+        return None
+
+    def _build_body(self, prompt: str, kwargs: Dict[str, object]) -> Dict[str, object]:
+        messages = kwargs.get("messages")
+        temperature = kwargs.get("temperature")
+        max_tokens = kwargs.get("max_tokens")
+        seed = kwargs.get("seed")
+        body: Dict[str, object] = {
+            "model": kwargs.get("model") or self._default_model(),
+            "messages": (
+                messages
+                if messages is not None
+                else [{"role": "user", "content": prompt}]
+            ),
+        }
+        if temperature is not None:
+            body["temperature"] = temperature
+        if max_tokens is not None:
+            body["max_tokens"] = max_tokens
+        if seed is not None:
+            body["seed"] = seed
+        return body
+
+    @asynccontextmanager
+    async def _admit(self, body: Dict[str, object]) -> AsyncIterator[_Slot | None]:
+        settings = get_settings()
+        if not settings.PROVIDER_CONCURRENCY_ENABLED:
+            yield None
+            return
+        name = f"{type(self).__name__}:{body.get('model') or ''}"
+        limiter = get_limiter(name, settings)
+        async with limiter.slot() as slot:
+            try:
+                yield slot
+            except Exception as exc:
+                slot.fail(error_from_exception(exc).kind)
+                raise
+
+    async def _send(self, body: Dict[str, object]) -> httpx.Response:
+        async with self._admit(body) as slot:
+            resp = await self.client.post(self.URL, json=body)
+            err = error_from_response(resp)
+            if err is not None and slot is not None:
+                slot.fail(err.kind)
+            return resp
+
+    async def _post(self, body: Dict[str, object], cache_key: str | None = None) -> str:
+        inc("provider_calls")
+        resp = await self._send(body)
+        err = error_from_response(resp)
+        if err is not None:
+            raise err
+        data = resp.json()
+        if not data.get("choices"):
+            raise ProviderError("bad_response", "response has no choices")
+        _record_usage(data.get("usage"))
+        content = data["choices"][0].get("message", {}).get("content", "") or ""
+        if cache_key is not None:
+            await get_response_cache().put(
+                cache_key,
+                str(body.get("model") or ""),
+                str(data.get("model") or ""),
+                content,
+            )
+        return content
+
+    async def complete(self, prompt: str, **kwargs: object) -> str:
+        """Return the completion text or raise :class:`ProviderError`."""
+        settings = get_settings()
+        body = self._build_body(prompt, kwargs)
+        cache_key = None
+        # Only temperature=0 requests are deterministic enough to reuse.
+        if settings.PROVIDER_CACHE_ENABLED and body.get("temperature") == 0:
+            cache_key = request_key(
+                {
+                    "url": self.URL,
+                    "version": settings.PROVIDER_CACHE_VERSION,
+                    "body": body,
+                }
+            )
+            hit = await get_response_cache(settings).get(cache_key)
+            if hit is not None:
+                return hit
+        model = str(body.get("model") or "")
+        breaker = get_breaker(model, settings)
+
+        def attempt() -> Awaitable[str]:
+            if settings.PROVIDER_HEDGE_ENABLED:
+                return hedged(
+                    lambda: self._post(body, cache_key), get_hedger(model, settings)
+                )
+            return self._post(body, cache_key)
+
+        async def call() -> str:
+            return await call_with_retry(attempt, breaker=breaker, settings=settings)
+
+        if not settings.PROVIDER_COALESCE_ENABLED:
+            return await call()
+        return await self._flight.run(request_key(body), call)
+
+    async def _post_stream(
+        self, body: Dict[str, object], should_stop: Callable[[str], bool] | None
+    ) -> str:
+        inc("provider_calls")
+        inc("provider_stream_calls")
+        parts: list[str] = []
+        async with self._admit(body):
+            async with self.client.stream("POST", self.URL, json=body) as resp:
+                err = error_from_response(resp)
+                if err is not None:
+                    raise err
+                async for line in resp.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        chunk = json.loads(data)
+                    except ValueError as exc:
+                        raise ProviderError(
+                            "bad_response", "malformed stream chunk"
+                        ) from exc
+                    _record_usage(chunk.get("usage"))
+                    choices = chunk.get("choices") or [{}]
+                    delta = (choices[0].get("delta") or {}).get("content")
+                    if not delta:
+                        continue
+                    parts.append(delta)
+                    if should_stop is not None and should_stop("".join(parts)):
+                        # Leaving the block closes the connection, which stops
+                        # generation (and billing) upstream.
+                        inc("provider_stream_early_stops")
+                        break
+        return "".join(parts)
+
+    async def complete_stream(
+        self,
+        prompt: str,
+        *,
+        should_stop: Callable[[str], bool] | None = None,
+        **kwargs: object,
+    ) -> str:
+        """Stream a completion, returning early once ``should_stop(text)`` is true.
+
+        Returns the text received so far. Streamed calls bypass the response
+        cache and request coalescing because a truncated text is not the
+        completion.
+        """
+        settings = get_settings()
+        body = self._build_body(prompt, kwargs)
+        body["stream"] = True
+        body["stream_options"] = {"include_usage": True}
+        breaker = get_breaker(str(body.get("model") or ""), settings)
+        return await call_with_retry(
+            lambda: self._post_stream(body, should_stop),
+            breaker=breaker,
+            settings=settings,
+        )
+
+    async def aclose(self) -> None:
+        with suppress(Exception):
+            await self.client.aclose()
+
+
+def _completions_url(base_url: str) -> str:
+    return f"{base_url.rstrip('/')}/chat/completions"
+
+
+class OpenRouterProvider(_ChatCompletionsProvider):
+    URL = "https://openrouter.ai/api/v1/chat/completions"
+
     def __init__(
         self,
         api_key: str,
         *,
         extra_headers: Dict[str, str] | None = None,
         timeout: float | httpx.Timeout | None = None,
+        base_url: str | None = None,
     ) -> None:
+        super().__init__()
+        self.URL = _completions_url(base_url or get_settings().OPENROUTER_BASE_URL)
         self.api_key = api_key
         headers = {"User-Agent": "gepa-next/0.1", "Authorization": f"Bearer {api_key}"}
         if extra_headers:
@@ -38,82 +254,31 @@ class OpenRouterProvider:
             else httpx.Timeout(timeout) if timeout is not None else default_timeout
         )
         self.client = httpx.AsyncClient(
+            transport=get_transport(self.URL),
             timeout=timeout_config,
-            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
             headers=headers,
-            verify=True,
         )
         self._extra_headers = extra_headers or {}
 
-    async def complete(self, prompt: str, **kwargs: object) -> str:
-        settings = get_settings()
-        try:
-            messages = kwargs.get("messages")
-            temperature = kwargs.get("temperature")
-            max_tokens = kwargs.get("max_tokens")
-            model = kwargs.get("model") or settings.TARGET_MODEL_DEFAULT
-            body: Dict[str, object] = {
-                "model": model,
-                "messages": (
-                    messages
-                    if messages is not None
-                    else [{"role": "user", "content": prompt}]
-                ),
-            }
-            if temperature is not None:
-                body["temperature"] = temperature
-            if max_tokens is not None:
-                body["max_tokens"] = max_tokens
-            resp = await self.client.post(
-                "https://openrouter.ai/api/v1/chat/completions", json=body
-            )
-            data = resp.json()
-            return data.get("choices", [{}])[0].get("message", {}).get("content", "")
-        except Exception:
-            return "unavailable"
+    def _default_model(self) -> str | None:
+        return get_settings().TARGET_MODEL_DEFAULT
 
-    async def aclose(self) -> None:
-        with suppress(Exception):
-            await self.client.aclose()
 
+class OpenAIProvider(_ChatCompletionsProvider):
+    URL = "https://api.openai.com/v1/chat/completions"
 
-class OpenAIProvider:
-    def __init__(self, api_key: str, *, timeout: float = 5.0) -> None:
+    def __init__(
+        self, api_key: str, *, timeout: float = 5.0, base_url: str | None = None
+    ) -> None:
+        super().__init__()
+        self.URL = _completions_url(base_url or get_settings().OPENAI_BASE_URL)
         headers = {
             "User-Agent": "gepa-next/0.1",
             "Authorization": f"Bearer {api_key}",
         }
-        self.client = httpx.AsyncClient(timeout=timeout, headers=headers)
-
-    async def complete(self, prompt: str, **kwargs: object) -> str:
-        try:
-            messages = kwargs.get("messages")
-            temperature = kwargs.get("temperature")
-            max_tokens = kwargs.get("max_tokens")
-            model = kwargs.get("model")
-            body: Dict[str, object] = {
-                "model": model,
-                "messages": (
-                    messages
-                    if messages is not None
-                    else [{"role": "user", "content": prompt}]
-                ),
-            }
-            if temperature is not None:
-                body["temperature"] = temperature
-            if max_tokens is not None:
-                body["max_tokens"] = max_tokens
-            resp = await self.client.post(
-                "https://api.openai.com/v1/chat/completions", json=body
-            )
-            data = resp.json()
-            return data.get("choices", [{}])[0].get("message", {}).get("content", "")
-        except Exception:
-            return "unavailable"
-
-    async def aclose(self) -> None:
-        with suppress(Exception):
-            await self.client.aclose()
+        self.client = httpx.AsyncClient(
+            transport=get_transport(self.URL), timeout=timeout, headers=headers
+        )
 
 
 logger = logging.getLogger(__name__)
@@ -3,9 +3,11 @@ from __future__ import annotations
 import asyncio
 from dataclasses import dataclass
 import hashlib
-from typing import Dict, Sequence
+from typing import Callable, Dict, Sequence
 
 from .examples import Example
+from .messages import PromptLayout
+from .resilience import ProviderError
 
 
 @dataclass
@@ -16,6 +18,7 @@ class RolloutResult:
     cost: float
     latency: float
     cached: bool = False
+    errors: int = 0
 
 
 _CACHE: Dict[str, RolloutResult] = {}
@@ -29,6 +32,20 @@ def exact_match(pred: str, target: str) -> float:
     return 1.0 if _normalize(pred) == _normalize(target) else 0.0
 
 
+def exact_match_viable(partial: str, target: str) -> bool:
+    """Whether more text could still turn ``partial`` into an exact match.
+
+    Normalisation only lowercases and collapses whitespace, so a normalised
+    output must stay a prefix of the normalised target; anything that diverges
+    or runs past it cannot match however the completion continues.
+    """
+    return _normalize(target).startswith(_normalize(partial))
+
+
+def _cannot_match(target: str) -> Callable[[str], bool]:
+    return lambda partial: not exact_match_viable(partial, target)
+
+
 def regex_pass(pred: str, pattern: str) -> float:
     import re
 
@@ -51,22 +68,49 @@ async def evaluate_batch(
     scores: Dict[str, Dict[str, float]] = {}
     traces: list[dict] = []
     total = 0.0
+    errors = 0
     start = asyncio.get_event_loop().time()
+    stream = getattr(settings, "EVAL_STREAM_EARLY_STOP", False) and hasattr(
+        provider, "complete_stream"
+    )
     for ex in examples:
         prompt = f"{candidate_prompt} {ex.input}".strip()
+        trace: dict = {"example_id": ex.id, "prompt": prompt}
+        # The candidate prompt is shared by every example in the batch: send it
+        # as the cacheable system prefix and the example input last.
+        layout = PromptLayout(candidate_prompt.strip(), (), ex.input)
+        kwargs = {
+            "model": model or getattr(settings, "TARGET_MODEL_DEFAULT", None),
+            **layout.kwargs_for(provider),
+        }
         try:
-            output = await provider.complete(
-                prompt,
-                model=model or getattr(settings, "TARGET_MODEL_DEFAULT", None),
-            )
+            if stream:
+                output = await provider.complete_stream(
+                    prompt,
+                    should_stop=_cannot_match(ex.output),
+                    **kwargs,
+                )
+            else:
+                output = await provider.complete(prompt, **kwargs)
+        except ProviderError as exc:
+            output = ""
+            errors += 1
+            trace["error"] = exc.kind
         except Exception:
             output = ""
+            errors += 1
+            trace["error"] = "unknown"
         score = exact_match(output, ex.output)
         scores[ex.id] = {"exact_match": score}
         total += score
-        traces.append({"example_id": ex.id, "prompt": prompt, "output": output})
+        trace["output"] = output
+        traces.append(trace)
     latency = asyncio.get_event_loop().time() - start
     mean = {"exact_match": total / len(examples) if examples else 0.0}
-    result = RolloutResult(scores, mean, traces, cost=0.0, latency=latency)
-    _CACHE[key] = result
+    result = RolloutResult(
+        scores, mean, traces, cost=0.0, latency=latency, errors=errors
+    )
+    # A score computed from failed calls is not the candidate's real score.
+    if not errors:
+        _CACHE[key] = result
     return result
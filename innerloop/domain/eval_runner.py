@@ -1,27 +1,43 @@
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import AsyncIterator, Dict, List, Tuple
 
 from ..settings import get_settings
 from .judge import judge_pair
 from .mutations import mutate_prompt
 from .optimize_engine import pareto_filter
+from .ranking import bt_rank
 from .recombination import recombine
 
 
+async def _numbered(
+    first: dict | None, rest: AsyncIterator[dict]
+) -> AsyncIterator[Tuple[int, dict]]:
+    if first is None:
+        return
+    yield 0, first
+    i = 1
+    async for ex in rest:
+        yield i, ex
+        i += 1
+
+
 async def run_eval(
     store, base_prompt: str, target_model: str | None, seed: int, limits: dict, emit
 ):
     s = get_settings()
     max_ex = min(limits.get("max_examples") or s.EVAL_MAX_EXAMPLES, s.EVAL_MAX_EXAMPLES)
-    examples = await store.list_examples(limit=max_ex, offset=0)
-    task = base_prompt or (examples[0]["input"] if examples else "")
-    await emit("eval_started", {"task": task, "examples": len(examples)})
+    # Streamed: only the example in hand is held, however large the corpus.
+    examples = store.iter_examples(limit=max_ex)
+    first = await anext(examples, None)
+    task = base_prompt or (first["input"] if first else "")
+    total = min(max_ex, await store.count_examples()) if first else 0
+    await emit("eval_started", {"task": task, "examples": total})
     best = base_prompt
     patience = limits.get("early_stop_patience") or s.EARLY_STOP_PATIENCE
     stale = 0
     pool: List[str] = [base_prompt]
-    for i, ex in enumerate(examples or []):
+    async for i, _ in _numbered(first, examples):
         muts = mutate_prompt(best, k=3, seed=seed + i)
         try:
             recs = recombine(
@@ -33,11 +49,21 @@ async def run_eval(
             recs = []
         cands = list({best, *muts, *recs})
         front = pareto_filter(cands, n=min(4, len(cands)))
-        scores: Dict[str, int] = {}
-        for c in front:
-            res = await judge_pair(task, best, c, store=store)
-            scores[c] = 1 if res["winner"] == "B" else 0
-        sel = max(front, key=lambda c: scores.get(c, 0))
+        if s.RANKING_STRATEGY == "bradley_terry":
+            # Incumbent first so ties keep it.
+            ranked = await bt_rank(
+                [best, *front],
+                task,
+                store=store,
+                stable_rounds=s.RANKING_STABLE_ROUNDS,
+            )
+            sel = ranked.order[0]
+        else:
+            scores: Dict[str, int] = {}
+            for c in front:
+                res = await judge_pair(task, best, c, store=store)
+                scores[c] = 1 if res["winner"] == "B" else 0
+            sel = max(front, key=lambda c: scores.get(c, 0))
         improved = sel != best
         best = sel if improved else best
         pool = (pool + [sel])[-8:]
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+from array import array
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 import json
+import os
 from pathlib import Path
-from typing import List
+import random
+import threading
+from typing import Any, Dict, Iterator, List, Tuple, overload
 
 import yaml  # type: ignore[import-untyped]
 
@@ -16,42 +21,159 @@ class Example:
     meta: dict = field(default_factory=dict)
 
 
+_EXAMPLES_DIR = Path(__file__).resolve().parents[2] / "gepa_next" / "examples"
+_MANIFEST_PATH = _EXAMPLES_DIR / "manifest.yaml"
+_EXCLUDED_KEYS = {"id", "question", "answer", "text", "label", "input", "output"}
+
+
+def _decode(line: bytes) -> Example:
+    rec = json.loads(line)
+    if "question" in rec:
+        inp = rec.get("question", "")
+        out = rec.get("answer", "")
+    elif "text" in rec:
+        inp = rec.get("text", "")
+        out = rec.get("label", "")
+    else:
+        inp = rec.get("input", "")
+        out = rec.get("output", "")
+    meta = {k: v for k, v in rec.items() if k not in _EXCLUDED_KEYS}
+    return Example(str(rec.get("id")), inp, out, meta)
+
+
+class PackFile(Sequence):
+    """Read-only sequence of the examples in a JSONL file, decoded on access.
+
+    Opening scans the file once to record line offsets and keeps it open;
+    ``pack[i]`` then reads and parses just line ``i`` with ``os.pread``, so a
+    pack costs 16 bytes per line in memory rather than its file or decoded
+    size.
+
+    Reads go through the descriptor rather than a memory map: packs may be
+    edited while a job still holds the previous ``PackFile``, and truncating
+    a mapped file in place kills the process with SIGBUS on the next read.
+    An atomically replaced file stays readable through the held descriptor;
+    one truncated in place gives a short read, reported as ``ValueError``.
+    The registry hands out a new ``PackFile`` either way.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file = path.open("rb")
+        self._starts = array("Q")
+        self._ends = array("Q")
+        pos = 0
+        for line in self._file:
+            if line.strip():
+                self._starts.append(pos)
+                self._ends.append(pos + len(line.rstrip(b"\r\n")))
+            pos += len(line)
+
+    def __del__(self) -> None:
+        # Jobs may hold a pack past its registry entry; close with the last one.
+        file = getattr(self, "_file", None)
+        if file is not None:
+            file.close()
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    @overload
+    def __getitem__(self, i: int) -> Example: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> List[Example]: ...
+
+    def __getitem__(self, i: int | slice) -> Example | List[Example]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        start, end = self._starts[i], self._ends[i]
+        line = os.pread(self._file.fileno(), end - start, start)
+        if len(line) != end - start:
+            raise ValueError(f"{self.path} was truncated while in use")
+        return _decode(line)
+
+    def __iter__(self) -> Iterator[Example]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def sample(self, k: int, seed: int | None = None) -> List[Example]:
+        """``k`` distinct examples at random, decoding only those lines."""
+        rng = random.Random(seed)  # nosec B311 - subset sampling, not secrets
+        picks = rng.sample(range(len(self)), min(max(0, k), len(self)))
+        return [self[i] for i in picks]
+
+
 @dataclass
 class ExamplePack:
     name: str
     metrics: List[str]
-    examples: List[Example]
+    examples: Sequence[Example]
 
+    def sample(self, k: int, seed: int | None = None) -> List[Example]:
+        if isinstance(self.examples, PackFile):
+            return self.examples.sample(k, seed)
+        rng = random.Random(seed)  # nosec B311 - subset sampling, not secrets
+        return rng.sample(list(self.examples), min(max(0, k), len(self.examples)))
 
-_EXAMPLES_DIR = Path(__file__).resolve().parents[2] / "gepa_next" / "examples"
-_MANIFEST_PATH = _EXAMPLES_DIR / "manifest.yaml"
-_EXCLUDED_KEYS = {"id", "question", "answer", "text", "label", "input", "output"}
+
+def _stamp(path: Path) -> Tuple[int, int, int]:
+    st = path.stat()
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class PackRegistry:
+    """Example packs from a manifest, parsed once and reused until changed.
+
+    The manifest and each pack file are keyed by ``(inode, mtime_ns, size)``,
+    so a file edited in place or atomically replaced is picked up on the next
+    lookup and an unchanged one costs two ``stat`` calls.
+    """
+
+    def __init__(self, manifest_path: Path) -> None:
+        self.manifest_path = manifest_path
+        self._lock = threading.Lock()
+        self._manifest: Tuple[Tuple[int, ...], Dict[str, Any]] | None = None
+        self._packs: Dict[str, Tuple[Tuple[int, ...], ExamplePack]] = {}
+
+    def _load_manifest(self) -> Tuple[Tuple[int, ...], Dict[str, Any]]:
+        stamp = _stamp(self.manifest_path)
+        cached = self._manifest
+        if cached is None or cached[0] != stamp:
+            with self.manifest_path.open("r", encoding="utf-8") as f:
+                data = yaml.safe_load(f) or {}
+            self._manifest = cached = (stamp, data)
+        return cached
+
+    def manifest(self) -> Dict[str, Any]:
+        return self._load_manifest()[1]
+
+    def get(self, name: str) -> ExamplePack:
+        manifest_stamp, manifest = self._load_manifest()
+        pack_info = manifest.get("packs", {}).get(name)
+        if not pack_info:
+            raise ValueError(f"Unknown example pack: {name}")
+        data_path = self.manifest_path.parent / pack_info["path"]
+        stamp = manifest_stamp + _stamp(data_path)
+        with self._lock:
+            cached = self._packs.get(name)
+            if cached is None or cached[0] != stamp:
+                pack = ExamplePack(
+                    name=name,
+                    metrics=pack_info.get("metrics", []),
+                    examples=PackFile(data_path),
+                )
+                self._packs[name] = cached = (stamp, pack)
+        return cached[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._manifest = None
+            self._packs.clear()
+
+
+_REGISTRY = PackRegistry(_MANIFEST_PATH)
 
 
 def load_pack(name: str) -> ExamplePack:
-    with _MANIFEST_PATH.open("r", encoding="utf-8") as f:
-        manifest = yaml.safe_load(f)
-    pack_info = manifest.get("packs", {}).get(name)
-    if not pack_info:
-        raise ValueError(f"Unknown example pack: {name}")
-    data_path = _EXAMPLES_DIR / pack_info["path"]
-    examples: List[Example] = []
-    with data_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            rec = json.loads(line)
-            if "question" in rec:
-                inp = rec.get("question", "")
-                out = rec.get("answer", "")
-            elif "text" in rec:
-                inp = rec.get("text", "")
-                out = rec.get("label", "")
-            else:
-                inp = rec.get("input", "")
-                out = rec.get("output", "")
-            meta = {k: v for k, v in rec.items() if k not in _EXCLUDED_KEYS}
-            examples.append(Example(str(rec.get("id")), inp, out, meta))
-    return ExamplePack(
-        name=name, metrics=pack_info.get("metrics", []), examples=examples
-    )
+    return _REGISTRY.get(name)
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 import random
 import re
-from typing import Any, Dict, List, Sequence, cast
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, cast
 
 from ..settings import get_settings
 from .candidate import Candidate, apply_edits
@@ -46,11 +46,38 @@ class Budget:
     max_cost: float | None = None
 
 
-async def gepa_loop(job, emit, payload: Dict[str, Any]) -> Dict[str, Any]:
+def _candidate_from_dict(data: Dict[str, Any]) -> Candidate:
+    return Candidate(
+        id=str(data["id"]),
+        sections=list(data.get("sections", [])),
+        examples_subset=data.get("examples_subset"),
+        meta=dict(data.get("meta", {})),
+    )
+
+
+async def gepa_loop(
+    job,
+    emit,
+    payload: Dict[str, Any],
+    *,
+    resume: Dict[str, Any] | None = None,
+    checkpoint: Callable[[Dict[str, Any]], Awaitable[None]] | None = None,
+) -> Dict[str, Any]:
+    """Run the GEPA evolutionary loop.
+
+    ``checkpoint`` is awaited with a JSON-safe snapshot after each completed
+    generation (every ``GEPA_CHECKPOINT_EVERY_GENS``); passing such a snapshot
+    back as ``resume`` continues from the next generation.
+    """
     settings = get_settings()
     provider = get_target_provider(settings)
     dataset = cast(Dict[str, Any], payload.get("dataset", {"name": "toy_qa"}))
     pack = load_pack(str(dataset.get("name", "toy_qa")))
+    # Pack examples are decoded on access; decode them once for the whole run.
+    examples = list(pack.examples)
+    examples_dicts = [
+        {"input": ex.input, "expected": ex.output, **ex.meta} for ex in examples
+    ]
     budget = Budget(**cast(Dict[str, Any], payload.get("budget", {})))
     max_gens = budget.max_generations or 1
     prompt = str(payload.get("prompt", ""))
@@ -62,21 +89,27 @@ async def gepa_loop(job, emit, payload: Dict[str, Any]) -> Dict[str, Any]:
     rollouts = 0
     best_score = None
     stagnation = 0
-    for gen in range(max_gens):
+    start_gen = 0
+    if resume:
+        population = [_candidate_from_dict(c) for c in resume["population"]]
+        frontier = [_candidate_from_dict(c) for c in resume["frontier"]]
+        lessons = list(resume["lessons"])
+        rollouts = int(resume["rollouts"])
+        best_score = resume["best_score"]
+        stagnation = int(resume["stagnation"])
+        start_gen = int(resume["gen"])
+    every = max(1, settings.GEPA_CHECKPOINT_EVERY_GENS)
+    for gen in range(start_gen, max_gens):
         await emit(
             job, "generation_started", {"gen": gen, "population_size": len(population)}
         )
         scored: List[Candidate] = []
         target_model = payload.get("target_model")
-        examples_dicts = [
-            {"input": ex.input, "expected": ex.output, **ex.meta}
-            for ex in pack.examples
-        ]
         for cand in population:
             res = await evaluate_batch(
                 provider,
                 "\n".join(cand.sections),
-                pack.examples,
+                examples,
                 settings,
                 model=target_model,
             )
@@ -168,11 +201,6 @@ async def gepa_loop(job, emit, payload: Dict[str, Any]) -> Dict[str, Any]:
         # === Multi-role reflection sequence ===
         await emit(job, "reflection_started", {"gen": gen})
 
-        # Build a plain dict view of examples for prompts
-        ex_dicts = [
-            {"input": ex.input, "expected": ex.output, **ex.meta}
-            for ex in pack.examples
-        ]
         base_text = "\n".join(best.sections)
 
         # Author drafts an improved prompt
@@ -180,7 +208,7 @@ async def gepa_loop(job, emit, payload: Dict[str, Any]) -> Dict[str, Any]:
             base_text,
             "author",
             gen,
-            examples=ex_dicts,
+            examples=examples_dicts,
             target_model=payload.get("target_model") or settings.TARGET_MODEL_DEFAULT,
         )
 
@@ -189,7 +217,7 @@ async def gepa_loop(job, emit, payload: Dict[str, Any]) -> Dict[str, Any]:
             cast(str, author.get("proposal") or base_text),
             "reviewer",
             gen,
-            examples=ex_dicts,
+            examples=examples_dicts,
             target_model=payload.get("target_model") or settings.TARGET_MODEL_DEFAULT,
         )
 
@@ -198,7 +226,7 @@ async def gepa_loop(job, emit, payload: Dict[str, Any]) -> Dict[str, Any]:
             base_text,
             "planner",
             gen,
-            examples=ex_dicts,
+            examples=examples_dicts,
             target_model=payload.get("target_model") or settings.TARGET_MODEL_DEFAULT,
         )
 
@@ -207,7 +235,7 @@ async def gepa_loop(job, emit, payload: Dict[str, Any]) -> Dict[str, Any]:
             base_text,
             "revision",
             gen,
-            examples=ex_dicts,
+            examples=examples_dicts,
             target_model=payload.get("target_model") or settings.TARGET_MODEL_DEFAULT,
         )
 
@@ -240,6 +268,18 @@ async def gepa_loop(job, emit, payload: Dict[str, Any]) -> Dict[str, Any]:
             stagnation += 1
         if stagnation >= 2:
             break
+        if checkpoint is not None and (gen + 1) % every == 0:
+            await checkpoint(
+                {
+                    "gen": gen + 1,
+                    "population": [asdict(c) for c in population],
+                    "frontier": [asdict(c) for c in frontier],
+                    "lessons": lessons,
+                    "rollouts": rollouts,
+                    "best_score": best_score,
+                    "stagnation": stagnation,
+                }
+            )
     return {
         "best_prompt": (
             "\n".join(frontier[0].sections) if frontier else payload.get("prompt", "")
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+import math
+import time
+from typing import Awaitable, Callable, Deque, Dict, Set, TypeVar
+
+from ..api.metrics import inc, observe
+from ..settings import Settings, get_settings
+
+T = TypeVar("T")
+
+# Unspent hedge credit is capped so a long quiet spell cannot fund a burst of
+# duplicates the moment the upstream slows down.
+_MAX_CREDIT = 10.0
+
+
+class Hedger:
+    """Per-model latency window and hedge budget.
+
+    The hedge delay is the ``quantile`` of recent successful call latencies,
+    so only the slowest few percent of calls get a duplicate. Every primary
+    call earns ``budget`` credit and every hedge spends one, capping extra
+    upstream load at ``budget`` of the request rate.
+    """
+
+    def __init__(
+        self,
+        *,
+        quantile: float,
+        window: int,
+        min_samples: int,
+        min_delay_s: float,
+        budget: float,
+    ) -> None:
+        self.quantile = min(0.999, max(0.5, quantile))
+        self.min_samples = max(1, min_samples)
+        self.min_delay_s = max(0.0, min_delay_s)
+        self.budget = max(0.0, budget)
+        self.credit = 0.0
+        self._latencies: Deque[float] = deque(maxlen=max(self.min_samples, window))
+
+    def record(self, latency: float) -> None:
+        self._latencies.append(latency)
+
+    def delay(self) -> float | None:
+        """Seconds to wait before hedging, or ``None`` while still learning."""
+        if len(self._latencies) < self.min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        idx = min(len(ordered) - 1, math.ceil(self.quantile * len(ordered)) - 1)
+        return max(self.min_delay_s, ordered[idx])
+
+    def earn(self) -> None:
+        self.credit = min(_MAX_CREDIT, self.credit + self.budget)
+
+    def spend(self) -> bool:
+        if self.credit < 1.0:
+            return False
+        self.credit -= 1.0
+        return True
+
+
+_hedgers: Dict[str, Hedger] = {}
+
+
+def get_hedger(model: str, settings: Settings | None = None) -> Hedger:
+    hedger = _hedgers.get(model)
+    if hedger is None:
+        settings = settings or get_settings()
+        hedger = _hedgers[model] = Hedger(
+            quantile=settings.PROVIDER_HEDGE_QUANTILE,
+            window=settings.PROVIDER_HEDGE_WINDOW,
+            min_samples=settings.PROVIDER_HEDGE_MIN_SAMPLES,
+            min_delay_s=settings.PROVIDER_HEDGE_MIN_DELAY_S,
+            budget=settings.PROVIDER_HEDGE_BUDGET,
+        )
+    return hedger
+
+
+async def hedged(fn: Callable[[], Awaitable[T]], hedger: Hedger) -> T:
+    """Run ``fn``; if it outlives the hedge delay, race a second copy.
+
+    The first successful result wins and the other call is cancelled. If one
+    copy fails the other is still awaited, so a hedge never turns a success
+    into a failure.
+    """
+    delay = hedger.delay()
+    hedger.earn()
+    started: Dict[asyncio.Future[T], float] = {}
+
+    def launch() -> asyncio.Future[T]:
+        task = asyncio.ensure_future(fn())
+        started[task] = time.monotonic()
+        return task
+
+    primary = launch()
+    pending: Set[asyncio.Future[T]] = {primary}
+    try:
+        if delay is not None:
+            observe("provider_hedge_delay_ms", delay * 1000.0)
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                if hedger.spend():
+                    inc("provider_hedges_fired")
+                    pending.add(launch())
+                else:
+                    inc("provider_hedges_skipped")
+        errors: list[BaseException] = []
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                exc = task.exception()
+                if exc is not None:
+                    errors.append(exc)
+                    continue
+                hedger.record(time.monotonic() - started[task])
+                if task is not primary:
+                    inc("provider_hedges_won")
+                return task.result()
+        raise errors[0]
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+__all__ = ["Hedger", "get_hedger", "hedged"]
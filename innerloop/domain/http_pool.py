@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import suppress
+import logging
+from typing import Dict, Iterable
+
+import httpx
+
+from ..api.metrics import inc, set_gauge
+from ..settings import Settings, get_settings
+from .concurrency import _gauge_suffix
+
+logger = logging.getLogger(__name__)
+
+
+def http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _origin(url: str | httpx.URL) -> str:
+    u = httpx.URL(url)
+    port = f":{u.port}" if u.port else ""
+    return f"{u.scheme}://{u.host}{port}"
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """One connection pool per upstream origin, shared by every provider client.
+
+    Provider clients carry their own headers and timeouts but route through
+    this transport, so target, judge and env calls to the same host reuse warm
+    TCP/TLS connections (multiplexed streams with HTTP/2). Closing a provider
+    client leaves the pool open; :func:`close_pools` closes it at shutdown.
+    """
+
+    def __init__(self, origin: str, inner: httpx.AsyncHTTPTransport) -> None:
+        self.origin = origin
+        self.inner = inner
+        self._suffix = _gauge_suffix(httpx.URL(origin).host)
+        self._requests = 0
+        self._active = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        inc("provider_pool_requests")
+        self._requests += 1
+        self._active += 1
+        try:
+            return await self.inner.handle_async_request(request)
+        finally:
+            self._active -= 1
+            self.publish()
+
+    def stats(self) -> Dict[str, int]:
+        """Requests sent through this pool and those awaiting response headers.
+
+        Counted here rather than read from httpcore, whose pool state is private.
+        """
+        return {"requests": self._requests, "active": self._active}
+
+    def publish(self) -> None:
+        for name, value in self.stats().items():
+            set_gauge(f"provider_pool_{name}_{self._suffix}", value)
+
+    async def aclose(self) -> None:
+        # Shared: owned by the pool manager, not by any one client.
+        return None
+
+
+class HostPools:
+    def __init__(self) -> None:
+        self._transports: Dict[str, _SharedTransport] = {}
+
+    def transport_for(
+        self, url: str | httpx.URL, settings: Settings | None = None
+    ) -> _SharedTransport:
+        origin = _origin(url)
+        shared = self._transports.get(origin)
+        if shared is None:
+            settings = settings or get_settings()
+            http2 = settings.PROVIDER_HTTP2
+            if http2 and not http2_available():
+                logger.warning("PROVIDER_HTTP2 needs the h2 package; using HTTP/1.1")
+                http2 = False
+            inner = httpx.AsyncHTTPTransport(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=settings.PROVIDER_POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.PROVIDER_POOL_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.PROVIDER_POOL_KEEPALIVE_S,
+                ),
+            )
+            shared = self._transports[origin] = _SharedTransport(origin, inner)
+        return shared
+
+    async def warm_up(self, urls: Iterable[str], connections: int = 1) -> None:
+        """Open ``connections`` keepalive connections to each origin."""
+        origins = dict.fromkeys(_origin(u) for u in urls)
+        for origin in origins:
+            async with httpx.AsyncClient(
+                transport=self.transport_for(origin), timeout=httpx.Timeout(5.0)
+            ) as client:
+                results = await asyncio.gather(
+                    *(client.head(origin) for _ in range(max(1, connections))),
+                    return_exceptions=True,
+                )
+            failed = [r for r in results if isinstance(r, Exception)]
+            if failed:
+                inc("provider_pool_warmup_failures", len(failed))
+                logger.warning("pool warm-up for %s failed: %s", origin, failed[0])
+            self._transports[origin].publish()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {origin: t.stats() for origin, t in self._transports.items()}
+
+    async def aclose(self) -> None:
+        transports, self._transports = self._transports, {}
+        for shared in transports.values():
+            with suppress(Exception):
+                await shared.inner.aclose()
+
+
+_pools = HostPools()
+
+
+def get_transport(
+    url: str | httpx.URL, settings: Settings | None = None
+) -> _SharedTransport:
+    return _pools.transport_for(url, settings)
+
+
+def provider_origins(settings: Settings | None = None) -> list[str]:
+    """Upstream API roots the configured providers will call."""
+    settings = settings or get_settings()
+    if settings.USE_MODEL_STUB:
+        return []
+    urls = []
+    if settings.OPENROUTER_API_KEY:
+        urls.append(settings.OPENROUTER_BASE_URL)
+    if settings.JUDGE_PROVIDER == "openai" and settings.OPENAI_API_KEY:
+        urls.append(settings.OPENAI_BASE_URL)
+    return urls
+
+
+async def warm_up_pools(settings: Settings | None = None) -> None:
+    settings = settings or get_settings()
+    if settings.PROVIDER_POOL_WARMUP <= 0:
+        return
+    await _pools.warm_up(provider_origins(settings), settings.PROVIDER_POOL_WARMUP)
+
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    return _pools.stats()
+
+
+async def close_pools() -> None:
+    await _pools.aclose()
+
+
+__all__ = [
+    "HostPools",
+    "close_pools",
+    "get_transport",
+    "http2_available",
+    "pool_stats",
+    "provider_origins",
+    "warm_up_pools",
+]
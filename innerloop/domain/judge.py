@@ -3,42 +3,141 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
-import time
 from typing import Any, Dict, Iterable, List, Tuple
 
 from ..api.metrics import inc
 from ..settings import Settings, get_settings
 from .engine import get_judge_provider
-from .judge_prompts import PAIRWISE_TEMPLATE
+from .judge_prompts import (
+    PAIRWISE_CANDIDATES,
+    PAIRWISE_INSTRUCTIONS,
+    PAIRWISE_TASK,
+    PAIRWISE_TEMPLATE_VERSION,
+)
+from .messages import PromptLayout
+from .ratelimit import AsyncTokenBucket
 
 log = logging.getLogger(__name__)
 
 
-def _build_judge_prompt(
+DEFAULT_OBJECTIVES = ["brevity", "diversity", "coverage"]
+
+
+def _examples_parts(examples: List[dict] | None) -> List[str]:
+    if not examples:
+        return []
+    ex_str = "; ".join(
+        f"input: {e.get('input')}, expected: {e.get('expected', '')}"
+        for e in examples
+    )
+    return [
+        f"Examples: {ex_str}.",
+        "Coverage should reflect how well candidate addresses prompt and examples.",
+    ]
+
+
+def _judge_layout(
     prompt: str,
     candidate: str,
     examples: List[dict] | None,
     objectives: List[str] | None,
-) -> str:
+) -> PromptLayout:
     obj_list = ", ".join(objectives or [])
-    parts = [
-        "You are a strict judge. Score the candidate answer for each objective (0-10).",
-        'Return JSON on one line: {"scores":{...},"justification":"<=12 words"}.',
-        "No chain-of-thought beyond the short justification.",
-        f"Objectives: {obj_list if obj_list else 'brevity, diversity, coverage'}.",
-        f"Prompt: {prompt}",
-        f"Candidate: {candidate}",
-    ]
-    if examples:
-        ex_str = "; ".join(
-            f"input: {e.get('input')}, expected: {e.get('expected', '')}"
-            for e in examples
-        )
-        parts.append(f"Examples: {ex_str}.")
-        parts.append(
-            "Coverage should reflect how well candidate addresses prompt and examples."
-        )
-    return "\n".join(parts)
+    system = "\n".join(
+        [
+            "You are a strict judge. Score the candidate answer for each objective (0-10).",
+            'Return JSON on one line: {"scores":{...},"justification":"<=12 words"}.',
+            "No chain-of-thought beyond the short justification.",
+            f"Objectives: {obj_list if obj_list else 'brevity, diversity, coverage'}.",
+        ]
+    )
+    stable = (f"Prompt: {prompt}", *_examples_parts(examples))
+    return PromptLayout(system, stable, f"Candidate: {candidate}")
+
+
+def _batch_judge_layout(
+    prompt: str,
+    candidates: List[str],
+    examples: List[dict] | None,
+    objectives: List[str] | None,
+) -> PromptLayout:
+    obj_list = ", ".join(objectives or [])
+    system = "\n".join(
+        [
+            "You are a strict judge. Score EACH candidate answer for each objective (0-10).",
+            'Return JSON on one line: {"results":[{"id":"c0","scores":{...},'
+            '"justification":"<=12 words"},...]} with exactly one entry per candidate id.',
+            "Score candidates independently. No chain-of-thought beyond the short justifications.",
+            f"Objectives: {obj_list if obj_list else 'brevity, diversity, coverage'}.",
+        ]
+    )
+    stable = (f"Prompt: {prompt}", *_examples_parts(examples))
+    variable = "\n".join(f"Candidate c{i}: {c}" for i, c in enumerate(candidates))
+    return PromptLayout(system, stable, variable)
+
+
+def _approx_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _stub_scores(
+    prompt: str, candidate: str, examples: List[dict] | None
+) -> Dict[str, Any]:
+    words = candidate.split()
+    uniq = set(words)
+    brevity = 10 - (len(candidate) % 10)
+    diversity = int(10 * (len(uniq) / len(words))) if words else 0
+    ref_tokens = set(prompt.split())
+    for ex in examples or []:
+        ref_tokens.update(str(ex.get("input", "")).split())
+        ref_tokens.update(str(ex.get("expected", "")).split())
+    overlap = len(ref_tokens & set(words))
+    coverage = int(10 * overlap / max(1, len(ref_tokens)))
+    return {
+        "scores": {
+            "brevity": max(0, min(10, brevity)),
+            "diversity": max(0, min(10, diversity)),
+            "coverage": max(0, min(10, coverage)),
+        },
+        "justification": "stub",
+    }
+
+
+def _judge_kwargs(provider, settings: Settings, max_tokens: int) -> Dict[str, Any]:
+    complete_kwargs: Dict[str, Any] = {
+        "model": settings.JUDGE_MODEL_ID,
+        "temperature": 0.0,
+        "max_tokens": max_tokens,
+    }
+    if "seed" in getattr(provider, "SUPPORTED_KWARGS", ()):  # providers supporting seed
+        complete_kwargs["seed"] = 0
+    return complete_kwargs
+
+
+def _parse_scores(data: Dict[str, Any], objectives: List[str]) -> Dict[str, Any]:
+    # With no explicit objectives the prompt asks for the defaults; read those.
+    names = objectives or DEFAULT_OBJECTIVES
+    raw = data.get("scores", {})
+    scores: Dict[str, float] = {}
+    for obj in names:
+        try:
+            val = float(raw.get(obj, 0.0))
+        except Exception:
+            val = 0.0
+        scores[obj] = max(0.0, min(10.0, val))
+    justification = str(data.get("justification", ""))[:128]
+    return {"scores": scores, "justification": justification}
+
+
+def _complete_scores(entry: Dict[str, Any], objectives: List[str]) -> bool:
+    """True when ``entry`` scores every requested objective with a number."""
+    raw = entry.get("scores")
+    if not isinstance(raw, dict):
+        return False
+    return all(
+        isinstance(raw.get(obj), (int, float)) and not isinstance(raw[obj], bool)
+        for obj in objectives or DEFAULT_OBJECTIVES
+    )
 
 
 async def judge_scores(
@@ -46,60 +145,146 @@ async def judge_scores(
     candidate: str,
     examples: List[dict] | None,
     objectives: List[str] | None,
+    *,
+    timeout: float | None = None,
 ) -> Dict[str, Any]:
+    """Score one candidate; ``timeout`` bounds the provider call, not the QPS wait."""
     settings = get_settings()
     provider = get_judge_provider(settings)
     objectives = objectives or []
     if settings.USE_MODEL_STUB:
-        words = candidate.split()
-        uniq = set(words)
-        brevity = 10 - (len(candidate) % 10)
-        diversity = int(10 * (len(uniq) / len(words))) if words else 0
-        ref_tokens = set(prompt.split())
-        for ex in examples or []:
-            ref_tokens.update(str(ex.get("input", "")).split())
-            ref_tokens.update(str(ex.get("expected", "")).split())
-        overlap = len(ref_tokens & set(words))
-        coverage = int(10 * overlap / max(1, len(ref_tokens)))
-        return {
-            "scores": {
-                "brevity": max(0, min(10, brevity)),
-                "diversity": max(0, min(10, diversity)),
-                "coverage": max(0, min(10, coverage)),
-            },
-            "justification": "stub",
-        }
-    else:
-        message = _build_judge_prompt(prompt, candidate, examples, objectives)
-        complete_kwargs = {
-            "model": settings.JUDGE_MODEL_ID,
-            "temperature": 0.0,
-            "max_tokens": 128,
-        }
-        if "seed" in getattr(
-            provider, "SUPPORTED_KWARGS", ()
-        ):  # providers supporting seed
-            complete_kwargs["seed"] = 0
-        try:
-            raw = await provider.complete(message, **complete_kwargs)
-            data = json.loads(raw)
-        except Exception:
-            inc("judge_failures")
-            return {"scores": {}, "justification": "", "unavailable": True}
-        scores: Dict[str, float] = {}
-        for obj in objectives:
-            try:
-                val = float(data.get("scores", {}).get(obj, 0.0))
-            except Exception:
-                val = 0.0
-            scores[obj] = max(0.0, min(10.0, val))
-        justification = str(data.get("justification", ""))[:128]
-        return {"scores": scores, "justification": justification}
+        return _stub_scores(prompt, candidate, examples)
+    layout = _judge_layout(prompt, candidate, examples, objectives)
+    complete_kwargs = _judge_kwargs(provider, settings, 128)
+    complete_kwargs.update(layout.kwargs_for(provider, settings))
+    await get_judge_limiter(settings).acquire()
+    try:
+        raw = await asyncio.wait_for(
+            provider.complete(layout.text(), **complete_kwargs), timeout
+        )
+        data = json.loads(raw)
+    except Exception:
+        inc("judge_failures")
+        return {"scores": {}, "justification": "", "unavailable": True}
+    return _parse_scores(data, objectives)
+
+
+def _split_batches(
+    overhead: int, candidates: List[str], max_k: int, budget: int
+) -> List[List[int]]:
+    """Group candidate indices into batches of at most ``max_k`` within ``budget`` tokens."""
+    batches: List[List[int]] = []
+    cur: List[int] = []
+    used = overhead
+    for i, cand in enumerate(candidates):
+        cost = _approx_tokens(cand) + 4
+        if cur and (len(cur) >= max_k or used + cost > budget):
+            batches.append(cur)
+            cur, used = [], overhead
+        cur.append(i)
+        used += cost
+    if cur:
+        batches.append(cur)
+    return batches
+
+
+async def _score_batch(
+    prompt: str,
+    candidates: List[str],
+    examples: List[dict] | None,
+    objectives: List[str],
+    timeout: float | None = None,
+) -> List[Dict[str, Any]]:
+    if len(candidates) == 1:
+        return [
+            await judge_scores(
+                prompt, candidates[0], examples, objectives, timeout=timeout
+            )
+        ]
+    settings = get_settings()
+    provider = get_judge_provider(settings)
+    layout = _batch_judge_layout(prompt, candidates, examples, objectives)
+    complete_kwargs = _judge_kwargs(provider, settings, 32 + 64 * len(candidates))
+    complete_kwargs.update(layout.kwargs_for(provider, settings))
+    await get_judge_limiter(settings).acquire()
+    inc("judge_batch_calls")
+    results: List[Dict[str, Any] | None] = [None] * len(candidates)
+    try:
+        raw = await asyncio.wait_for(
+            provider.complete(layout.text(), **complete_kwargs), timeout
+        )
+        entries = json.loads(raw)["results"]
+        by_id = {str(e.get("id")): e for e in entries if isinstance(e, dict)}
+    except asyncio.TimeoutError:
+        # Out of time for this batch: don't spend another timeout per single.
+        inc("judge_failures")
+        return [{"scores": {}, "justification": "", "unavailable": True}] * len(
+            candidates
+        )
+    except Exception:
+        inc("judge_failures")
+        by_id = {}
+    for i in range(len(candidates)):
+        entry = by_id.get(f"c{i}")
+        if entry is not None and _complete_scores(entry, objectives):
+            results[i] = _parse_scores(entry, objectives)
+    missing = [i for i, r in enumerate(results) if r is None]
+    if missing:
+        # Anything the batch did not answer cleanly is re-scored on its own.
+        inc("judge_batch_fallbacks", len(missing))
+        singles = await asyncio.gather(
+            *(
+                judge_scores(
+                    prompt, candidates[i], examples, objectives, timeout=timeout
+                )
+                for i in missing
+            )
+        )
+        for i, res in zip(missing, singles):
+            results[i] = res
+    return [r for r in results if r is not None]
+
+
+async def judge_scores_batch(
+    prompt: str,
+    candidates: List[str],
+    examples: List[dict] | None,
+    objectives: List[str] | None,
+    *,
+    timeout: float | None = None,
+) -> List[Dict[str, Any]]:
+    """Score many candidates, up to ``JUDGE_BATCH_SIZE`` per judge call.
+
+    Results line up with ``candidates``. Batches are split further to keep
+    each request under ``JUDGE_BATCH_MAX_TOKENS``. ``timeout`` bounds each
+    provider call; time spent queued on the judge QPS limiter is not counted.
+    """
+    settings = get_settings()
+    objectives = objectives or []
+    if settings.USE_MODEL_STUB:
+        return [_stub_scores(prompt, c, examples) for c in candidates]
+    overhead = _approx_tokens(
+        _batch_judge_layout(prompt, [], examples, objectives).text()
+    )
+    batches = _split_batches(
+        overhead,
+        candidates,
+        max(1, settings.JUDGE_BATCH_SIZE),
+        settings.JUDGE_BATCH_MAX_TOKENS,
+    )
+    scored = await asyncio.gather(
+        *(
+            _score_batch(
+                prompt, [candidates[i] for i in idx], examples, objectives, timeout
+            )
+            for idx in batches
+        )
+    )
+    return [res for batch in scored for res in batch]
 
 
 CALLS = 0
-_tokens = 1.0
-_last = 0.0
+_limiter: AsyncTokenBucket | None = None
 
 
 def _norm(task: str, a: str, b: str) -> tuple[str, str, str]:
@@ -111,23 +296,40 @@ def _norm(task: str, a: str, b: str) -> tuple[str, str, str]:
         return (task or "", y, x)
 
 
-async def _throttle():
-    s = get_settings()
-    global _tokens, _last
-    now = time.monotonic()
-    _tokens = min(1.0, _tokens + (now - _last) * (s.JUDGE_QPS_MAX or 1.0))
-    _last = now
-    if _tokens < 1.0:
-        await asyncio.sleep((1.0 - _tokens) / max(1e-6, s.JUDGE_QPS_MAX))
-        _tokens = 1.0
+def get_judge_limiter(settings: Settings | None = None) -> AsyncTokenBucket:
+    """Process-wide judge QPS limiter, rebuilt when its settings change."""
+    global _limiter
+    s = settings or get_settings()
+    if (
+        _limiter is None
+        or _limiter.rate != s.JUDGE_QPS_MAX
+        or _limiter.burst != max(1.0, s.JUDGE_QPS_BURST)
+    ):
+        _limiter = AsyncTokenBucket(
+            s.JUDGE_QPS_MAX, s.JUDGE_QPS_BURST, metric="judge_qps_wait_ms"
+        )
+    return _limiter
+
+
+def _flip(winner: Any) -> Any:
+    return {"A": "B", "B": "A"}.get(winner, winner)
 
 
 async def judge_pair(task: str, a: str, b: str, store=None) -> Dict[str, Any]:
     global CALLS
     key = _norm(task, a, b)
+    # The cache is keyed on the normalized (sorted) pair; winners are stored
+    # relative to that order and flipped back for callers passing (b, a).
+    swapped = key[1] != (a or "").strip()
+    cache_id = {
+        "model": get_settings().JUDGE_MODEL_ID,
+        "template": PAIRWISE_TEMPLATE_VERSION,
+    }
     if store:
-        cached = await store.get_judge_cached(*key)
+        cached = await store.get_judge_cached(*key, **cache_id)
         if cached:
+            if swapped:
+                cached = {**cached, "winner": _flip(cached.get("winner"))}
             return cached
     s = get_settings()
     if s.USE_MODEL_STUB:
@@ -135,21 +337,18 @@ async def judge_pair(task: str, a: str, b: str, store=None) -> Dict[str, Any]:
         winner = "A" if (len(a), a) <= (len(b), b) else "B"
         res = {"winner": winner, "confidence": 0.7, "justification": "stub"}
     else:
-        await _throttle()
+        await get_judge_limiter(s).acquire()
         CALLS += 1
         provider = get_judge_provider(s)
-        prompt = PAIRWISE_TEMPLATE.format(task=task, a=a, b=b)
+        layout = PromptLayout(
+            PAIRWISE_INSTRUCTIONS,
+            (PAIRWISE_TASK.format(task=task),),
+            PAIRWISE_CANDIDATES.format(a=a, b=b),
+        )
         try:
-            complete_kwargs = {
-                "model": s.JUDGE_MODEL_ID,
-                "temperature": 0.0,
-                "max_tokens": 64,
-            }
-            if "seed" in getattr(
-                provider, "SUPPORTED_KWARGS", ()
-            ):  # guard for providers w/ seed
-                complete_kwargs["seed"] = 0
-            out = await provider.complete(prompt=prompt, **complete_kwargs)
+            complete_kwargs = _judge_kwargs(provider, s, 64)
+            complete_kwargs.update(layout.kwargs_for(provider, s))
+            out = await provider.complete(prompt=layout.text(), **complete_kwargs)
         except Exception:
             inc("judge_failures")
             winner = "A" if len(a) <= len(b) else "B"
@@ -174,7 +373,11 @@ async def judge_pair(task: str, a: str, b: str, store=None) -> Dict[str, Any]:
             confidence = float(confidence_val)
         except (TypeError, ValueError):
             confidence = 0.5
-        await store.set_judge_cached(*key, res["winner"], confidence)
+        verdict = res.get("winner")
+        if isinstance(verdict, str):
+            await store.set_judge_cached(
+                *key, _flip(verdict) if swapped else verdict, confidence, **cache_id
+            )
     return res
 
 
@@ -223,7 +426,7 @@ class JudgeLLM:
     Minimal async adapter around provider-backed judge calls.
 
     - ``score`` uses ``judge_scores`` and sums objective scores into a scalar.
-    - ``rank`` scores each proposal independently and sorts results descending.
+    - ``rank`` scores proposals concurrently and sorts results descending.
 
     This keeps network use centralized and avoids changing optimize_engine APIs.
     """
@@ -241,15 +444,54 @@ class JudgeLLM:
         data = await judge_scores(prompt, proposal, examples=None, objectives=None)
         return float(sum(data.get("scores", {}).values()))
 
+    async def _score_chunk(self, prompt: str, chunk: List[str]) -> List[float | None]:
+        try:
+            results = await judge_scores_batch(
+                prompt,
+                chunk,
+                examples=None,
+                objectives=None,
+                timeout=self._settings.JUDGE_RANK_CALL_TIMEOUT_S,
+            )
+        except Exception:
+            inc("judge_rank_failures", len(chunk))
+            return [None] * len(chunk)
+        out: List[float | None] = []
+        for r in results:
+            if r.get("unavailable"):
+                inc("judge_rank_failures")
+                out.append(None)
+            else:
+                out.append(float(sum(r.get("scores", {}).values())))
+        return out
+
     async def rank(
         self, *, prompt: str, proposals: Iterable[str], rubric: str | None = None
     ) -> List[Tuple[str, float]]:
-        scored: List[Tuple[str, float]] = []
-        for p in proposals:
-            val = await self.score(prompt=prompt, proposal=str(p), rubric=rubric)
-            scored.append((str(p), float(val)))
-        scored.sort(key=lambda t: t[1], reverse=True)
-        return scored
+        """Score all proposals concurrently and sort best first.
+
+        Each judge call (one proposal, or a batch when ``JUDGE_BATCH_SIZE`` > 1)
+        gets ``JUDGE_RANK_CALL_TIMEOUT_S`` once it clears the judge QPS limiter.
+        Proposals whose score failed are listed after every scored one with
+        0.0; if nothing could be scored the call raises so callers can fall
+        back. Ties keep input order.
+        """
+        items = [str(p) for p in proposals]
+        if not items:
+            return []
+        k = max(1, self._settings.JUDGE_BATCH_SIZE)
+        chunks = [items[i : i + k] for i in range(0, len(items), k)]
+        scored_chunks = await asyncio.gather(
+            *(self._score_chunk(prompt, chunk) for chunk in chunks)
+        )
+        scores = [v for chunk in scored_chunks for v in chunk]
+        if all(v is None for v in scores):
+            raise RuntimeError("judge unavailable for every proposal")
+        order = sorted(
+            range(len(items)),
+            key=lambda i: (scores[i] is None, -(scores[i] or 0.0), i),
+        )
+        return [(items[i], scores[i] or 0.0) for i in order]
 
 
 def get_judge(settings: Settings | None = None):
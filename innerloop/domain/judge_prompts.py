@@ -1,23 +1,27 @@
+# Bump whenever the pairwise prompt changes so cached verdicts are not reused.
+PAIRWISE_TEMPLATE_VERSION = "2"
+
 # Deterministic pairwise judge; justification capped at 12 words.
-PAIRWISE_TEMPLATE = """You are GPT-5 acting as a deterministic evaluation judge.
-Evaluate which candidate best satisfies the task below.
+# Laid out stable-first: instructions, then the task, then the candidates.
+PAIRWISE_INSTRUCTIONS = """You are GPT-5 acting as a deterministic evaluation judge.
+Evaluate which candidate best satisfies the task given below.
 Ignore style; reward clarity, faithfulness, and specificity.
 If tied, prefer the shorter candidate.
 
-TASK:
-{task}
-
-CANDIDATE A:
-{a}
-
-CANDIDATE B:
-{b}
-
 Output EXACTLY one JSON object on a single line (no prose):
-{{"winner":"A","confidence":0.00,"justification":"<=12 words"}}
+{"winner":"A","confidence":0.00,"justification":"<=12 words"}
 Rules:
 - "winner" MUST be "A" or "B".
 - "confidence" MUST be a number in [0,1].
 - "justification" MUST be <=12 words; no chain-of-thought.
 Example:
-{{"winner":"A","confidence":0.73,"justification":"clear, specific, follows instructions"}}"""
+{"winner":"A","confidence":0.73,"justification":"clear, specific, follows instructions"}"""
+
+PAIRWISE_TASK = """TASK:
+{task}"""
+
+PAIRWISE_CANDIDATES = """CANDIDATE A:
+{a}
+
+CANDIDATE B:
+{b}"""
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from ..settings import Settings, get_settings
+
+
+@dataclass(frozen=True)
+class PromptLayout:
+    """A request split into a stable prefix and a variable suffix.
+
+    Providers cache prompts by exact prefix, so everything that repeats across
+    calls (instructions, rubric, examples, the task) goes first and the part
+    that changes per call (the candidate, the example input) goes last.
+    """
+
+    system: str
+    stable: Tuple[str, ...] = ()
+    variable: str = ""
+
+    def prefix(self) -> str:
+        return "\n".join(p for p in (self.system, *self.stable) if p)
+
+    def text(self) -> str:
+        """Single-string form for providers that only take a prompt."""
+        return "\n".join(p for p in (self.prefix(), self.variable) if p)
+
+    def messages(self, cache_hints: bool = False) -> List[Dict[str, Any]]:
+        prefix = self.prefix()
+        content: Any = prefix
+        if cache_hints:
+            # Explicit breakpoint for providers that need one (e.g. Anthropic
+            # via OpenRouter); OpenAI-style automatic caching ignores it.
+            content = [
+                {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}}
+            ]
+        msgs: List[Dict[str, Any]] = [{"role": "system", "content": content}]
+        if self.variable:
+            msgs.append({"role": "user", "content": self.variable})
+        return msgs
+
+    def kwargs_for(
+        self, provider: object, settings: Settings | None = None
+    ) -> Dict[str, Any]:
+        """``messages=`` for providers that accept it, else nothing."""
+        if "messages" not in getattr(provider, "SUPPORTED_KWARGS", ()):
+            return {}
+        s = settings or get_settings()
+        return {"messages": self.messages(s.PROVIDER_CACHE_HINTS)}
+
+
+__all__ = ["PromptLayout"]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Callable, List, Sequence, TypeVar
+import asyncio
+from typing import Any, Callable, Dict, List, Sequence, Tuple, TypeVar
 
 from ..settings import get_settings
 from .judge import get_judge, judge_pair
@@ -49,25 +50,85 @@ def pareto_filter(
     return [item for item, _ in front[:n]]
 
 
-async def tournament_rank(cands: List[str], task: str, k: int) -> List[str]:
+def _match_winner(res: Dict[str, Any], a: str, b: str) -> str:
+    winner = res.get("winner")
+    if winner == "B" or (winner == b and winner != "A"):
+        return b
+    return a
+
+
+async def _play_group(
+    group: List[str], task: str, store, memo: Dict[Tuple[str, str], str]
+) -> Tuple[str, List[str]]:
+    """Chain matches through ``group``; return its champion and the winners of each match."""
+    champ = group[0]
+    wins: List[str] = []
+    for challenger in group[1:]:
+        if champ == challenger:
+            continue
+        pair = (champ, challenger)
+        if pair not in memo:
+            res = await judge_pair(task, champ, challenger, store)
+            memo[pair] = _match_winner(res, champ, challenger)
+        champ = memo[pair]
+        wins.append(champ)
+    return champ, wins
+
+
+async def _run_tournament(
+    cands: List[str], task: str, k: int, store
+) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Single elimination in groups of ``k``; groups within a round run concurrently.
+
+    Returns the last round each candidate reached and its match wins. The
+    judge rate limiter bounds how many of the concurrent matches hit the API.
+    """
+    reached = {c: 0 for c in cands}
+    wins = {c: 0 for c in cands}
+    memo: Dict[Tuple[str, str], str] = {}
+    pool = list(dict.fromkeys(cands))
+    rnd = 0
+    while len(pool) > 1:
+        groups = [pool[i : i + k] for i in range(0, len(pool), k)]
+        results = await asyncio.gather(
+            *(_play_group(g, task, store, memo) for g in groups)
+        )
+        rnd += 1
+        pool = []
+        for champ, won in results:
+            pool.append(champ)
+            reached[champ] = rnd
+            for w in won:
+                wins[w] += 1
+    return reached, wins
+
+
+async def tournament_rank(
+    cands: List[str], task: str, k: int, store=None
+) -> List[str]:
     if k < 2 or len(cands) < 2:
         return list(cands)
-    pool = list(cands)
-    while len(pool) > 1:
-        next_round: List[str] = []
-        for i in range(0, len(pool), k):
-            group = pool[i : i + k]
-            champ = group[0]
-            for challenger in group[1:]:
-                res = await judge_pair(task, champ, challenger)
-                champ = res.get("winner", champ)
-            next_round.append(champ)
-        pool = next_round
-    champion = pool[0]
+    reached, _ = await _run_tournament(cands, task, k, store)
+    champion = max(cands, key=lambda c: reached[c])
     rest = [c for c in cands if c != champion]
     return [champion] + rest
 
 
+async def tournament_rank_full(
+    cands: List[str], task: str, k: int, store=None
+) -> List[str]:
+    """Like :func:`tournament_rank` but orders every candidate.
+
+    Candidates are ranked by the round they were knocked out in, then by match
+    wins, then by input order; no extra judge calls are made.
+    """
+    if k < 2 or len(cands) < 2:
+        return list(cands)
+    reached, wins = await _run_tournament(cands, task, k, store)
+    order = {c: i for i, c in reversed(list(enumerate(cands)))}
+    return sorted(order, key=lambda c: (-reached[c], -wins[c], order[c]))
+
+
 async def rank_candidates(
     items: List[str],
     objectives: List[Callable[[str], float]] | None,
@@ -113,6 +174,7 @@ async def pareto_v2(
 __all__ = [
     "pareto_filter",
     "tournament_rank",
+    "tournament_rank_full",
     "rank_candidates",
     "recombine",
     "pareto_v2",
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import math
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Set, Tuple
+
+from ..api.metrics import inc
+from .judge import judge_pair
+
+JudgeFn = Callable[..., Awaitable[Dict[str, Any]]]
+
+# Each candidate gets one virtual win and one virtual loss against a reference
+# of strength 1 so the fit stays finite for undefeated / winless candidates.
+_PRIOR_GAMES = 1.0
+
+
+@dataclass
+class RankResult:
+    order: List[str]
+    strengths: Dict[str, float]
+    comparisons: int
+    round_robin: int
+    stable: bool
+    matches: List[Tuple[str, str, float]] = field(default_factory=list)
+
+    @property
+    def saved(self) -> int:
+        """Judge calls avoided compared with judging every pair once."""
+        return max(0, self.round_robin - self.comparisons)
+
+
+def fit_bradley_terry(
+    cands: Sequence[str],
+    matches: Sequence[Tuple[str, str, float]],
+    iters: int = 100,
+    tol: float = 1e-6,
+) -> Dict[str, float]:
+    """Fit Bradley–Terry strengths with the MM algorithm.
+
+    ``matches`` holds ``(winner, loser, confidence)``; a judgement with
+    confidence ``c`` counts as ``c`` of a win for the winner and ``1 - c`` for
+    the loser, so a coin-flip verdict moves nothing.
+    """
+    idx = {c: i for i, c in enumerate(cands)}
+    n = len(cands)
+    wins = [_PRIOR_GAMES / 2] * n
+    games: List[Dict[int, float]] = [dict() for _ in range(n)]
+    for winner, loser, conf in matches:
+        w, lo = idx[winner], idx[loser]
+        c = min(1.0, max(0.5, conf))
+        wins[w] += c
+        wins[lo] += 1.0 - c
+        games[w][lo] = games[w].get(lo, 0.0) + 1.0
+        games[lo][w] = games[lo].get(w, 0.0) + 1.0
+    p = [1.0] * n
+    for _ in range(iters):
+        new = []
+        for i in range(n):
+            denom = _PRIOR_GAMES / (p[i] + 1.0)
+            denom += sum(cnt / (p[i] + p[j]) for j, cnt in games[i].items())
+            new.append(wins[i] / denom)
+        # Normalise to geometric mean 1; BT strengths are scale-free.
+        g = math.exp(sum(math.log(x) for x in new) / n)
+        new = [x / g for x in new]
+        delta = max(abs(a - b) for a, b in zip(new, p))
+        p = new
+        if delta < tol:
+            break
+    return {c: p[idx[c]] for c in cands}
+
+
+def _swiss_pairs(order: List[str], played: Set[frozenset]) -> List[Tuple[str, str]]:
+    """Pair neighbours in the current standings, skipping pairs already judged."""
+    pairs: List[Tuple[str, str]] = []
+    free = list(order)
+    while free:
+        a = free.pop(0)
+        for j, b in enumerate(free):
+            if frozenset((a, b)) not in played:
+                pairs.append((a, b))
+                free.pop(j)
+                break
+    return pairs
+
+
+async def bt_rank(
+    cands: Sequence[str],
+    task: str,
+    *,
+    top_k: int = 1,
+    store=None,
+    stable_rounds: int = 2,
+    max_rounds: int | None = None,
+    judge: JudgeFn | None = None,
+) -> RankResult:
+    """Rank candidates with Swiss-paired judge comparisons and a BT fit.
+
+    Each round pairs neighbours in the current standings (the most informative
+    comparisons) and judges them concurrently. Ranking stops once the top-k
+    has not changed for ``stable_rounds`` rounds, no unplayed neighbour pairs
+    remain, or ``max_rounds`` is reached.
+    """
+    judge = judge or judge_pair
+    pool = list(dict.fromkeys(cands))
+    n = len(pool)
+    round_robin = n * (n - 1) // 2
+    if n < 2:
+        return RankResult(pool, {c: 1.0 for c in pool}, 0, round_robin, True)
+    top_k = max(1, min(top_k, n))
+    if max_rounds is None:
+        max_rounds = math.ceil(math.log2(n)) + stable_rounds + 1
+    first_seen = {c: i for i, c in enumerate(pool)}
+    matches: List[Tuple[str, str, float]] = []
+    played: Set[frozenset] = set()
+    strengths = {c: 1.0 for c in pool}
+    order = list(pool)
+    prev_top: List[str] | None = None
+    streak = 0
+    stable = False
+
+    async def play(a: str, b: str) -> Tuple[str, str, float]:
+        res = await judge(task, a, b, store=store)
+        try:
+            conf = float(res.get("confidence", 0.5))
+        except (TypeError, ValueError):
+            conf = 0.5
+        if res.get("winner") == "B":
+            return b, a, conf
+        return a, b, conf
+
+    for _ in range(max_rounds):
+        pairs = _swiss_pairs(order, played)
+        if not pairs:
+            stable = True
+            break
+        played.update(frozenset(p) for p in pairs)
+        matches.extend(await asyncio.gather(*(play(a, b) for a, b in pairs)))
+        strengths = fit_bradley_terry(pool, matches)
+        order = sorted(pool, key=lambda c: (-strengths[c], first_seen[c]))
+        top = order[:top_k]
+        streak = streak + 1 if top == prev_top else 0
+        prev_top = top
+        if streak >= stable_rounds:
+            stable = True
+            break
+    result = RankResult(order, strengths, len(matches), round_robin, stable, matches)
+    inc("ranking_comparisons", result.comparisons)
+    inc("ranking_calls_saved", result.saved)
+    return result
+
+
+__all__ = ["RankResult", "bt_rank", "fit_bradley_terry"]
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Callable
+
+from ..api.metrics import observe
+
+
+class AsyncTokenBucket:
+    """Token bucket shared by concurrent coroutines.
+
+    Callers queue on an ``asyncio.Lock`` (FIFO wakeups) and the holder sleeps
+    off its own deficit before taking a token, so no two waiters can spend the
+    same refill. A non-positive ``rate`` disables limiting.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float = 1.0,
+        *,
+        metric: str | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.metric = metric
+        self._clock = clock
+        self._tokens = self.burst
+        self._last = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    async def acquire(self) -> float:
+        """Take one token, waiting as needed; returns the seconds spent waiting."""
+        if self.rate <= 0:
+            return 0.0
+        start = self._clock()
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1.0:
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1.0
+        waited = self._clock() - start
+        if self.metric:
+            observe(self.metric, waited * 1000.0)
+        return waited
@@ -5,6 +5,8 @@ from typing import Dict, List
 
 from ..settings import get_settings
 from .engine import get_provider_from_env
+from .messages import PromptLayout
+from .resilience import ProviderError
 
 ROLE_TEMPLATES = {
     "author": (
@@ -69,9 +71,23 @@ async def run_reflection(
     else:
         provider = get_provider_from_env(settings)
         # Pass model when provided; providers ignore unknown kwargs.
-        proposal = await provider.complete(role_prompt, model=target_model)  # type: ignore[call-arg]
+        # Role instructions and examples repeat across iterations; the
+        # candidate being revised goes last so the prefix stays cacheable.
+        layout = PromptLayout(
+            role_prompt, (f"Examples:\n{ex_txt}",), f"Candidate:\n{base}"
+        )
+        try:
+            proposal = await provider.complete(  # type: ignore[call-arg]
+                layout.text(),
+                model=target_model,
+                **layout.kwargs_for(provider, settings),
+            )
+            lessons = [f"{mode}: revision applied"]
+        except ProviderError as exc:
+            # Keep the current prompt rather than adopting an error string.
+            proposal = base
+            lessons = [f"{mode}: provider {exc.kind}, prompt kept"]
         edits = [{"op": "reorder_sections", "args": {}, "seed": iteration}]
-        lessons = [f"{mode}: revision applied"]
 
     return {
         "mode": mode,
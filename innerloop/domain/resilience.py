@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import random
+import time
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+
+from ..api.metrics import inc
+from ..settings import Settings, get_settings
+
+T = TypeVar("T")
+
+# Error kinds worth retrying; anything else (bad request, auth, bad payload)
+# will fail the same way again.
+RETRYABLE = {"timeout", "rate_limited", "server", "network"}
+
+
+class ProviderError(Exception):
+    """Classified upstream failure. Never cache a result that raised this."""
+
+    def __init__(
+        self,
+        kind: str,
+        message: str = "",
+        *,
+        status: int | None = None,
+        retry_after: float | None = None,
+    ) -> None:
+        super().__init__(message or kind)
+        self.kind = kind
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.kind in RETRYABLE
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def error_from_response(resp: httpx.Response) -> ProviderError | None:
+    status = resp.status_code
+    if status < 400:
+        return None
+    retry_after = parse_retry_after(resp.headers.get("retry-after"))
+    if status == 429:
+        return ProviderError(
+            "rate_limited", "HTTP 429", status=status, retry_after=retry_after
+        )
+    if status == 408:
+        return ProviderError("timeout", "HTTP 408", status=status)
+    if status >= 500:
+        return ProviderError(
+            "server", f"HTTP {status}", status=status, retry_after=retry_after
+        )
+    return ProviderError("client", f"HTTP {status}", status=status)
+
+
+def error_from_exception(exc: Exception) -> ProviderError:
+    if isinstance(exc, ProviderError):
+        return exc
+    if isinstance(exc, httpx.TimeoutException):
+        return ProviderError("timeout", str(exc))
+    if isinstance(exc, httpx.TransportError):
+        return ProviderError("network", str(exc))
+    return ProviderError("bad_response", str(exc))
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half-open -> closed."""
+
+    def __init__(self, threshold: int, cooldown_s: float) -> None:
+        self.threshold = max(1, threshold)
+        self.cooldown_s = cooldown_s
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_started: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown_s:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open":
+            now = time.monotonic()
+            # One trial request per cooldown; a lost probe does not wedge the breaker.
+            if self._probe_started is None or now - self._probe_started >= self.cooldown_s:
+                self._probe_started = now
+                return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probe_started = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_started = None
+        if self.opened_at is not None or self.failures >= self.threshold:
+            if self.opened_at is None:
+                inc("provider_circuit_opened")
+            self.opened_at = time.monotonic()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(model: str, settings: Settings | None = None) -> CircuitBreaker:
+    breaker = _breakers.get(model)
+    if breaker is None:
+        settings = settings or get_settings()
+        breaker = _breakers[model] = CircuitBreaker(
+            settings.PROVIDER_BREAKER_THRESHOLD, settings.PROVIDER_BREAKER_COOLDOWN_S
+        )
+    return breaker
+
+
+def backoff_delay(
+    attempt: int, base: float, cap: float, rng: random.Random | None = None
+) -> float:
+    """Full-jitter exponential backoff for the given 0-based retry attempt."""
+    rnd = rng or random  # nosec B311 - jitter, not crypto
+    return rnd.uniform(0.0, min(cap, base * (2**attempt)))
+
+
+async def call_with_retry(
+    fn: Callable[[], Awaitable[T]],
+    *,
+    breaker: CircuitBreaker | None = None,
+    settings: Settings | None = None,
+    sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+) -> T:
+    settings = settings or get_settings()
+    attempts = max(1, settings.PROVIDER_RETRY_ATTEMPTS)
+    for attempt in range(attempts):
+        if breaker is not None and not breaker.allow():
+            inc("provider_circuit_rejected")
+            raise ProviderError("circuit_open", "circuit breaker open")
+        try:
+            result = await fn()
+        except Exception as exc:
+            err = error_from_exception(exc)
+            inc(f"provider_errors_{err.kind}")
+            if breaker is not None:
+                if err.retryable:
+                    breaker.record_failure()
+                else:
+                    # The upstream answered; a bad request says nothing about its health.
+                    breaker.record_success()
+            if not err.retryable or attempt + 1 >= attempts:
+                raise err from exc
+            if err.retry_after is not None and err.retry_after > settings.PROVIDER_RETRY_MAX_S:
+                # Retrying before the server asked us to would only add load.
+                raise err from exc
+            delay = backoff_delay(
+                attempt, settings.PROVIDER_RETRY_BASE_S, settings.PROVIDER_RETRY_MAX_S
+            )
+            if err.retry_after is not None:
+                delay = max(delay, err.retry_after)
+            inc("provider_retries")
+            await sleep(delay)
+            continue
+        if breaker is not None:
+            breaker.record_success()
+        return result
+    raise ProviderError("server", "retries exhausted")  # pragma: no cover
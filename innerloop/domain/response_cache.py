@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+import time
+from typing import Dict, Optional, Tuple
+
+try:  # pragma: no cover - aiosqlite optional
+    import aiosqlite  # type: ignore
+except Exception:  # pragma: no cover - fallback when missing
+    aiosqlite = None  # type: ignore
+
+from ..api.metrics import inc
+from ..settings import Settings, get_settings
+
+# (expires_at, model, model_version, content)
+_Entry = Tuple[float, str, str, str]
+
+# Seconds between sweeps of expired/excess SQLite rows while writing.
+_PURGE_INTERVAL_S = 60.0
+
+
+class ResponseCache:
+    """LRU cache for deterministic completions with an optional SQLite tier.
+
+    Entries are tagged with the model version reported by the provider. When a
+    fresh response reveals a new version for a model, every entry recorded
+    under the old version is dropped.
+
+    Expired SQLite rows are deleted when the file is opened and then at most
+    every ``_PURGE_INTERVAL_S`` on write; the same sweep trims the table to
+    ``max_rows``, soonest-to-expire first.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_s: float,
+        sqlite_path: str | None = None,
+        max_rows: int | None = None,
+    ) -> None:
+        self.max_entries = max(0, max_entries)
+        self.ttl_s = ttl_s
+        self.sqlite_path = sqlite_path if aiosqlite is not None else None
+        self.max_rows = max_rows
+        self._next_purge = 0.0
+        self._mem: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._versions: Dict[str, str] = {}
+        self._db: Optional["aiosqlite.Connection"] = None
+        # Concurrent first lookups must share one connection, not race to open.
+        self._db_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._mem)
+
+    async def _conn(self) -> Optional["aiosqlite.Connection"]:
+        if self.sqlite_path is None:
+            return None
+        if self._db is None:
+            async with self._db_lock:
+                if self._db is None:
+                    db = await aiosqlite.connect(self.sqlite_path)
+                    await db.execute("PRAGMA journal_mode=WAL")
+                    await db.execute("PRAGMA busy_timeout=5000")
+                    await db.execute(
+                        """
+                        CREATE TABLE IF NOT EXISTS response_cache (
+                            key TEXT PRIMARY KEY,
+                            model TEXT,
+                            version TEXT,
+                            content TEXT,
+                            expires_at REAL
+                        )
+                        """
+                    )
+                    await db.execute(
+                        "CREATE INDEX IF NOT EXISTS idx_response_cache_model"
+                        " ON response_cache(model)"
+                    )
+                    await db.execute(
+                        "CREATE INDEX IF NOT EXISTS idx_response_cache_expires"
+                        " ON response_cache(expires_at)"
+                    )
+                    await db.commit()
+                    self._db = db
+                    await self._purge(db)
+        return self._db
+
+    async def _purge(self, db: "aiosqlite.Connection") -> int:
+        self._next_purge = time.monotonic() + _PURGE_INTERVAL_S
+        cur = await db.execute(
+            "DELETE FROM response_cache WHERE expires_at<=?", (time.time(),)
+        )
+        removed = cur.rowcount or 0
+        await cur.close()
+        if self.max_rows is not None:
+            cur = await db.execute(
+                "DELETE FROM response_cache WHERE key IN ("
+                "SELECT key FROM response_cache ORDER BY expires_at DESC, rowid DESC"
+                " LIMIT -1 OFFSET ?)",
+                (max(0, self.max_rows),),
+            )
+            removed += cur.rowcount or 0
+            await cur.close()
+        await db.commit()
+        if removed:
+            inc("provider_cache_purged", removed)
+        return removed
+
+    async def purge(self) -> int:
+        """Delete expired and excess SQLite rows now; returns rows removed."""
+        db = await self._conn()
+        return 0 if db is None else await self._purge(db)
+
+    def _remember(self, key: str, entry: _Entry) -> None:
+        if self.max_entries == 0:
+            return
+        self._mem[key] = entry
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def _current(self, model: str, version: str) -> bool:
+        known = self._versions.get(model)
+        return not known or not version or known == version
+
+    async def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        entry = self._mem.get(key)
+        if entry is not None:
+            if entry[0] > now and self._current(entry[1], entry[2]):
+                self._mem.move_to_end(key)
+                inc("provider_cache_hits")
+                return entry[3]
+            del self._mem[key]
+        db = await self._conn()
+        if db is not None:
+            async with db.execute(
+                "SELECT expires_at, model, version, content FROM response_cache WHERE key=?",
+                (key,),
+            ) as cur:
+                row = await cur.fetchone()
+            if row and row[0] > now and self._current(row[1], row[2]):
+                self._remember(key, (row[0], row[1], row[2], row[3]))
+                inc("provider_cache_hits")
+                return row[3]
+        inc("provider_cache_misses")
+        return None
+
+    async def invalidate_model(self, model: str, keep_version: str = "") -> None:
+        stale = [
+            k for k, e in self._mem.items() if e[1] == model and e[2] != keep_version
+        ]
+        for k in stale:
+            del self._mem[k]
+        db = await self._conn()
+        if db is not None:
+            await db.execute(
+                "DELETE FROM response_cache WHERE model=? AND version IS NOT ?",
+                (model, keep_version),
+            )
+            await db.commit()
+
+    async def put(self, key: str, model: str, version: str, content: str) -> None:
+        known = self._versions.get(model)
+        if version and known != version:
+            self._versions[model] = version
+            if known is not None:
+                inc("provider_cache_invalidations")
+                await self.invalidate_model(model, keep_version=version)
+        expires_at = time.time() + self.ttl_s
+        self._remember(key, (expires_at, model, version, content))
+        db = await self._conn()
+        if db is not None:
+            await db.execute(
+                "INSERT OR REPLACE INTO response_cache(key, model, version, content, expires_at) "
+                "VALUES(?,?,?,?,?)",
+                (key, model, version, content, expires_at),
+            )
+            await db.commit()
+            if time.monotonic() >= self._next_purge:
+                await self._purge(db)
+
+    async def close(self) -> None:
+        db, self._db = self._db, None
+        if db is not None:
+            await db.close()
+
+
+_cache_singleton: ResponseCache | None = None
+
+
+def get_response_cache(settings: Settings | None = None) -> ResponseCache:
+    global _cache_singleton
+    settings = settings or get_settings()
+    if _cache_singleton is None:
+        _cache_singleton = ResponseCache(
+            settings.JUDGE_CACHE_SIZE,
+            settings.PROVIDER_CACHE_TTL_S,
+            settings.PROVIDER_CACHE_SQLITE_PATH,
+            settings.PROVIDER_CACHE_SQLITE_MAX_ROWS,
+        )
+    return _cache_singleton
+
+
+async def close_response_cache() -> None:
+    global _cache_singleton
+    cache, _cache_singleton = _cache_singleton, None
+    if cache is not None:
+        await cache.close()
@@ -1,52 +1,229 @@
 from __future__ import annotations
 
+import heapq
+from itertools import islice
+import logging
 import math
-from typing import Any, Dict, List
+import re
+from typing import Any, Dict, Iterable, List, Tuple
 
-from ..settings import get_settings
+from ..settings import Settings, get_settings
+from . import vectors
 
-_idf: Dict[str, float] | None = None
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"\w+")
+# Standard reciprocal-rank-fusion damping constant.
+_RRF_K = 60
+_HYBRID_POOL = 4
+# Rows indexed ad hoc for stores that cannot search themselves.
+_FALLBACK_SCAN = 100
+_warned_no_vectors = False
 
 
 def _tokenize(text: str) -> List[str]:
-    return text.split()
+    return _TOKEN.findall(text.lower())
+
+
+def fts_query(text: str) -> str:
+    """FTS5 MATCH expression: any query token, each quoted as a literal."""
+    return " OR ".join(f'"{tok}"' for tok in dict.fromkeys(_tokenize(text)))
+
+
+def _doc_text(doc: Dict[str, Any]) -> str:
+    return f"{doc.get('input') or ''} {doc.get('expected') or ''}"
+
+
+class BM25Index:
+    """Inverted index over examples with Okapi BM25 scoring.
+
+    Postings map each term to ``{doc_id: term_frequency}``; documents are
+    added, replaced and removed incrementally, so the owning store keeps the
+    index in step with ``upsert_examples``/``delete_example`` instead of
+    rescanning the corpus per query.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._total_len = 0
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add(self, doc: Dict[str, Any]) -> None:
+        doc_id = str(doc["id"])
+        if doc_id in self.docs:
+            self.remove(doc_id)
+        tokens = _tokenize(_doc_text(doc))
+        tf: Dict[str, int] = {}
+        for tok in tokens:
+            tf[tok] = tf.get(tok, 0) + 1
+        for term, n in tf.items():
+            self.postings.setdefault(term, {})[doc_id] = n
+        self.docs[doc_id] = doc
+        self._lengths[doc_id] = len(tokens)
+        self._total_len += len(tokens)
+
+    def add_many(self, docs: Iterable[Dict[str, Any]]) -> None:
+        for doc in docs:
+            self.add(doc)
+
+    def remove(self, doc_id: str) -> None:
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return
+        # Re-tokenising is cheaper than keeping a term list per document.
+        for term in set(_tokenize(_doc_text(doc))):
+            plist = self.postings.get(term)
+            if plist is not None:
+                plist.pop(doc_id, None)
+                if not plist:
+                    del self.postings[term]
+        self._total_len -= self._lengths.pop(doc_id, 0)
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1.0 + (len(self.docs) - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int) -> List[Tuple[float, Dict[str, Any]]]:
+        """Top-``k`` ``(score, doc)`` pairs with a positive score, best first."""
+        n = len(self.docs)
+        if k <= 0 or not n:
+            return []
+        avgdl = self._total_len / n or 1.0
+        # tf-saturation denominator is tf + base + slope * doc_len.
+        base = self.k1 * (1.0 - self.b)
+        slope = self.k1 * self.b / avgdl
+        lengths = self._lengths
+        # Rarest terms first. A term adds at most ``weight`` to any document,
+        # so once the k-th best score reaches the summed weight of the terms
+        # still to come, documents not seen yet cannot enter the top-k and the
+        # long postings of common terms only need probing for known
+        # candidates (MaxScore pruning; results are unchanged).
+        terms = sorted(
+            (t for t in set(_tokenize(query)) if t in self.postings),
+            key=lambda t: len(self.postings[t]),
+        )
+        weights = [self.idf(t) * (self.k1 + 1.0) for t in terms]
+        remaining = sum(weights)
+        scores: Dict[str, float] = {}
+        for term, weight in zip(terms, weights):
+            plist = self.postings[term]
+            if len(scores) >= k and len(scores) < len(plist):
+                kth = heapq.nlargest(k, scores.values())[-1]
+                if kth >= remaining:
+                    for doc_id in scores:
+                        tf = plist.get(doc_id)
+                        if tf:
+                            norm = tf + base + slope * lengths[doc_id]
+                            scores[doc_id] += weight * tf / norm
+                    remaining -= weight
+                    continue
+            for doc_id, tf in plist.items():
+                gain = weight * tf / (tf + base + slope * lengths[doc_id])
+                scores[doc_id] = scores.get(doc_id, 0.0) + gain
+            remaining -= weight
+        top = heapq.nlargest(k, scores.items(), key=lambda kv: kv[1])
+        return [(score, self.docs[doc_id]) for doc_id, score in top if score > 0.0]
+
+    def first(self, k: int) -> List[Dict[str, Any]]:
+        return list(islice(self.docs.values(), k))
 
 
-def _build_idf(examples: List[Dict[str, Any]]) -> None:
-    global _idf
-    if _idf is not None:
-        return
-    df: Dict[str, int] = {}
-    for ex in examples:
-        tokens = set(_tokenize(ex.get("input", "") + " " + ex.get("expected", "")))
-        for t in tokens:
-            df[t] = df.get(t, 0) + 1
-    total = max(1, len(examples))
-    _idf = {t: math.log(total / (1 + c)) for t, c in df.items()}
+async def _bm25_search(store: Any, query: str, k: int) -> List[Dict[str, Any]]:
+    search = getattr(store, "search_examples", None)
+    if search is not None:
+        return await search(query, k)
+    # Stores without a search method: build a throwaway index over the first
+    # rows only, as this runs on every retrieve.
+    index = BM25Index()
+    async for doc in store.iter_examples(limit=_FALLBACK_SCAN):
+        index.add(doc)
+    return [doc for _, doc in index.search(query, k)]
+
+
+async def _vector_search(store: Any, query: str, k: int) -> List[Dict[str, Any]]:
+    index = await store.vector_index()
+    return [doc for _, doc in index.search(query, k)]
+
+
+def _fuse(
+    lexical: List[Dict[str, Any]],
+    dense: List[Dict[str, Any]],
+    alpha: float,
+    k: int,
+) -> List[Dict[str, Any]]:
+    """Weighted reciprocal-rank fusion; ``alpha`` is the vector share.
+
+    BM25 and cosine scores live on different scales (and FTS5 only yields an
+    order), so the two rankings are combined by rank rather than by score.
+    """
+    scores: Dict[str, float] = {}
+    docs: Dict[str, Dict[str, Any]] = {}
+    for weight, ranked in ((1.0 - alpha, lexical), (alpha, dense)):
+        for rank, doc in enumerate(ranked):
+            doc_id = str(doc["id"])
+            docs.setdefault(doc_id, doc)
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (_RRF_K + rank + 1)
+    best = heapq.nlargest(k, scores.items(), key=lambda kv: kv[1])
+    return [docs[doc_id] for doc_id, _ in best]
+
+
+def _mode(settings: Settings, store: Any) -> str:
+    global _warned_no_vectors
+    mode = settings.RETRIEVAL_MODE
+    if mode == "bm25":
+        return mode
+    if vectors.available() and hasattr(store, "vector_index"):
+        return mode
+    if not _warned_no_vectors:
+        logger.warning("RETRIEVAL_MODE=%s needs numpy; using bm25", mode)
+        _warned_no_vectors = True
+    return "bm25"
+
+
+async def _search(
+    store: Any, query: str, k: int, settings: Settings
+) -> List[Dict[str, Any]]:
+    mode = _mode(settings, store)
+    if mode == "vector":
+        hits = await _vector_search(store, query, k)
+    elif mode == "hybrid":
+        # Over-fetch so documents ranked well by only one side can surface.
+        pool = k * _HYBRID_POOL
+        hits = _fuse(
+            await _bm25_search(store, query, pool),
+            await _vector_search(store, query, pool),
+            settings.RETRIEVAL_HYBRID_ALPHA,
+            k,
+        )
+    else:
+        hits = await _bm25_search(store, query, k)
+    return hits or [doc async for doc in store.iter_examples(limit=k)]
 
 
 async def retrieve(
     query: str, k: int, store: Any | None = None
 ) -> List[Dict[str, Any]]:
-    k = max(0, min(k, get_settings().RETRIEVAL_MAX_EXAMPLES))
-    examples: List[Dict[str, Any]] = []
-    if store is not None:
-        try:
-            examples = await store.list_examples()
-        except Exception:
-            examples = []
-    if not examples:
+    """Up to ``k`` stored examples most relevant to ``query``.
+
+    Ranks by BM25, hashed-embedding cosine or a fusion of both according to
+    ``RETRIEVAL_MODE``; falls back to the first stored examples when nothing
+    matches.
+    """
+    settings = get_settings()
+    k = max(0, min(k, settings.RETRIEVAL_MAX_EXAMPLES))
+    if store is None or k == 0:
         return []
-    _build_idf(examples)
-    query_tokens = set(_tokenize(query))
-    scores: List[tuple[float, Dict[str, Any]]] = []
-    for ex in examples:
-        ex_tokens = set(_tokenize(ex.get("input", "") + " " + ex.get("expected", "")))
-        common = query_tokens & ex_tokens
-        score = sum((_idf or {}).get(tok, 0.0) for tok in common)
-        scores.append((score, ex))
-    scores.sort(key=lambda t: t[0], reverse=True)
-    top = [ex for sc, ex in scores if sc > 0.0][:k]
-    if not top:
-        return examples[:k]
-    return top
+    try:
+        docs = await _search(store, query, k, settings)
+    except Exception:
+        return []
+    return [dict(doc) for doc in docs]
+
+
+__all__ = ["BM25Index", "fts_query", "retrieve"]
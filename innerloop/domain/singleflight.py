@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import asyncio
+from functools import partial
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Generic, Mapping, TypeVar
+
+from ..api.metrics import inc
+
+T = TypeVar("T")
+
+
+def request_key(body: Mapping[str, Any]) -> str:
+    """Stable hash of a chat-completions request body."""
+    canon = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canon.encode("utf-8")).hexdigest()
+
+
+class SingleFlight(Generic[T]):
+    """Share one in-flight call among all concurrent callers with the same key.
+
+    The underlying call runs as its own task, so a waiter being cancelled does
+    not cancel the request for the others.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[str, asyncio.Future[T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    def _done(self, key: str, fut: asyncio.Future[T]) -> None:
+        if self._inflight.get(key) is fut:
+            del self._inflight[key]
+        if not fut.cancelled():
+            fut.exception()  # mark retrieved even if every waiter went away
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        fut = self._inflight.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(fn())
+            self._inflight[key] = fut
+            fut.add_done_callback(partial(self._done, key))
+        else:
+            inc("provider_coalesced")
+        return await asyncio.shield(fut)
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import json
+import math
+from pathlib import Path
+import re
+from typing import Any, Dict, Iterable, List, Tuple
+import zlib
+
+try:  # pragma: no cover - numpy optional
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - fallback when missing
+    np = None  # type: ignore
+
+from ..settings import Settings, get_settings
+
+_WORD = re.compile(r"\w+")
+
+
+def available() -> bool:
+    return np is not None
+
+
+def _features(text: str) -> List[str]:
+    """Word unigrams plus character trigrams of each word.
+
+    Trigrams let inflections and near-spellings ("translate", "translation")
+    share dimensions, which plain token overlap misses.
+    """
+    feats: List[str] = []
+    for word in _WORD.findall(text.lower()):
+        feats.append(word)
+        padded = f"#{word}#"
+        feats.extend(padded[i : i + 3] for i in range(len(padded) - 2))
+    return feats
+
+
+def embed(text: str, dim: int) -> "np.ndarray":
+    """L2-normalised signed feature-hashing embedding (float32, offline).
+
+    CRC32 keeps the hashing stable across processes, unlike ``hash()``.
+    """
+    vec = np.zeros(dim, dtype=np.float32)
+    for feat in _features(text):
+        h = zlib.crc32(feat.encode("utf-8"))
+        vec[h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+    norm = float(np.linalg.norm(vec))
+    if norm:
+        vec /= norm
+    return vec
+
+
+def _doc_text(doc: Dict[str, Any]) -> str:
+    return f"{doc.get('input') or ''} {doc.get('expected') or ''}"
+
+
+class VectorIndex:
+    """Cosine top-k over hashed embeddings in one contiguous float32 matrix.
+
+    Rows are appended with amortised doubling; removed rows are zeroed and
+    reused. Search is a single matrix-vector product plus ``argpartition``.
+    From ``ivf_min_docs`` rows on, the rows are clustered (about sqrt(n)
+    clusters, re-fitted whenever the corpus doubles) so a query only scans
+    the ``nprobe`` nearest clusters.
+    """
+
+    def __init__(
+        self, dim: int = 256, *, ivf_min_docs: int = 0, nprobe: int = 8
+    ) -> None:
+        if np is None:
+            raise RuntimeError("numpy is required for vector retrieval")
+        self.dim = dim
+        self.ivf_min_docs = ivf_min_docs
+        self.nprobe = max(1, nprobe)
+        self._ivf_size = 0
+        self._mat = np.zeros((16, dim), dtype=np.float32)
+        self._n = 0
+        self._free: List[int] = []
+        self.rows: Dict[str, int] = {}
+        self.docs: List[Dict[str, Any] | None] = []
+        self._centroids: "np.ndarray | None" = None
+        self._lists: List[List[int]] = []
+        self._assign: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def matrix(self) -> "np.ndarray":
+        return self._mat[: self._n]
+
+    def _writable(self) -> None:
+        # A memory-mapped matrix is copied into memory on first write.
+        if not self._mat.flags.writeable:
+            self._mat = np.array(self._mat, dtype=np.float32)
+
+    def add(self, doc: Dict[str, Any]) -> None:
+        self._writable()
+        doc_id = str(doc["id"])
+        row = self.rows.get(doc_id)
+        if row is None:
+            if self._free:
+                row = self._free.pop()
+            else:
+                if self._n == len(self._mat):
+                    grown = np.zeros((2 * len(self._mat), self.dim), np.float32)
+                    grown[: self._n] = self._mat[: self._n]
+                    self._mat = grown
+                row = self._n
+                self._n += 1
+                self.docs.append(None)
+            self.rows[doc_id] = row
+        else:
+            self._unassign(row)
+        self._mat[row] = embed(_doc_text(doc), self.dim)
+        self.docs[row] = doc
+        self._assign_row(row)
+        n = len(self.rows)
+        if self.ivf_min_docs and n >= max(self.ivf_min_docs, 2 * self._ivf_size):
+            self.build_ivf(int(math.sqrt(n)))
+
+    def add_many(self, docs: Iterable[Dict[str, Any]]) -> None:
+        for doc in docs:
+            self.add(doc)
+
+    def remove(self, doc_id: str) -> None:
+        row = self.rows.pop(doc_id, None)
+        if row is None:
+            return
+        self._writable()
+        self._unassign(row)
+        self._mat[row] = 0.0
+        self.docs[row] = None
+        self._free.append(row)
+
+    def build_ivf(self, nlist: int, iters: int = 8, seed: int = 0) -> None:
+        """Spherical k-means over the live rows (an inverted-file index)."""
+        live = np.fromiter(self.rows.values(), dtype=np.int64)
+        self._ivf_size = len(live)
+        if nlist <= 1 or len(live) < nlist:
+            self._centroids = None
+            return
+        rng = np.random.default_rng(seed)
+        data = self._mat[live]
+        cents = data[rng.choice(len(live), nlist, replace=False)].copy()
+        for _ in range(iters):
+            labels = np.argmax(data @ cents.T, axis=1)
+            for c in range(nlist):
+                members = data[labels == c]
+                if len(members):
+                    mean = members.sum(axis=0)
+                    norm = np.linalg.norm(mean)
+                    cents[c] = mean / norm if norm else cents[c]
+        self._centroids = cents
+        labels = np.argmax(data @ cents.T, axis=1)
+        self._lists = [[] for _ in range(nlist)]
+        self._assign = {}
+        for row, c in zip(live.tolist(), labels.tolist()):
+            self._lists[c].append(row)
+            self._assign[row] = c
+
+    def _assign_row(self, row: int) -> None:
+        if self._centroids is None:
+            return
+        c = int(np.argmax(self._centroids @ self._mat[row]))
+        self._lists[c].append(row)
+        self._assign[row] = c
+
+    def _unassign(self, row: int) -> None:
+        c = self._assign.pop(row, None)
+        if c is not None:
+            self._lists[c].remove(row)
+
+    def search(self, query: str, k: int) -> List[Tuple[float, Dict[str, Any]]]:
+        """Top-``k`` ``(cosine, doc)`` pairs with a positive similarity."""
+        if k <= 0 or not self.rows:
+            return []
+        q = embed(query, self.dim)
+        if self._centroids is not None:
+            probe = np.argsort(-(self._centroids @ q))[: self.nprobe]
+            cand = np.fromiter(
+                (r for c in probe.tolist() for r in self._lists[c]), dtype=np.int64
+            )
+            if not len(cand):
+                return []
+            sims = self._mat[cand] @ q
+        else:
+            cand = None
+            sims = self.matrix @ q
+        k = min(k, len(sims))
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top], kind="stable")]
+        out: List[Tuple[float, Dict[str, Any]]] = []
+        for i in top.tolist():
+            score = float(sims[i])
+            row = int(cand[i]) if cand is not None else i
+            doc = self.docs[row]
+            if score > 0.0 and doc is not None:
+                out.append((score, doc))
+        return out
+
+    def save(self, path: str | Path) -> None:
+        """Write ``<path>.npy`` (the matrix) and ``<path>.json`` (row docs)."""
+        path = Path(path)
+        np.save(path.with_suffix(".npy"), self.matrix)
+        path.with_suffix(".json").write_text(
+            json.dumps({"dim": self.dim, "docs": self.docs}), encoding="utf-8"
+        )
+
+    @classmethod
+    def load(cls, path: str | Path, *, mmap: bool = True) -> "VectorIndex":
+        """Open a saved index; with ``mmap`` the matrix stays on disk until written."""
+        path = Path(path)
+        meta = json.loads(path.with_suffix(".json").read_text(encoding="utf-8"))
+        index = cls(meta["dim"])
+        index._mat = np.load(path.with_suffix(".npy"), mmap_mode="r" if mmap else None)
+        index._n = len(index._mat)
+        index.docs = meta["docs"]
+        for row, doc in enumerate(index.docs):
+            if doc is None:
+                index._free.append(row)
+            else:
+                index.rows[str(doc["id"])] = row
+        return index
+
+
+def new_vector_index(settings: Settings | None = None) -> VectorIndex:
+    settings = settings or get_settings()
+    return VectorIndex(
+        settings.RETRIEVAL_VECTOR_DIM,
+        ivf_min_docs=settings.RETRIEVAL_IVF_MIN_DOCS,
+        nprobe=settings.RETRIEVAL_IVF_NPROBE,
+    )
+
+
+__all__ = ["VectorIndex", "available", "embed", "new_vector_index"]
@@ -10,6 +10,7 @@ from fastapi.responses import JSONResponse
 
 from .api.jobs.registry import JobRegistry
 from .api.jobs.store import JobStore, MemoryJobStore, SQLiteJobStore
+from .api.jobs.tailer import StoreTailer
 from .api.middleware.auth import AuthMiddleware
 from .api.middleware.deprecation import DeprecationMiddleware
 from .api.middleware.limits import SizeLimitMiddleware
@@ -22,6 +23,8 @@ from .api.routers.examples import router as examples_router
 from .api.routers.health import router as health_router
 from .api.routers.optimize import router as optimize_router
 from .domain.engine import close_provider
+from .domain.http_pool import close_pools, warm_up_pools
+from .domain.response_cache import close_response_cache
 from .settings import get_settings
 
 
@@ -36,13 +39,24 @@ async def lifespan(app: FastAPI):
     registry = JobRegistry(store)
     app.state.registry = registry
     app.state.store = store
+    app.state.tailer = StoreTailer(store)
+    await registry.resume_interrupted()
     reaper_task = asyncio.create_task(registry.reaper_loop())
+    # Background: a slow or unreachable provider must not delay startup.
+    warmup_task = asyncio.create_task(warm_up_pools(settings))
     try:
         yield
     finally:
+        warmup_task.cancel()
         registry.shutdown()
+        await registry.release_checkpoints()
+        await app.state.tailer.close()
         await store.close()
         await close_provider()
+        await close_response_cache()
+        with suppress(Exception, asyncio.CancelledError):
+            await warmup_task
+        await close_pools()
         reaper_task.cancel()
         with suppress(Exception, asyncio.CancelledError):
             await reaper_task
@@ -15,12 +15,18 @@ class Settings(BaseSettings):
     API_BEARER_TOKENS: List[str] = Field(default_factory=list)
     OPENROUTER_API_KEY: Optional[str] = None
     OPENAI_API_KEY: Optional[str] = None
+    # Provider API roots; point these at tools/mock_provider.py for offline benchmarks.
+    OPENROUTER_BASE_URL: str = "https://openrouter.ai/api/v1"
+    OPENAI_BASE_URL: str = "https://api.openai.com/v1"
     CORS_ALLOWED_ORIGINS: List[str] = Field(default_factory=list)
     SSE_RETRY_MS: int = 1500
     SSE_PING_INTERVAL_S: float = 1.0
     SSE_BACKPRESSURE_FAIL_TIMEOUT_S: float = 2.0
     # Max number of SSE events buffered per job before producers apply backpressure.
     SSE_BUFFER_SIZE: int = 200
+    # Store tailing for SSE clients attached to a worker that does not own the job.
+    SSE_TAIL_POLL_MIN_S: float = 0.05
+    SSE_TAIL_POLL_MAX_S: float = 1.0
     MAX_ITERATIONS: int = 4
     # Logging
     LOG_LEVEL: str = "INFO"  # DEBUG|INFO|WARNING|ERROR
@@ -35,25 +41,93 @@ class Settings(BaseSettings):
     JOB_TTL_FINISHED_S: float = 30.0
     JOB_TTL_FAILED_S: float = 120.0
     JOB_TTL_CANCELLED_S: float = 60.0
+    # Max rows deleted per statement when the reaper purges the job store.
+    REAPER_BATCH_SIZE: int = 500
     SERVICE_NAME: str = "gepa-next"
     SERVICE_ENV: str = "dev"
     IDEMPOTENCY_TTL_S: float = 600.0
     USE_MODEL_STUB: bool = True
     USE_JUDGE_STUB: bool = True
     MODEL_ID: str = "gpt-4o-mini"
+    # Share one upstream call among concurrent byte-identical completions.
+    PROVIDER_COALESCE_ENABLED: bool = True
+    # Retries (full-jitter exponential backoff) and per-model circuit breakers.
+    PROVIDER_RETRY_ATTEMPTS: int = 3
+    PROVIDER_RETRY_BASE_S: float = 0.25
+    PROVIDER_RETRY_MAX_S: float = 8.0
+    PROVIDER_BREAKER_THRESHOLD: int = 5
+    PROVIDER_BREAKER_COOLDOWN_S: float = 30.0
+    # AIMD in-flight limit per provider/model, below the httpx pool size.
+    PROVIDER_CONCURRENCY_ENABLED: bool = True
+    PROVIDER_CONCURRENCY_INITIAL: int = 8
+    PROVIDER_CONCURRENCY_MIN: int = 1
+    PROVIDER_CONCURRENCY_MAX: int = 64
+    PROVIDER_CONCURRENCY_BACKOFF: float = 0.5
+    PROVIDER_CONCURRENCY_LATENCY_TARGET_S: float = 10.0
+    # Duplicate a call still running after the per-model latency quantile;
+    # BUDGET caps hedges as a fraction of requests.
+    PROVIDER_HEDGE_ENABLED: bool = False
+    PROVIDER_HEDGE_QUANTILE: float = 0.95
+    PROVIDER_HEDGE_WINDOW: int = 200
+    PROVIDER_HEDGE_MIN_SAMPLES: int = 20
+    PROVIDER_HEDGE_MIN_DELAY_S: float = 0.05
+    PROVIDER_HEDGE_BUDGET: float = 0.05
+    # Per-host connection pool shared by every provider client; HTTP/2 needs h2.
+    PROVIDER_HTTP2: bool = False
+    PROVIDER_POOL_MAX_CONNECTIONS: int = 100
+    PROVIDER_POOL_MAX_KEEPALIVE: int = 20
+    PROVIDER_POOL_KEEPALIVE_S: float = 60.0
+    # Connections opened per provider host at startup (0 disables warm-up).
+    PROVIDER_POOL_WARMUP: int = 0
+    # Mark the stable prompt prefix with cache_control for providers that
+    # need explicit cache breakpoints.
+    PROVIDER_CACHE_HINTS: bool = False
+    PROVIDER_CACHE_ENABLED: bool = True
+    PROVIDER_CACHE_TTL_S: float = 3600.0
+    # Optional second cache tier shared across workers/restarts.
+    PROVIDER_CACHE_SQLITE_PATH: Optional[str] = None
+    PROVIDER_CACHE_SQLITE_MAX_ROWS: int = 100_000
+    # Bump to invalidate every cached response.
+    PROVIDER_CACHE_VERSION: str = "1"
     JUDGE_PROVIDER: Literal["openrouter", "openai", "stub"] = "openrouter"
     JUDGE_MODEL_ID: str = "openai:gpt-5-judge"  # fixed judge, not API-settable
     JUDGE_TIMEOUT_S: float = 15.0
+    # In-memory LRU size for deterministic (temperature=0) provider responses.
     JUDGE_CACHE_SIZE: int = 2048
+    JUDGE_CACHE_TTL_S: float = 86_400.0
+    JUDGE_CACHE_MAX_ROWS: int = 100_000
     JUDGE_QPS_MAX: float = 5.0
+    JUDGE_QPS_BURST: float = 1.0
+    # Candidates scored per judge call by JudgeLLM.rank (1 = one call each).
+    JUDGE_BATCH_SIZE: int = 1
+    JUDGE_BATCH_MAX_TOKENS: int = 6000
+    JUDGE_RANK_CALL_TIMEOUT_S: float = 30.0
     ENABLE_PARETO_V2: bool = True
     PARETO_TOPN: int = 1
     EVALUATION_RUBRIC_DEFAULT: str = "overall quality and clarity"
     TOURNAMENT_SIZE: int = 4
+    # "bradley_terry" ranks with Swiss-paired comparisons and a BT fit instead
+    # of single-elimination tournaments.
+    RANKING_STRATEGY: Literal["tournament", "bradley_terry"] = "tournament"
+    RANKING_STABLE_ROUNDS: int = 2
     RECOMBINATION_RATE: float = 0.5
     EARLY_STOP_PATIENCE: int = 3
+    # Drop near-duplicate examples (MinHash/LSH over input+expected) on bulk
+    # ingest; EXAMPLES_DEDUP_THRESHOLD is the estimated Jaccard similarity.
+    EXAMPLES_DEDUP: bool = False
+    EXAMPLES_DEDUP_THRESHOLD: float = 0.9
+    EXAMPLES_DEDUP_NUM_PERM: int = 128
+    # /v1/examples/ingest (NDJSON): rows per write transaction, max line size.
+    EXAMPLES_INGEST_CHUNK: int = 1000
+    EXAMPLES_INGEST_MAX_LINE_BYTES: int = 64_000
     RETRIEVAL_MAX_EXAMPLES: int = 4
     RETRIEVAL_MIN_LEN: int = 8
+    # bm25 (token overlap), vector (hashed embeddings; needs numpy) or hybrid.
+    RETRIEVAL_MODE: Literal["bm25", "vector", "hybrid"] = "bm25"
+    RETRIEVAL_VECTOR_DIM: int = 256
+    RETRIEVAL_IVF_MIN_DOCS: int = 50000
+    RETRIEVAL_IVF_NPROBE: int = 8
+    RETRIEVAL_HYBRID_ALPHA: float = 0.5
     # Single source of truth for default target model (overrideable per API call)
     TARGET_MODEL_DEFAULT: str = "openai:gpt-4o-mini"
     MAX_CANDIDATES: int = 8
@@ -66,6 +140,12 @@ class Settings(BaseSettings):
     PERF_BUDGET_P95_EVENT_MS: int = 120
     MAX_WALL_TIME_S: float = 15.0
     JOB_STORE: Literal["memory", "sqlite"] = "memory"
+    # GEPA checkpoints (resume interrupted jobs at startup). Unset means on
+    # for the sqlite store only: memory checkpoints cannot outlive a restart.
+    GEPA_CHECKPOINT_ENABLED: Optional[bool] = None
+    GEPA_CHECKPOINT_EVERY_GENS: int = 1
+    # Checkpoints not saved for this long are treated as orphaned by a crash.
+    GEPA_CHECKPOINT_LEASE_S: float = 600.0
     SQLITE_PATH: str = "gepa.db"
     COST_TRACKING_ENABLED: bool = True
     MODEL_PRICES_JSON: str = (
@@ -73,6 +153,8 @@ class Settings(BaseSettings):
     )
     EVAL_MAX_EXAMPLES: int = 100
     EVAL_MAX_CONCURRENCY: int = 8
+    # Stream rollouts and stop reading once the output can no longer match.
+    EVAL_STREAM_EARLY_STOP: bool = False
 
     @computed_field
     def MODEL_PRICES(self) -> dict[str, dict[str, float]]:  # noqa: N802
@@ -108,13 +190,43 @@ def get_settings() -> Settings:
         settings.RATE_LIMIT_PER_MIN = int(settings.RATE_LIMIT_OPTIMIZE_RPS * 60)
     if settings.RATE_LIMIT_OPTIMIZE_BURST is not None:
         settings.RATE_LIMIT_BURST = settings.RATE_LIMIT_OPTIMIZE_BURST
+    if settings.GEPA_CHECKPOINT_ENABLED is None:
+        settings.GEPA_CHECKPOINT_ENABLED = settings.JOB_STORE == "sqlite"
     settings.TOURNAMENT_SIZE = max(2, int(settings.TOURNAMENT_SIZE))
+    settings.RANKING_STABLE_ROUNDS = max(1, int(settings.RANKING_STABLE_ROUNDS))
     settings.RECOMBINATION_RATE = min(1.0, max(0.0, settings.RECOMBINATION_RATE))
     settings.EARLY_STOP_PATIENCE = max(1, int(settings.EARLY_STOP_PATIENCE))
+    settings.EXAMPLES_DEDUP_THRESHOLD = min(
+        1.0, max(0.05, float(settings.EXAMPLES_DEDUP_THRESHOLD))
+    )
+    settings.EXAMPLES_DEDUP_NUM_PERM = max(16, int(settings.EXAMPLES_DEDUP_NUM_PERM))
+    settings.EXAMPLES_INGEST_CHUNK = max(1, int(settings.EXAMPLES_INGEST_CHUNK))
+    settings.EXAMPLES_INGEST_MAX_LINE_BYTES = max(
+        1024, int(settings.EXAMPLES_INGEST_MAX_LINE_BYTES)
+    )
     settings.RETRIEVAL_MAX_EXAMPLES = max(0, int(settings.RETRIEVAL_MAX_EXAMPLES))
     settings.RETRIEVAL_MIN_LEN = max(0, int(settings.RETRIEVAL_MIN_LEN))
+    settings.RETRIEVAL_VECTOR_DIM = max(8, int(settings.RETRIEVAL_VECTOR_DIM))
+    settings.RETRIEVAL_HYBRID_ALPHA = min(
+        1.0, max(0.0, float(settings.RETRIEVAL_HYBRID_ALPHA))
+    )
     settings.EVAL_MAX_EXAMPLES = max(1, int(settings.EVAL_MAX_EXAMPLES))
     settings.EVAL_MAX_CONCURRENCY = max(1, int(settings.EVAL_MAX_CONCURRENCY))
+    settings.REAPER_BATCH_SIZE = max(1, int(settings.REAPER_BATCH_SIZE))
+    settings.PROVIDER_CACHE_SQLITE_MAX_ROWS = max(
+        1, int(settings.PROVIDER_CACHE_SQLITE_MAX_ROWS)
+    )
+    settings.PROVIDER_CONCURRENCY_MIN = max(1, int(settings.PROVIDER_CONCURRENCY_MIN))
+    settings.PROVIDER_CONCURRENCY_MAX = max(
+        settings.PROVIDER_CONCURRENCY_MIN, int(settings.PROVIDER_CONCURRENCY_MAX)
+    )
+    settings.PROVIDER_POOL_MAX_CONNECTIONS = max(
+        1, int(settings.PROVIDER_POOL_MAX_CONNECTIONS)
+    )
+    settings.PROVIDER_POOL_MAX_KEEPALIVE = min(
+        settings.PROVIDER_POOL_MAX_CONNECTIONS,
+        max(0, int(settings.PROVIDER_POOL_MAX_KEEPALIVE)),
+    )
     return settings
 
 
@@ -1,10 +1,61 @@
+import importlib
 import os
 from pathlib import Path
 import sys
 
+from fastapi.testclient import TestClient
+import pytest
+
 ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 # Default to dev-mode auth bypass in tests unless overridden.
 os.environ.setdefault("REQUIRE_AUTH", "false")
+
+
+def _reload_settings():
+    import innerloop.settings as settings
+
+    importlib.reload(settings)
+
+
+@pytest.fixture(autouse=True)
+def _restore_settings(monkeypatch):
+    """Undo env changes and rebuild settings so no test leaks into the next."""
+    yield
+    monkeypatch.undo()
+    _reload_settings()
+
+
+@pytest.fixture
+def set_env(monkeypatch):
+    """Set environment variables and reload settings to pick them up."""
+
+    def apply(**env):
+        for key, value in env.items():
+            monkeypatch.setenv(key, str(value))
+        _reload_settings()
+
+    return apply
+
+
+@pytest.fixture
+def make_client(set_env):
+    """Build a ``TestClient`` for a freshly configured app with a dev key."""
+
+    def build(**env):
+        set_env(
+            **{
+                "OPENROUTER_API_KEY": "dev",
+                "REQUIRE_AUTH": "false",
+                "API_BEARER_TOKENS": '["token"]',
+                **env,
+            }
+        )
+        import innerloop.main as main
+
+        importlib.reload(main)
+        return TestClient(main.app)
+
+    return build
@@ -0,0 +1,99 @@
+import asyncio
+import importlib
+
+import httpx
+
+from innerloop.api import metrics
+from innerloop.domain.concurrency import AIMDLimiter
+
+
+def test_limit_grows_when_healthy_and_halves_on_overload():
+    lim = AIMDLimiter("t", initial=4, min_limit=1, max_limit=6)
+    for _ in range(40):
+        lim.in_flight += 1
+        lim.release(0.01)
+    assert lim.limit == 6
+    lim.in_flight += 2
+    lim.release(0.01, "rate_limited")
+    lim.release(0.01, "rate_limited")  # same window: one congestion event
+    assert lim.limit == 3
+    lim.in_flight += 1
+    lim.release(0.01, "server")  # not an overload signal
+    assert lim.limit == 3
+    snap = metrics.snapshot()
+    assert snap["provider_concurrency_limit_t"] == 3
+
+
+def test_waiters_are_queued_fifo_and_gauged():
+    lim = AIMDLimiter("q", initial=1, min_limit=1, max_limit=1)
+    order = []
+
+    async def worker(i):
+        async with lim.slot():
+            order.append(i)
+            await asyncio.sleep(0.01)
+
+    async def go():
+        tasks = [asyncio.create_task(worker(i)) for i in range(4)]
+        await asyncio.sleep(0.001)
+        assert lim.queue_depth == 3
+        assert metrics.snapshot()["provider_queue_depth_q"] == 3
+        await asyncio.gather(*tasks)
+        assert order == [0, 1, 2, 3]
+        assert lim.in_flight == 0 and lim.queue_depth == 0
+
+    asyncio.run(go())
+
+
+def test_cancelled_waiter_releases_its_place():
+    lim = AIMDLimiter("c", initial=1, min_limit=1, max_limit=1)
+
+    async def go():
+        await lim.acquire()
+        waiter = asyncio.create_task(lim.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert lim.queue_depth == 0
+        lim.release(0.01)
+        await asyncio.wait_for(lim.acquire(), 0.1)
+
+    asyncio.run(go())
+
+
+def test_provider_calls_respect_limit(monkeypatch):
+    active = [0]
+    peak = [0]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.01)
+        active[0] -= 1
+        return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+    for k, v in {
+        "PROVIDER_CACHE_ENABLED": "false",
+        "PROVIDER_COALESCE_ENABLED": "false",
+        "PROVIDER_CONCURRENCY_INITIAL": "2",
+        "PROVIDER_CONCURRENCY_MAX": "2",
+    }.items():
+        monkeypatch.setenv(k, v)
+    import innerloop.settings as settings
+
+    importlib.reload(settings)
+    from innerloop.domain import concurrency, engine
+
+    monkeypatch.setattr(concurrency, "_limiters", {})
+    prov = engine.OpenRouterProvider("k")
+    prov.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def go():
+        out = await asyncio.gather(
+            *(prov.complete(f"q{i}", model="m") for i in range(6))
+        )
+        assert out == ["ok"] * 6
+        assert peak[0] == 2
+        await prov.aclose()
+
+    asyncio.run(go())
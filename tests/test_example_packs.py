@@ -0,0 +1,94 @@
+import json
+import os
+
+import pytest
+
+from innerloop.domain import examples
+from innerloop.domain.examples import PackRegistry, load_pack
+
+
+def _write_pack(tmp_path, rows, metrics=("exact_match",)):
+    (tmp_path / "manifest.yaml").write_text(
+        f"packs:\n  big:\n    path: big.jsonl\n    metrics: {list(metrics)}\n"
+    )
+    data = tmp_path / "big.jsonl"
+    data.write_text(rows)
+    return tmp_path / "manifest.yaml", data
+
+
+def _bump(path, step):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + step))
+
+
+def test_load_pack_is_cached():
+    pack = load_pack("toy_qa")
+    assert load_pack("toy_qa") is pack
+    assert [(e.id, e.input, e.output) for e in pack.examples] == [
+        ("1", "2+2?", "4"),
+        ("2", "capital of france?", "paris"),
+    ]
+    with pytest.raises(ValueError):
+        load_pack("nope")
+
+
+def test_pack_file_indexes_lines_and_decodes_lazily(tmp_path, monkeypatch):
+    rows = "\n".join(
+        json.dumps({"id": i, "input": f"q{i}", "output": f"a{i}", "tag": i % 3})
+        for i in range(50)
+    )
+    manifest, _ = _write_pack(tmp_path, rows + "\n\n  \n" + '{"id": "last"}')
+    pack = PackRegistry(manifest).get("big")
+    seq = pack.examples
+    assert len(seq) == 51
+    assert seq[7].input == "q7" and seq[7].meta == {"tag": 1}
+    assert seq[-1].id == "last" and seq[-1].input == ""
+    assert [e.id for e in seq[10:13]] == ["10", "11", "12"]
+
+    calls = []
+    decode = examples._decode
+    monkeypatch.setattr(
+        examples, "_decode", lambda line: calls.append(line) or decode(line)
+    )
+    picked = pack.sample(5, seed=3)
+    assert len(calls) == 5 and len({e.id for e in picked}) == 5
+    assert [e.id for e in pack.sample(5, seed=3)] == [e.id for e in picked]
+    assert len(pack.sample(500)) == 51
+
+
+def test_registry_reloads_when_files_change(tmp_path):
+    manifest, data = _write_pack(tmp_path, '{"id": 1, "input": "a", "output": "b"}\n')
+    registry = PackRegistry(manifest)
+    first = registry.get("big")
+    assert registry.get("big") is first
+
+    data.write_text('{"id": 1, "input": "a", "output": "b"}\n{"id": 2}\n')
+    _bump(data, 1_000_000)
+    second = registry.get("big")
+    assert second is not first and len(second.examples) == 2
+
+    text = manifest.read_text().replace("exact_match", "judge")
+    manifest.write_text(text)
+    _bump(manifest, 1_000_000)
+    assert registry.get("big").metrics == ["judge"]
+
+
+def test_held_pack_survives_rewrites(tmp_path):
+    rows = "".join(f'{{"id": {i}, "input": "q{i}"}}\n' for i in range(2000))
+    manifest, data = _write_pack(tmp_path, rows)
+    registry = PackRegistry(manifest)
+    held = registry.get("big").examples
+    # Atomic replace: the held descriptor keeps reading the old file.
+    tmp = tmp_path / "big.jsonl.tmp"
+    tmp.write_text('{"id": "new"}\n')
+    os.replace(tmp, data)
+    assert held[1999].input == "q1999"
+    assert [e.id for e in registry.get("big").examples] == ["new"]
+
+    held = registry.get("big").examples
+    with data.open("r+") as f:
+        f.truncate(0)
+    # In-place truncation is a short read, not a SIGBUS.
+    with pytest.raises(ValueError, match="truncated"):
+        held[0]
+    assert len(registry.get("big").examples) == 0
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from innerloop.api.jobs.store import MemoryJobStore, SQLiteJobStore
+from innerloop.domain import dedup
+
+AUTH = {"Authorization": "Bearer token"}
+BASE = "Translate the following French sentence into English: {}"
+
+
+def _ex(i, text, expected="x"):
+    return {"id": f"e{i}", "input": text, "expected": expected, "meta": {}}
+
+
+def test_signatures_estimate_jaccard_with_and_without_numpy(monkeypatch):
+    a = _ex(1, BASE.format("je suis content de vous voir"))
+    b = _ex(2, BASE.format("je suis content de vous voir!!"))
+    c = _ex(3, "Add these two integers and reply with the sum only")
+    hasher = dedup.MinHasher(128)
+    assert dedup.similarity(hasher.signature(a), hasher.signature(b)) == 1.0
+    assert dedup.similarity(hasher.signature(a), hasher.signature(c)) < 0.2
+    sig = hasher.signature(a)
+    monkeypatch.setattr(dedup, "np", None)
+    assert dedup.MinHasher(128).signature(a) == sig
+
+
+def test_lsh_params_put_the_threshold_on_the_s_curve():
+    bands, rows = dedup.lsh_params(0.9, 128)
+    assert bands * rows <= 128
+    assert 1 - (1 - 0.95**rows) ** bands > 0.95
+    assert 1 - (1 - 0.5**rows) ** bands < 0.01
+
+
+def test_split_duplicates_within_batch_and_against_index():
+    index = dedup.LSHIndex(0.8)
+    index.add(_ex(1, BASE.format("il fait beau aujourd'hui"), "nice weather"))
+    items = [
+        _ex(2, BASE.format("il fait beau aujourd'hui."), "nice weather"),
+        _ex(3, BASE.format("ou est la gare la plus proche"), "station"),
+        _ex(4, BASE.format("où est la gare la plus proche ?"), "station"),
+        _ex(1, BASE.format("il fait beau aujourd'hui"), "lovely weather"),
+    ]
+    kept, merged = dedup.split_duplicates(items, index)
+    assert [k["id"] for k in kept] == ["e3", "e1"]
+    assert [(m["id"], m["duplicate_of"]) for m in merged] == [
+        ("e2", "e1"),
+        ("e4", "e3"),
+    ]
+    assert all(m["similarity"] >= 0.8 for m in merged)
+    assert len(index) == 1
+
+
+def test_bulk_ingest_drops_near_duplicates(make_client):
+    c = make_client(EXAMPLES_DEDUP="true")
+    with c:
+        items = [
+            {"id": "a", "input": BASE.format("bonjour mon ami"), "expected": "hi"},
+            {"id": "b", "input": BASE.format("bonjour, mon ami"), "expected": "hi"},
+            {"id": "c", "input": "Sum 2 and 2", "expected": "4"},
+        ]
+        body = c.post("/v1/examples/bulk", json=items, headers=AUTH).json()
+        assert body["upserted"] == 2
+        assert [m["duplicate_of"] for m in body["merged"]] == ["a"]
+        again = c.post(
+            "/v1/examples/bulk",
+            json=[{"id": "d", "input": BASE.format("Bonjour mon ami"), "expected": "hi"}],
+            headers=AUTH,
+        ).json()
+        assert again["upserted"] == 0 and again["merged"][0]["id"] == "d"
+        ids = {e["id"] for e in c.get("/v1/examples", headers=AUTH).json()["examples"]}
+        assert ids == {"a", "c"}
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_dedup_store_streams_and_keeps_first(backend, tmp_path):
+    async def go():
+        if backend == "sqlite":
+            store = await SQLiteJobStore.create(str(tmp_path / "d.db"))
+        else:
+            store = MemoryJobStore()
+        docs = []
+        for i in range(30):
+            docs.append(_ex(f"{i}", f"Question {i}: what is {i} times {i + 3}?"))
+            docs.append(_ex(f"{i}dup", f"question {i} - what is {i} times {i + 3}"))
+        await store.upsert_examples(docs)
+        index = await store.near_dup_index()
+        preview = await dedup.dedup_store(store, dry_run=True, chunk_size=7)
+        assert preview["scanned"] == 60 and preview["removed"] == 0
+        assert len(preview["merged"]) == 30
+        result = await dedup.dedup_store(store, chunk_size=7)
+        assert result["removed"] == 30
+        assert {m["duplicate_of"] for m in result["merged"]} == {
+            f"e{i}" for i in range(30)
+        }
+        remaining = await store.list_examples(limit=100)
+        assert sorted(d["id"] for d in remaining) == sorted(f"e{i}" for i in range(30))
+        assert len(index) == 30
+        await store.close()
+
+    asyncio.run(go())
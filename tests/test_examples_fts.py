@@ -0,0 +1,105 @@
+import asyncio
+import sqlite3
+
+from innerloop.api.jobs.store import SQLiteJobStore
+from innerloop.domain.retrieval import fts_query, retrieve
+
+
+def _ex(i, text, expected="x"):
+    return {"id": f"e{i}", "input": text, "expected": expected, "meta": {"n": i}}
+
+
+def test_fts_query_quotes_tokens():
+    assert fts_query('What\'s "NEAR" AND or-not?') == (
+        '"what" OR "s" OR "near" OR "and" OR "or" OR "not"'
+    )
+    assert fts_query("  !! ") == ""
+
+
+def test_fts_mirror_tracks_upserts_and_deletes(tmp_path):
+    async def go():
+        store = await SQLiteJobStore.create(str(tmp_path / "f.db"))
+        assert store.fts
+        await store.upsert_examples(
+            [
+                _ex(1, "translate bonjour to english", "hello"),
+                _ex(2, "translate bonjour bonjour please", "hello hello"),
+                _ex(3, "sum two numbers", "4"),
+            ]
+        )
+        hits = await store.search_examples("bonjour", 5)
+        assert [h["id"] for h in hits] == ["e2", "e1"]
+        assert hits[0]["meta"] == {"n": 2}
+
+        await store.upsert_examples([_ex(2, "multiply numbers", "6")])
+        assert [h["id"] for h in await store.search_examples("bonjour", 5)] == ["e1"]
+        assert {h["id"] for h in await store.search_examples("numbers", 5)} == {
+            "e2",
+            "e3",
+        }
+        await store.delete_example("e1")
+        assert await store.search_examples("bonjour", 5) == []
+        assert await store.search_examples("?!", 5) == []
+        await store.close()
+
+    asyncio.run(go())
+
+
+def test_existing_rows_are_indexed_on_open(tmp_path):
+    path = str(tmp_path / "old.db")
+    db = sqlite3.connect(path)
+    db.execute(
+        "CREATE TABLE examples (id TEXT PRIMARY KEY, input TEXT, expected TEXT,"
+        " meta TEXT)"
+    )
+    db.execute("INSERT INTO examples VALUES ('old', 'legacy needle', 'y', '{}')")
+    db.commit()
+    db.close()
+
+    async def go():
+        store = await SQLiteJobStore.create(path)
+
+        async def no_scan():
+            raise AssertionError("retrieve should query FTS, not load rows")
+
+        store.example_index = no_scan
+        out = await retrieve("needle", 2, store)
+        assert [d["id"] for d in out] == ["old"]
+        await store.close()
+
+    asyncio.run(go())
+
+
+def test_legacy_rowid_table_migrates_to_seq(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    db = sqlite3.connect(path)
+    db.executescript(
+        """
+        CREATE TABLE examples (id TEXT PRIMARY KEY, input TEXT, expected TEXT,
+            meta TEXT);
+        CREATE VIRTUAL TABLE examples_fts USING fts5(
+            input, expected, content='examples', content_rowid='rowid');
+        INSERT INTO examples VALUES ('a', 'alpha needle', 'y', '{}');
+        INSERT INTO examples VALUES ('b', 'beta', 'y', '{}');
+        INSERT INTO examples VALUES ('c', 'gamma needle', 'y', '{}');
+        INSERT INTO examples_fts(examples_fts) VALUES('rebuild');
+        DELETE FROM examples WHERE id='b';
+        """
+    )
+    db.commit()
+    db.close()
+
+    async def go():
+        store = await SQLiteJobStore.create(path)
+        await store.upsert_examples([_ex(4, "delta needle")])
+        async with store.db.execute("SELECT seq, id FROM examples ORDER BY seq") as cur:
+            assert await cur.fetchall() == [(1, "a"), (3, "c"), (4, "e4")]
+        await store.db.execute("VACUUM")
+        hits = await store.search_examples("needle", 5)
+        assert sorted(h["id"] for h in hits) == ["a", "c", "e4"]
+        await store.delete_example("c")
+        assert [h["id"] for h in await store.search_examples("gamma", 5)] == []
+        await store.close()
+
+    asyncio.run(go())
+
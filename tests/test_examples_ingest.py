@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+from innerloop.api.routers.examples import _ndjson_lines
+
+AUTH = {"Authorization": "Bearer token"}
+
+
+def _lines(chunks, max_line=10):
+    async def source():
+        for chunk in chunks:
+            yield chunk
+
+    async def go():
+        return [item async for item in _ndjson_lines(source(), max_line)]
+
+    return asyncio.run(go())
+
+
+def test_ndjson_lines_reassemble_and_skip_oversized():
+    assert _lines([b'{"a"', b":1}\n\n", b"[2]\n[3]"]) == [
+        (1, b'{"a":1}'),
+        (3, b"[2]"),
+        (4, b"[3]"),
+    ]
+    # Over the cap: dropped up to its newline, even across chunks.
+    assert _lines([b"0123456789ABC", b"DEF", b"\n[1]\n"]) == [(1, None), (2, b"[1]")]
+    assert _lines([b"[1]\n0123456789", b"0123456789\n"]) == [(1, b"[1]"), (2, None)]
+    assert _lines([b"[1]\n", b"0123456789AB"]) == [(1, b"[1]"), (2, None)]
+
+
+def test_ingest_streams_past_request_cap_in_chunks(make_client, tmp_path):
+    c = make_client(
+        JOB_STORE="sqlite",
+        SQLITE_PATH=str(tmp_path / "ingest.db"),
+        EXAMPLES_INGEST_CHUNK="500",
+    )
+
+    def body():
+        for i in range(2000):
+            row = {"id": f"e{i}", "input": f"question {i} " + "x" * 40}
+            yield (json.dumps(row) + "\n").encode()
+        yield b"not json\n"
+        yield b'{"input": "unknown field", "extra": 1}\n'
+        yield b'["a list"]\n'
+        yield b'{"id": "tail", "input": "no trailing newline"}'
+
+    with c:
+        res = c.post(
+            "/v1/examples/ingest",
+            content=body(),
+            headers={**AUTH, "Content-Type": "application/x-ndjson"},
+        )
+        assert res.status_code == 200, res.text
+        out = res.json()
+        assert out["received"] == 2004
+        assert out["upserted"] == 2001
+        assert out["rejected"] == 3
+        assert out["chunks"] == 5
+        assert [e["line"] for e in out["errors"]] == [2001, 2002, 2003]
+        rows = c.get("/v1/examples?limit=5000", headers=AUTH).json()["examples"]
+        assert len(rows) == 2001
+        assert {"e0", "e1999", "tail"} <= {r["id"] for r in rows}
+
+
+def test_ingest_rejects_deeply_nested_line(make_client):
+    nested = b"[" * 40000  # under the line cap, past the parser's recursion limit
+    body = b'{"id": "a", "input": "x"}\n' + nested + b'\n{"id": "b", "input": "y"}\n'
+    with make_client() as c:
+        res = c.post(
+            "/v1/examples/ingest",
+            content=body,
+            headers={**AUTH, "Content-Type": "application/x-ndjson"},
+        )
+        assert res.status_code == 200, res.text
+        out = res.json()
+        assert (out["upserted"], out["rejected"]) == (2, 1)
+        assert [e["line"] for e in out["errors"]] == [2]
+
@@ -0,0 +1,125 @@
+import asyncio
+import importlib
+import time
+
+from fastapi.testclient import TestClient
+import pytest
+
+PAYLOAD = {
+    "prompt": "answer:",
+    "mode": "gepa",
+    "dataset": {"name": "toy_qa"},
+    "budget": {"max_generations": 3},
+}
+
+
+async def _noop_emit(job, event, data):
+    return None
+
+
+def test_resume_matches_uninterrupted_run(monkeypatch):
+    monkeypatch.setenv("USE_MODEL_STUB", "true")
+    import innerloop.settings as settings
+
+    importlib.reload(settings)
+    from innerloop.domain.gepa_loop import gepa_loop
+
+    states = []
+
+    async def save(state):
+        states.append(state)
+
+    full = asyncio.run(gepa_loop(None, _noop_emit, PAYLOAD, checkpoint=save))
+    assert states and states[0]["gen"] == 1
+    resumed = asyncio.run(gepa_loop(None, _noop_emit, PAYLOAD, resume=states[0]))
+    assert resumed == full
+
+
+@pytest.mark.timeout(10)
+def test_interrupted_job_resumes_on_startup(monkeypatch, tmp_path):
+    db = tmp_path / "ckpt.db"
+    monkeypatch.setenv("JOB_STORE", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(db))
+    monkeypatch.setenv("OPENROUTER_API_KEY", "dev")
+    monkeypatch.setenv("API_BEARER_TOKENS", '["token"]')
+    import innerloop.settings as settings
+
+    importlib.reload(settings)
+    from innerloop.api.jobs.registry import Job, JobStatus
+    from innerloop.api.jobs.store import SQLiteJobStore
+
+    async def seed():
+        store = await SQLiteJobStore.create(str(db))
+        job = Job(id="resume-me")
+        job.status = JobStatus.RUNNING
+        await store.save_job(job)
+        for i, ev in enumerate(["started", "generation_started", "budget_progress"]):
+            env = {"type": ev, "job_id": job.id, "ts": 0.0, "id": i + 1, "data": {}}
+            await store.save_event(job.id, i + 1, env)
+        await store.save_checkpoint(
+            job.id,
+            "dead-worker",
+            {"iterations": 1, "payload": PAYLOAD, "next_event_id": 3, "state": None},
+        )
+        await store.release_checkpoints("dead-worker")
+        await store.close()
+
+    asyncio.run(seed())
+    import innerloop.main as main
+
+    importlib.reload(main)
+    with TestClient(main.app) as client:
+        headers = {"Authorization": "Bearer token", "Last-Event-ID": "3"}
+        ids, events = [], []
+        with client.stream(
+            "GET", "/v1/optimize/resume-me/events", headers=headers
+        ) as stream:
+            for line in stream.iter_lines():
+                if line.startswith("id:"):
+                    ids.append(int(line.split(":", 1)[1]))
+                if line.startswith("event:"):
+                    events.append(line.split(":", 1)[1].strip())
+                    if events[-1] == "finished":
+                        break
+        assert events[0] == "resumed"
+        assert ids[0] == 4 and ids == sorted(ids)
+        state = client.get("/v1/optimize/resume-me", headers=headers).json()
+        assert state["status"] == "finished"
+        assert "best_prompt" in state["result"]
+
+
+def test_checkpoints_default_on_for_sqlite_only(set_env):
+    from innerloop.settings import get_settings
+
+    set_env(JOB_STORE="memory")
+    assert get_settings().GEPA_CHECKPOINT_ENABLED is False
+    set_env(JOB_STORE="sqlite")
+    assert get_settings().GEPA_CHECKPOINT_ENABLED is True
+    set_env(JOB_STORE="memory", GEPA_CHECKPOINT_ENABLED="true")
+    assert get_settings().GEPA_CHECKPOINT_ENABLED is True
+
+
+@pytest.mark.timeout(10)
+def test_slow_generation_keeps_its_lease(monkeypatch, set_env):
+    set_env(GEPA_CHECKPOINT_ENABLED="true", GEPA_CHECKPOINT_LEASE_S="0.3")
+    from innerloop.api.jobs import registry as reg
+    from innerloop.api.jobs.store import MemoryJobStore
+
+    async def slow_loop(job, emit, payload, resume=None, checkpoint=None):
+        await asyncio.sleep(1.0)  # one generation, well past the lease
+        return {"best_prompt": "p"}
+
+    monkeypatch.setattr(reg, "gepa_loop", slow_loop)
+
+    async def go():
+        store = MemoryJobStore()
+        registry = reg.JobRegistry(store)
+        job, _ = await registry.create_job(1, PAYLOAD)
+        await asyncio.sleep(0.6)
+        # A worker starting now must not see the running job as orphaned.
+        assert await store.claim_checkpoints("other", time.time() - 0.3) == []
+        await job.task
+        assert job.status == reg.JobStatus.FINISHED
+        assert store.checkpoints == {}
+
+    asyncio.run(go())
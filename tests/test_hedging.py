@@ -0,0 +1,130 @@
+import asyncio
+
+import httpx
+import pytest
+
+from innerloop.api import metrics
+from innerloop.domain.hedging import Hedger, hedged
+
+
+def _hedger(budget=1.0, samples=20, latency=0.01):
+    h = Hedger(
+        quantile=0.95, window=100, min_samples=samples, min_delay_s=0.0, budget=budget
+    )
+    for _ in range(samples):
+        h.record(latency)
+    return h
+
+
+def test_delay_tracks_quantile_and_budget_caps_hedges():
+    h = Hedger(quantile=0.9, window=100, min_samples=10, min_delay_s=0.0, budget=0.5)
+    for i in range(9):
+        h.record(i / 100)
+    assert h.delay() is None
+    h.record(0.5)
+    assert h.delay() == pytest.approx(0.08)
+    h.earn()
+    assert not h.spend()
+    h.earn()
+    assert h.spend()
+    assert not h.spend()
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    calls = []
+    cancelled = []
+
+    async def call():
+        n = len(calls)
+        calls.append(n)
+        try:
+            await asyncio.sleep(1.0 if n == 0 else 0.0)
+        except asyncio.CancelledError:
+            cancelled.append(n)
+            raise
+        return f"r{n}"
+
+    async def go():
+        snap = metrics.snapshot()
+        fired = snap.get("provider_hedges_fired", 0)
+        won = snap.get("provider_hedges_won", 0)
+        h = _hedger()
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        assert await hedged(call, h) == "r1"
+        assert loop.time() - start < 0.5
+        await asyncio.sleep(0)
+        snap = metrics.snapshot()
+        assert snap["provider_hedges_fired"] == fired + 1
+        assert snap["provider_hedges_won"] == won + 1
+
+    asyncio.run(go())
+    assert cancelled == [0]
+
+
+def test_no_budget_waits_for_primary():
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "slow"
+
+    async def go():
+        before = metrics.snapshot().get("provider_hedges_skipped", 0)
+        assert await hedged(call, _hedger(budget=0.0)) == "slow"
+        assert metrics.snapshot()["provider_hedges_skipped"] == before + 1
+
+    asyncio.run(go())
+    assert len(calls) == 1
+
+
+def test_failed_hedge_does_not_fail_the_call():
+    calls = []
+
+    async def call():
+        n = len(calls)
+        calls.append(n)
+        if n == 0:
+            await asyncio.sleep(0.05)
+            return "primary"
+        raise RuntimeError("hedge failed")
+
+    async def go():
+        assert await hedged(call, _hedger()) == "primary"
+
+    asyncio.run(go())
+    assert len(calls) == 2
+
+
+def test_provider_hedges_slow_upstream(monkeypatch, set_env):
+    set_env(
+        PROVIDER_HEDGE_ENABLED="true",
+        PROVIDER_CACHE_ENABLED="false",
+        PROVIDER_COALESCE_ENABLED="false",
+    )
+    from innerloop.domain import engine, hedging
+
+    monkeypatch.setitem(hedging._hedgers, "m-hedge", _hedger())
+    seen = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(1)
+        if len(seen) == 1:
+            await asyncio.sleep(1.0)
+        return httpx.Response(
+            200, json={"choices": [{"message": {"content": f"n{len(seen)}"}}]}
+        )
+
+    prov = engine.OpenRouterProvider("k")
+    prov.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def go():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        assert await prov.complete("q", model="m-hedge") == "n2"
+        assert loop.time() - start < 0.5
+        await prov.aclose()
+
+    asyncio.run(go())
+    assert len(seen) == 2
@@ -0,0 +1,98 @@
+import asyncio
+import importlib
+import socket
+import threading
+import time
+
+import pytest
+import uvicorn
+
+from innerloop.api import metrics
+from innerloop.domain.http_pool import HostPools
+from tools.mock_provider import MockConfig, create_app
+
+
+@pytest.fixture
+def mock_server():
+    """Mock provider on a real socket; yields its base URL and client ports."""
+    app = create_app(MockConfig())
+    ports = set()
+
+    async def recording(scope, receive, send):
+        if scope["type"] == "http":
+            ports.add(scope["client"][1])
+        await app(scope, receive, send)
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    config = uvicorn.Config(recording, host="127.0.0.1", port=port, log_level="error")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started and time.monotonic() < deadline:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}/v1", ports
+    server.should_exit = True
+    thread.join(timeout=5)
+
+
+def test_providers_to_one_host_share_a_pool(set_env):
+    set_env(USE_MODEL_STUB="false", OPENROUTER_API_KEY="x", OPENAI_API_KEY="y")
+    from innerloop.domain import engine
+
+    importlib.reload(engine)
+    target = engine.get_target_provider()
+    judge = engine.get_judge_provider()
+    assert target is not judge
+    assert target.client._transport is judge.client._transport
+    # Auth and judge headers stay per client.
+    assert judge.client.headers.get("X-OpenAI-Api-Key") == "y"
+    assert "X-OpenAI-Api-Key" not in target.client.headers
+
+
+def test_warm_pool_is_reused_without_new_connections(
+    monkeypatch, set_env, mock_server
+):
+    url, ports = mock_server
+    set_env(OPENROUTER_BASE_URL=url, PROVIDER_CACHE_ENABLED="false")
+    from innerloop.domain import engine
+
+    pools = HostPools()
+    monkeypatch.setattr(engine, "get_transport", pools.transport_for)
+
+    async def go():
+        await pools.warm_up([url], connections=2)
+        assert len(ports) == 2
+        target = engine.OpenRouterProvider("k")
+        judge = engine.OpenRouterProvider("k", extra_headers={"X-Judge": "1"})
+        for i in range(5):
+            assert await target.complete(f"t{i}", model="m") == f"t{i}"
+            assert await judge.complete(f"j{i}", model="m") == f"j{i}"
+        await target.aclose()
+        # Closing one provider leaves the shared pool usable for the other.
+        assert await judge.complete("again", model="m") == "again"
+        # Every call rode one of the two warm connections.
+        assert len(ports) == 2
+        (stats,) = pools.stats().values()
+        assert stats == {"requests": 13, "active": 0}
+        await pools.aclose()
+
+    asyncio.run(go())
+    snap = metrics.snapshot()
+    assert snap["provider_pool_requests_127_0_0_1"] == 13
+    assert snap["provider_pool_active_127_0_0_1"] == 0
+
+
+def test_warm_up_failure_is_counted_not_raised():
+    pools = HostPools()
+
+    async def go():
+        before = metrics.snapshot().get("provider_pool_warmup_failures", 0)
+        await pools.warm_up(["http://127.0.0.1:1/v1"], connections=1)
+        assert metrics.snapshot()["provider_pool_warmup_failures"] == before + 1
+        await pools.aclose()
+
+    asyncio.run(go())
@@ -0,0 +1,90 @@
+import asyncio
+import json
+import re
+
+from innerloop.api import metrics
+from innerloop.domain import judge as dj
+
+# Live judge path with the QPS limiter off.
+LIVE_JUDGE = {"USE_MODEL_STUB": "false", "JUDGE_QPS_MAX": "0"}
+
+
+class BatchProvider:
+    """Scores each candidate by its length; can drop, truncate or garble answers."""
+
+    def __init__(self, drop=(), garble=False, partial=()):
+        self.calls = []
+        self.drop = set(drop)
+        self.garble = garble
+        self.partial = set(partial)
+
+    def _scores(self, text):
+        if text in self.partial:
+            return {"brevity": len(text)} if len(text) % 2 else {}
+        return {"brevity": len(text), "diversity": 0, "coverage": 0}
+
+    async def complete(self, prompt, **kwargs):
+        self.calls.append(prompt)
+        cands = re.findall(r"^Candidate (c\d+): (.*)$", prompt, re.M)
+        if not cands:
+            cand = re.search(r"^Candidate: (.*)$", prompt, re.M).group(1)
+            return json.dumps({"scores": {"brevity": len(cand)}})
+        if self.garble:
+            return "not json"
+        return json.dumps(
+            {
+                "results": [
+                    {"id": cid, "scores": self._scores(text)}
+                    for cid, text in cands
+                    if text not in self.drop
+                ]
+            }
+        )
+
+
+def test_rank_scores_k_candidates_per_call(monkeypatch, set_env):
+    set_env(**LIVE_JUDGE, JUDGE_BATCH_SIZE=3)
+    prov = BatchProvider()
+    monkeypatch.setattr(dj, "get_judge_provider", lambda s: prov)
+    proposals = ["a", "bbbbb", "cc", "dddd", "eee"]
+    ranked = asyncio.run(dj.JudgeLLM().rank(prompt="p", proposals=proposals))
+    assert [p for p, _ in ranked] == ["bbbbb", "dddd", "eee", "cc", "a"]
+    assert len(prov.calls) == 2
+    assert all(p.count("Prompt: p") == 1 for p in prov.calls)
+
+
+def test_token_budget_splits_batches(monkeypatch, set_env):
+    set_env(**LIVE_JUDGE, JUDGE_BATCH_SIZE=8, JUDGE_BATCH_MAX_TOKENS=150)
+    prov = BatchProvider()
+    monkeypatch.setattr(dj, "get_judge_provider", lambda s: prov)
+    cands = ["x" * 200, "y" * 200, "z"]
+    out = asyncio.run(dj.judge_scores_batch("p", cands, None, ["brevity"]))
+    assert [r["scores"]["brevity"] for r in out] == [10.0, 10.0, 1.0]
+    assert len(prov.calls) >= 2
+
+
+def test_missing_or_invalid_results_fall_back_to_single(monkeypatch, set_env):
+    set_env(**LIVE_JUDGE, JUDGE_BATCH_SIZE=4)
+    prov = BatchProvider(drop={"bb"})
+    monkeypatch.setattr(dj, "get_judge_provider", lambda s: prov)
+    before = metrics.snapshot().get("judge_batch_fallbacks", 0)
+    out = asyncio.run(dj.judge_scores_batch("p", ["a", "bb", "ccc"], None, ["brevity"]))
+    assert [r["scores"]["brevity"] for r in out] == [1.0, 2.0, 3.0]
+    assert len(prov.calls) == 2
+    assert metrics.snapshot()["judge_batch_fallbacks"] == before + 1
+
+    garbled = BatchProvider(garble=True)
+    monkeypatch.setattr(dj, "get_judge_provider", lambda s: garbled)
+    out = asyncio.run(dj.judge_scores_batch("p", ["a", "bb"], None, ["brevity"]))
+    assert [r["scores"]["brevity"] for r in out] == [1.0, 2.0]
+    assert len(garbled.calls) == 3
+
+
+def test_incomplete_scores_fall_back_to_single(monkeypatch, set_env):
+    set_env(**LIVE_JUDGE, JUDGE_BATCH_SIZE=4)
+    prov = BatchProvider(partial={"bb", "ddd"})
+    monkeypatch.setattr(dj, "get_judge_provider", lambda s: prov)
+    out = asyncio.run(dj.judge_scores_batch("p", ["a", "bb", "ddd"], None, None))
+    assert [r["scores"]["brevity"] for r in out] == [1.0, 2.0, 3.0]
+    # One batch call, then one single call each for the empty and partial entry.
+    assert len(prov.calls) == 3
@@ -0,0 +1,90 @@
+import asyncio
+import sqlite3
+
+from innerloop.api import metrics
+from innerloop.api.jobs import store as store_mod
+from innerloop.api.jobs.store import MemoryJobStore, SQLiteJobStore
+
+
+def test_keys_are_fixed_width_and_scoped():
+    short = store_mod.judge_cache_key("t", "a", "b", "m", "1")
+    long = store_mod.judge_cache_key("t" * 5000, "a" * 5000, "b", "m", "1")
+    assert len(short[0]) == len(long[0]) == 16
+    assert short != store_mod.judge_cache_key("t", "a", "b", "other-model", "1")
+    assert short != store_mod.judge_cache_key("t", "a", "b", "m", "2")
+    # Length-prefixed fields: shifting text between fields changes the key.
+    assert short != store_mod.judge_cache_key("t", "ab", "", "m", "1")
+
+
+def test_memory_lru_bound_and_model_scope():
+    async def go():
+        store = MemoryJobStore()
+        store.judge_cache_max = 2
+        await store.set_judge_cached("t", "a", "b", "A", 0.9)
+        await store.set_judge_cached("t", "a", "c", "B", 0.8)
+        assert await store.get_judge_cached("t", "a", "b")  # refresh "a/b"
+        await store.set_judge_cached("t", "a", "d", "A", 0.7)
+        assert await store.get_judge_cached("t", "a", "c") is None
+        assert await store.get_judge_cached("t", "a", "b") == {
+            "winner": "A",
+            "confidence": 0.9,
+        }
+        assert await store.get_judge_cached("t", "a", "b", model="other") is None
+
+    asyncio.run(go())
+
+
+def test_collision_reads_as_miss(monkeypatch, tmp_path):
+    def colliding(task, a, b, model, template):
+        real = store_mod.hashlib.sha256(f"{task}|{a}|{b}".encode()).digest()
+        return b"\0" * 16, real[16:]
+
+    monkeypatch.setattr(store_mod, "judge_cache_key", colliding)
+
+    async def go(store):
+        before = metrics.snapshot().get("judge_cache_collisions", 0)
+        await store.set_judge_cached("t", "a", "b", "A", 0.9)
+        assert await store.get_judge_cached("t", "x", "y") is None
+        assert await store.get_judge_cached("t", "a", "b") is not None
+        assert metrics.snapshot()["judge_cache_collisions"] == before + 1
+
+    asyncio.run(go(MemoryJobStore()))
+
+    async def go_sqlite():
+        store = await SQLiteJobStore.create(str(tmp_path / "c.db"))
+        await go(store)
+        await store.close()
+
+    asyncio.run(go_sqlite())
+
+
+def test_sqlite_evicts_least_recently_used(tmp_path):
+    path = str(tmp_path / "j.db")
+
+    async def go():
+        store = await SQLiteJobStore.create(path)
+        for i in range(5):
+            await store.set_judge_cached("t", "a", f"b{i}", "A", 0.5, model="m")
+            key, _ = store_mod.judge_cache_key("t", "a", f"b{i}", "m", "1")
+            await store.db.execute(
+                "UPDATE judge_cache SET last_used=? WHERE key=?", (float(i), key)
+            )
+        await store.db.commit()
+        purged = await store.purge_expired(
+            0.0,
+            job_ttls={},
+            idempotency_ttl=1.0,
+            judge_cache_ttl=3600.0,
+            batch_size=1,
+            judge_cache_max=2,
+        )
+        assert purged["judge_cache"] == 3
+        assert await store.get_judge_cached("t", "a", "b0", model="m") is None
+        assert await store.get_judge_cached("t", "a", "b4", model="m") is not None
+        await store.close()
+
+    asyncio.run(go())
+    con = sqlite3.connect(path)
+    cols = {row[1] for row in con.execute("PRAGMA table_info(judge_cache)")}
+    con.close()
+    assert {"key", "verify"} <= cols and "task" not in cols
@@ -21,7 +21,8 @@ class _BadJsonProvider:
         return "not-json"
 
 
-async def test_judge_fallback_on_provider_error(monkeypatch):
+async def test_judge_fallback_on_provider_error(monkeypatch, set_env):
+    set_env(USE_MODEL_STUB="false")
     monkeypatch.setattr(
         judge_mod, "get_judge_provider", lambda *a, **k: _FailingProvider()
     )
@@ -33,7 +34,8 @@ async def test_judge_fallback_on_provider_error(monkeypatch):
     assert end == start + 1
 
 
-async def test_judge_fallback_on_invalid_json(monkeypatch):
+async def test_judge_fallback_on_invalid_json(monkeypatch, set_env):
+    set_env(USE_MODEL_STUB="false")
     monkeypatch.setattr(
         judge_mod, "get_judge_provider", lambda *a, **k: _BadJsonProvider()
     )
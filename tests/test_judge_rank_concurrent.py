@@ -0,0 +1,70 @@
+import asyncio
+import json
+import re
+
+import pytest
+
+from innerloop.domain import judge as dj
+
+# Live judge path with the QPS limiter off.
+LIVE_JUDGE = {"USE_MODEL_STUB": "false", "JUDGE_QPS_MAX": "0"}
+
+
+class SlowProvider:
+    def __init__(self, scores, hang=(), fail=()):
+        self.scores = scores
+        self.hang = set(hang)
+        self.fail = set(fail)
+        self.active = 0
+        self.peak = 0
+
+    async def complete(self, prompt, **kwargs):
+        cand = re.search(r"^Candidate: (.*)$", prompt, re.M).group(1)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(10 if cand in self.hang else 0.02)
+        finally:
+            self.active -= 1
+        if cand in self.fail:
+            return "not json"
+        return json.dumps({"scores": {"brevity": self.scores[cand]}})
+
+
+def test_rank_runs_concurrently_with_stable_ties(monkeypatch, set_env):
+    set_env(**LIVE_JUDGE)
+    prov = SlowProvider({"a": 3, "b": 5, "c": 3, "d": 1})
+    monkeypatch.setattr(dj, "get_judge_provider", lambda s: prov)
+    ranked = asyncio.run(dj.JudgeLLM().rank(prompt="p", proposals=["a", "b", "c", "d"]))
+    assert ranked == [("b", 5.0), ("a", 3.0), ("c", 3.0), ("d", 1.0)]
+    assert prov.peak == 4
+
+
+def test_timeouts_and_failures_rank_last(monkeypatch, set_env):
+    set_env(**LIVE_JUDGE, JUDGE_RANK_CALL_TIMEOUT_S="0.2")
+    prov = SlowProvider({"a": 1, "b": 2, "c": 9, "d": 9}, hang={"c"}, fail={"d"})
+    monkeypatch.setattr(dj, "get_judge_provider", lambda s: prov)
+    ranked = asyncio.run(dj.JudgeLLM().rank(prompt="p", proposals=["c", "a", "d", "b"]))
+    assert [p for p, _ in ranked] == ["b", "a", "c", "d"]
+
+
+def test_rank_raises_when_nothing_scored(monkeypatch, set_env):
+    set_env(**LIVE_JUDGE)
+    prov = SlowProvider({}, fail={"a", "b"})
+    monkeypatch.setattr(dj, "get_judge_provider", lambda s: prov)
+    with pytest.raises(RuntimeError):
+        asyncio.run(dj.JudgeLLM().rank(prompt="p", proposals=["a", "b"]))
+
+
+def test_qps_queueing_does_not_count_against_the_call_timeout(monkeypatch, set_env):
+    # Five calls at 20 QPS (burst 1) queue for ~0.2s, well past the timeout.
+    set_env(
+        USE_MODEL_STUB="false",
+        JUDGE_QPS_MAX=20,
+        JUDGE_QPS_BURST=1,
+        JUDGE_RANK_CALL_TIMEOUT_S=0.1,
+    )
+    prov = SlowProvider({c: i for i, c in enumerate("abcde")})
+    monkeypatch.setattr(dj, "get_judge_provider", lambda s: prov)
+    ranked = asyncio.run(dj.JudgeLLM().rank(prompt="p", proposals=list("abcde")))
+    assert ranked == [(c, float(i)) for i, c in reversed(list(enumerate("abcde")))]
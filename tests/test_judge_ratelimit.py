@@ -0,0 +1,68 @@
+import asyncio
+
+from innerloop.api import metrics
+from innerloop.domain.ratelimit import AsyncTokenBucket
+
+
+def test_concurrent_acquires_respect_rate():
+    bucket = AsyncTokenBucket(rate=50.0, burst=1.0, metric="test_bucket_wait_ms")
+
+    async def go():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(*(bucket.acquire() for _ in range(6)))
+        return loop.time() - start
+
+    elapsed = asyncio.run(go())
+    # One token up front, five more at 50/s.
+    assert elapsed >= 5 / 50.0 * 0.9
+    assert metrics.snapshot()["histograms"]["test_bucket_wait_ms"]["count"] >= 6
+
+
+def test_burst_and_fifo_order():
+    bucket = AsyncTokenBucket(rate=100.0, burst=3.0)
+    order = []
+
+    async def worker(i):
+        await bucket.acquire()
+        order.append(i)
+
+    async def go():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(*(worker(i) for i in range(3)))
+        assert loop.time() - start < 0.02  # burst passes immediately
+        await asyncio.gather(*(worker(i) for i in range(3, 8)))
+
+    asyncio.run(go())
+    assert order == list(range(8))
+
+
+def test_judge_pair_shares_limiter(monkeypatch, set_env):
+    set_env(USE_MODEL_STUB="false", JUDGE_QPS_MAX="40", JUDGE_QPS_BURST="2")
+    from innerloop.domain import judge
+
+    class StubProvider:
+        async def complete(self, prompt, **kwargs):
+            return '{"winner": "A", "confidence": 0.9}'
+
+    lim = judge.get_judge_limiter()
+    assert lim.rate == 40 and lim.burst == 2
+    assert judge.get_judge_limiter() is lim
+
+    acquired = []
+    real_acquire = lim.acquire
+
+    async def counting_acquire():
+        acquired.append(True)
+        return await real_acquire()
+
+    monkeypatch.setattr(lim, "acquire", counting_acquire)
+    monkeypatch.setattr(judge, "get_judge_provider", lambda s: StubProvider())
+
+    async def go():
+        return await asyncio.gather(*(judge.judge_pair("t", f"a{i}", "b") for i in range(3)))
+
+    results = asyncio.run(go())
+    assert [r["winner"] for r in results] == ["A"] * 3
+    assert len(acquired) == 3
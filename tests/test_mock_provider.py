@@ -0,0 +1,101 @@
+import asyncio
+
+import httpx
+
+from innerloop.api import metrics
+from tools.mock_provider import MockConfig, create_app
+
+
+def _provider(set_env, cfg: MockConfig):
+    set_env(
+        OPENROUTER_BASE_URL="http://mock/v1/",
+        PROVIDER_CACHE_ENABLED="false",
+        PROVIDER_RETRY_BASE_S="0",
+        PROVIDER_BREAKER_THRESHOLD="100",
+    )
+    from innerloop.domain import engine
+
+    app = create_app(cfg)
+    prov = engine.OpenRouterProvider("k")
+    prov.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+    return app, prov
+
+
+def test_base_url_setting_and_override(set_env):
+    _, prov = _provider(set_env, MockConfig())
+    from innerloop.domain import engine
+
+    assert prov.URL == "http://mock/v1/chat/completions"
+    other = engine.OpenAIProvider("k", base_url="http://localhost:9100")
+    assert other.URL == "http://localhost:9100/chat/completions"
+
+
+def test_mock_reports_usage_and_prefix_cache(set_env):
+    _, prov = _provider(set_env, MockConfig(seed=1))
+    msgs = [
+        {"role": "system", "content": "rubric " * 40},
+        {"role": "user", "content": "hello"},
+    ]
+
+    async def go():
+        before = metrics.snapshot().get("provider_cached_prompt_tokens", 0)
+        assert await prov.complete("hello", model="m", messages=msgs) == "hello"
+        assert metrics.snapshot().get("provider_cached_prompt_tokens", 0) == before
+        await prov.complete("hello", model="m", messages=msgs)
+        assert metrics.snapshot()["provider_cached_prompt_tokens"] > before
+        await prov.aclose()
+
+    asyncio.run(go())
+
+
+def test_prefix_cache_is_bounded_lru():
+    app = create_app(MockConfig(prefix_cache_size=2))
+
+    async def cached(client, system):
+        body = {"messages": [{"role": "system", "content": system}]}
+        r = await client.post("http://mock/v1/chat/completions", json=body)
+        return r.json()["usage"]["prompt_tokens_details"]["cached_tokens"] > 0
+
+    async def go():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app)) as client:
+            assert [await cached(client, s) for s in "abab"] == [False, False, True, True]
+            assert not await cached(client, "c")  # evicts "a", the least recent
+            assert await cached(client, "b")
+            assert not await cached(client, "a")
+
+    asyncio.run(go())
+
+
+def test_injected_429s_are_retried(monkeypatch, set_env):
+    monkeypatch.setenv("PROVIDER_RETRY_ATTEMPTS", "10")
+    app, prov = _provider(
+        set_env, MockConfig(rate_limit_rate=0.5, retry_after_s=0, seed=3)
+    )
+
+    async def go():
+        out = await asyncio.gather(
+            *(prov.complete(f"q{i}", model="m429") for i in range(10))
+        )
+        assert out == [f"q{i}" for i in range(10)]
+        await prov.aclose()
+
+    asyncio.run(go())
+    stats = app.state.stats
+    assert stats["rate_limited"] > 0
+    assert stats["requests"] == 10 + stats["rate_limited"]
+
+
+def test_latency_distribution(set_env):
+    _, prov = _provider(
+        set_env, MockConfig(latency_ms=30, latency="uniform", jitter=10, seed=2)
+    )
+
+    async def go():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(*(prov.complete(f"p{i}", model="m") for i in range(5)))
+        # Concurrent requests overlap rather than queue behind one another.
+        assert 0.02 <= loop.time() - start < 0.5
+        await prov.aclose()
+
+    asyncio.run(go())
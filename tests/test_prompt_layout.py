@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+import httpx
+
+from innerloop.api import metrics
+from innerloop.domain import judge as dj
+from innerloop.domain.examples import Example
+from innerloop.domain.messages import PromptLayout
+
+
+def test_layout_orders_stable_prefix_first():
+    layout = PromptLayout("rules", ("examples",), "candidate")
+    assert layout.text() == "rules\nexamples\ncandidate"
+    assert layout.messages() == [
+        {"role": "system", "content": "rules\nexamples"},
+        {"role": "user", "content": "candidate"},
+    ]
+    hinted = layout.messages(cache_hints=True)[0]["content"][0]
+    assert hinted["cache_control"] == {"type": "ephemeral"}
+    assert layout.kwargs_for(object()) == {}
+
+
+def test_judge_requests_share_a_prefix(monkeypatch, set_env):
+    set_env(USE_MODEL_STUB="false", JUDGE_QPS_MAX="0")
+    seen = []
+
+    class P:
+        SUPPORTED_KWARGS = ("messages", "seed")
+
+        async def complete(self, prompt, **kwargs):
+            seen.append(kwargs["messages"])
+            return json.dumps({"scores": {"brevity": 5}})
+
+    monkeypatch.setattr(dj, "get_judge_provider", lambda s: P())
+    examples = [{"input": "2+2", "expected": "4"}]
+
+    async def go():
+        for cand in ("first answer", "second answer"):
+            await dj.judge_scores("task", cand, examples, ["brevity"])
+
+    asyncio.run(go())
+    assert seen[0][0] == seen[1][0]
+    assert "Examples:" in seen[0][0]["content"]
+    assert seen[0][1]["content"] == "Candidate: first answer"
+
+
+def test_rollouts_send_candidate_as_system_and_record_cache_usage(monkeypatch, set_env):
+    set_env(PROVIDER_CACHE_ENABLED="false", PROVIDER_CACHE_HINTS="true")
+    bodies = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        return httpx.Response(
+            200,
+            json={
+                "choices": [{"message": {"content": "4"}}],
+                "usage": {
+                    "prompt_tokens": 100,
+                    "prompt_tokens_details": {"cached_tokens": 80},
+                },
+            },
+        )
+
+    from innerloop.domain import engine
+    from innerloop.domain import eval as ev
+
+    prov = engine.OpenRouterProvider("k")
+    prov.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(ev, "_CACHE", {})
+    examples = [Example(id="e1", input="2+2", output="4")]
+
+    async def go():
+        before = metrics.snapshot().get("provider_cached_prompt_tokens", 0)
+        res = await ev.evaluate_batch(prov, "Answer tersely.", examples, None, model="m")
+        assert res.mean_scores["exact_match"] == 1.0
+        assert metrics.snapshot()["provider_cached_prompt_tokens"] == before + 80
+        await prov.aclose()
+
+    asyncio.run(go())
+    msgs = bodies[0]["messages"]
+    assert msgs[0]["content"][0]["text"] == "Answer tersely."
+    assert msgs[1] == {"role": "user", "content": "2+2"}
+    ratio = metrics.snapshot()["histograms"]["provider_cached_ratio"]
+    assert ratio["count"] >= 1
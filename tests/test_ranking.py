@@ -0,0 +1,68 @@
+import asyncio
+import importlib
+
+from innerloop.api import metrics
+from innerloop.domain.ranking import bt_rank, fit_bradley_terry
+
+
+def _oracle(quality, calls):
+    async def judge(task, a, b, store=None):
+        calls.append((a, b))
+        return {"winner": "A" if quality[a] >= quality[b] else "B", "confidence": 0.9}
+
+    return judge
+
+
+def test_finds_best_with_fewer_calls_than_round_robin():
+    quality = {f"c{i}": (i * 7) % 16 for i in range(16)}
+    best = max(quality, key=quality.get)
+    calls = []
+    before = metrics.snapshot().get("ranking_calls_saved", 0)
+    res = asyncio.run(bt_rank(list(quality), "t", top_k=1, judge=_oracle(quality, calls)))
+    assert res.order[0] == best
+    assert res.round_robin == 120
+    assert res.comparisons == len(calls) < 60
+    assert res.saved == 120 - len(calls)
+    assert metrics.snapshot()["ranking_calls_saved"] == before + res.saved
+    assert len({frozenset(c) for c in calls}) == len(calls)  # no pair judged twice
+
+
+def test_confidence_weights_the_fit():
+    sure = fit_bradley_terry(["a", "b"], [("a", "b", 1.0)])
+    unsure = fit_bradley_terry(["a", "b"], [("a", "b", 0.55)])
+    coin = fit_bradley_terry(["a", "b"], [("a", "b", 0.5)])
+    assert sure["a"] / sure["b"] > unsure["a"] / unsure["b"] > 1.0
+    assert abs(coin["a"] - coin["b"]) < 1e-9
+
+
+def test_small_pools():
+    res = asyncio.run(bt_rank(["only"], "t"))
+    assert res.order == ["only"] and res.comparisons == 0
+    calls = []
+    res = asyncio.run(bt_rank(["x", "y"], "t", judge=_oracle({"x": 0, "y": 1}, calls)))
+    assert res.order == ["y", "x"] and res.stable
+
+
+def test_eval_uses_bradley_terry(monkeypatch):
+    monkeypatch.setenv("USE_MODEL_STUB", "true")
+    monkeypatch.setenv("RANKING_STRATEGY", "bradley_terry")
+    import innerloop.settings as settings
+
+    importlib.reload(settings)
+    from innerloop.api.jobs.store import MemoryJobStore
+    from innerloop.domain import eval_runner
+
+    events = []
+
+    async def emit(ev, data):
+        events.append(ev)
+
+    async def go():
+        store = MemoryJobStore()
+        await store.upsert_examples([{"id": "e1", "input": "great", "expected": "pos"}])
+        before = metrics.snapshot().get("ranking_comparisons", 0)
+        await eval_runner.run_eval(store, "base prompt", None, 1, {}, emit)
+        assert metrics.snapshot()["ranking_comparisons"] > before
+
+    asyncio.run(go())
+    assert events[0] == "eval_started" and events[-1] == "eval_finished"
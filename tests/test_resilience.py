@@ -0,0 +1,146 @@
+import asyncio
+import importlib
+
+import httpx
+import pytest
+
+from innerloop.api import metrics
+from innerloop.domain import resilience
+from innerloop.domain.examples import Example
+
+OK = {"choices": [{"message": {"content": "ok"}}]}
+
+
+def _provider(monkeypatch, handler, **env):
+    env = {
+        "PROVIDER_CACHE_ENABLED": "false",
+        "PROVIDER_RETRY_BASE_S": "0.001",
+        **env,
+    }
+    for k, v in env.items():
+        monkeypatch.setenv(k, v)
+    import innerloop.settings as settings
+
+    importlib.reload(settings)
+    from innerloop.domain import engine
+
+    monkeypatch.setattr(resilience, "_breakers", {})
+    prov = engine.OpenRouterProvider("k")
+    prov.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return prov
+
+
+def test_rate_limit_is_retried_after_retry_after(monkeypatch):
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.01"})
+        return httpx.Response(200, json=OK)
+
+    prov = _provider(monkeypatch, handler)
+
+    async def go():
+        before = metrics.snapshot().get("provider_retries", 0)
+        assert await prov.complete("q", model="m") == "ok"
+        assert len(calls) == 2
+        assert metrics.snapshot()["provider_retries"] == before + 1
+        await prov.aclose()
+
+    asyncio.run(go())
+
+
+def test_client_errors_are_not_retried(monkeypatch):
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        return httpx.Response(400, json={"error": "bad"})
+
+    prov = _provider(monkeypatch, handler)
+
+    async def go():
+        with pytest.raises(resilience.ProviderError) as info:
+            await prov.complete("q", model="m")
+        assert info.value.kind == "client"
+        assert len(calls) == 1
+        await prov.aclose()
+
+    asyncio.run(go())
+
+
+def test_breaker_opens_and_fails_fast(monkeypatch):
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        return httpx.Response(503)
+
+    prov = _provider(
+        monkeypatch,
+        handler,
+        PROVIDER_RETRY_ATTEMPTS="2",
+        PROVIDER_BREAKER_THRESHOLD="2",
+        PROVIDER_BREAKER_COOLDOWN_S="60",
+    )
+
+    async def go():
+        with pytest.raises(resilience.ProviderError) as info:
+            await prov.complete("q", model="m")
+        assert info.value.kind == "server"
+        assert len(calls) == 2
+        with pytest.raises(resilience.ProviderError) as info:
+            await prov.complete("q", model="m")
+        assert info.value.kind == "circuit_open"
+        assert len(calls) == 2
+        await prov.aclose()
+
+    asyncio.run(go())
+
+
+def test_breaker_half_open_probe_closes_on_success(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    breaker = resilience.CircuitBreaker(threshold=1, cooldown_s=10)
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    now[0] = 10.0
+    assert breaker.allow()
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_failed_rollouts_are_not_cached(monkeypatch):
+    from innerloop.domain import eval as ev
+
+    healthy = [False]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if healthy[0]:
+            return httpx.Response(200, json=OK)
+        return httpx.Response(500)
+
+    prov = _provider(monkeypatch, handler, PROVIDER_RETRY_ATTEMPTS="1")
+    monkeypatch.setattr(ev, "_CACHE", {})
+    examples = [Example(id="e1", input="x", output="ok")]
+
+    async def go():
+        first = await ev.evaluate_batch(prov, "p", examples, None, model="m")
+        assert first.errors == 1
+        assert first.traces[0]["error"] == "server"
+        assert first.mean_scores["exact_match"] == 0.0
+        healthy[0] = True
+        second = await ev.evaluate_batch(prov, "p", examples, None, model="m")
+        assert second.errors == 0 and not second.cached
+        assert second.mean_scores["exact_match"] == 1.0
+        await prov.aclose()
+
+    asyncio.run(go())
+
+
+def test_retry_after_http_date():
+    assert resilience.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert resilience.parse_retry_after("2") == 2.0
+    assert resilience.parse_retry_after("soon") is None
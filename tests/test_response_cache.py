@@ -0,0 +1,151 @@
+import asyncio
+import importlib
+
+import httpx
+import pytest
+
+from innerloop.domain.response_cache import ResponseCache
+
+
+def test_deterministic_calls_hit_cache(monkeypatch):
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        return httpx.Response(
+            200,
+            json={"model": "m-v1", "choices": [{"message": {"content": "yes"}}]},
+        )
+
+    monkeypatch.setenv("PROVIDER_CACHE_ENABLED", "true")
+    import innerloop.settings as settings
+
+    importlib.reload(settings)
+    from innerloop.domain import engine, response_cache
+
+    async def go():
+        await response_cache.close_response_cache()
+        prov = engine.OpenRouterProvider("k")
+        prov.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        assert await prov.complete("q", model="m", temperature=0.0) == "yes"
+        assert await prov.complete("q", model="m", temperature=0.0) == "yes"
+        assert len(calls) == 1
+        await prov.complete("q", model="m", temperature=0.7)
+        await prov.complete("q", model="m", temperature=0.7)
+        assert len(calls) == 3
+        await prov.aclose()
+        await response_cache.close_response_cache()
+
+    asyncio.run(go())
+
+
+def test_errors_are_not_cached(monkeypatch):
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        return httpx.Response(429, json={"error": {"message": "slow down"}})
+
+    monkeypatch.setenv("PROVIDER_RETRY_ATTEMPTS", "1")
+    import innerloop.settings as settings
+
+    importlib.reload(settings)
+    from innerloop.domain import engine, response_cache
+    from innerloop.domain.resilience import ProviderError
+
+    async def go():
+        await response_cache.close_response_cache()
+        prov = engine.OpenRouterProvider("k")
+        prov.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        for _ in range(2):
+            with pytest.raises(ProviderError):
+                await prov.complete("q", model="m-429", temperature=0.0)
+        assert len(calls) == 2
+        await prov.aclose()
+
+    asyncio.run(go())
+
+
+def test_lru_ttl_sqlite_tier_and_version_invalidation(tmp_path):
+    path = str(tmp_path / "rc.db")
+
+    async def go():
+        cache = ResponseCache(max_entries=2, ttl_s=60, sqlite_path=path)
+        await cache.put("a", "m", "v1", "A")
+        await cache.put("b", "m", "v1", "B")
+        await cache.put("c", "m", "v1", "C")
+        assert len(cache) == 2  # "a" evicted from memory ...
+        assert await cache.get("a") == "A"  # ... but served from SQLite
+        await cache.close()
+
+        restarted = ResponseCache(max_entries=2, ttl_s=60, sqlite_path=path)
+        assert await restarted.get("b") == "B"
+        # A new upstream model version drops everything cached under the old one.
+        await restarted.put("d", "m", "v1", "D")
+        await restarted.put("e", "m", "v2", "E")
+        assert await restarted.get("b") is None
+        assert await restarted.get("d") is None
+        assert await restarted.get("e") == "E"
+        await restarted.close()
+
+        expired = ResponseCache(max_entries=2, ttl_s=-1)
+        await expired.put("x", "m", "", "X")
+        assert await expired.get("x") is None
+
+    asyncio.run(go())
+
+
+def test_sqlite_tier_purges_expired_rows_and_caps_size(tmp_path):
+    path = str(tmp_path / "rc.db")
+
+    async def rows(cache):
+        db = await cache._conn()
+        async with db.execute("SELECT key FROM response_cache ORDER BY key") as cur:
+            return [r[0] for r in await cur.fetchall()]
+
+    async def go():
+        stale = ResponseCache(max_entries=0, ttl_s=-1, sqlite_path=path)
+        await stale.put("old", "m", "", "O")
+        await stale.close()
+
+        cache = ResponseCache(max_entries=0, ttl_s=60, sqlite_path=path, max_rows=3)
+        try:
+            assert await rows(cache) == []  # expired on open
+            for key in "abcde":
+                await cache.put(key, "m", "", key)
+            assert await rows(cache) == list("abcde")  # next sweep not due yet
+            cache._next_purge = 0.0
+            await cache.put("f", "m", "", "f")
+            assert await rows(cache) == ["d", "e", "f"]
+        finally:
+            await cache.close()
+
+    asyncio.run(go())
+
+
+
+def test_concurrent_first_lookups_open_one_connection(tmp_path, monkeypatch):
+    import innerloop.domain.response_cache as rc
+
+    real_connect = rc.aiosqlite.connect
+    opened = []
+
+    def counting_connect(*args, **kwargs):
+        conn = real_connect(*args, **kwargs)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(rc.aiosqlite, "connect", counting_connect)
+
+    async def go():
+        cache = ResponseCache(max_entries=0, ttl_s=60, sqlite_path=str(tmp_path / "rc.db"))
+        try:
+            results = await asyncio.gather(*(cache.get(f"k{i}") for i in range(8)))
+            assert results == [None] * 8
+            assert len(opened) == 1
+        finally:
+            await cache.close()
+            for conn in opened:
+                await conn.close()
+
+    asyncio.run(go())
@@ -0,0 +1,124 @@
+import asyncio
+import math
+import random
+
+import pytest
+
+from innerloop.api.jobs.store import MemoryJobStore, SQLiteJobStore
+from innerloop.domain.retrieval import BM25Index, retrieve
+
+
+def _ex(i, text, expected="x"):
+    return {"id": f"e{i}", "input": text, "expected": expected, "meta": {}}
+
+
+def test_bm25_prefers_rare_terms_and_updates_incrementally():
+    index = BM25Index()
+    index.add_many(
+        [
+            _ex(1, "the cat sat on the mat"),
+            _ex(2, "the dog sat on the log"),
+            _ex(3, "a quokka smiled"),
+        ]
+    )
+    hits = index.search("the quokka", 2)
+    assert [d["id"] for _, d in hits][0] == "e3"
+    assert index.search("zebra", 3) == []
+
+    index.add(_ex(3, "a zebra grazed"))
+    assert index.search("quokka", 3) == []
+    assert [d["id"] for _, d in index.search("Zebra!", 3)] == ["e3"]
+    index.remove("e3")
+    assert index.search("zebra", 3) == []
+    assert "zebra" not in index.postings
+    assert len(index) == 2
+
+
+def test_retrieve_covers_the_whole_corpus():
+    store = MemoryJobStore()
+
+    async def go():
+        await store.upsert_examples(
+            [_ex(i, f"filler text number {i}") for i in range(300)]
+            + [_ex(999, "translate bonjour to english", "hello")]
+        )
+        out = await retrieve("bonjour", 4, store)
+        assert [d["id"] for d in out] == ["e999"]
+        await store.delete_example("e999")
+        # No match: fall back to the first examples, as before.
+        out = await retrieve("bonjour", 2, store)
+        assert [d["id"] for d in out] == ["e0", "e1"]
+
+    asyncio.run(go())
+
+
+def test_sqlite_index_loads_once_and_tracks_writes(tmp_path):
+    async def go():
+        store = await SQLiteJobStore.create(str(tmp_path / "r.db"))
+        await store.upsert_examples([_ex(i, f"row {i}") for i in range(12000)])
+        await store.upsert_examples([_ex("x", "needle in haystack")])
+        index = await store.example_index()
+        assert len(index) == 12001
+        assert (await retrieve("needle", 1, store))[0]["id"] == "ex"
+        await store.upsert_examples([_ex("y", "another needle")])
+        assert await store.example_index() is index
+        assert {d["id"] for _, d in index.search("needle", 5)} == {"ex", "ey"}
+        await store.delete_example("ex")
+        assert [d["id"] for _, d in index.search("needle", 5)] == ["ey"]
+        await store.close()
+
+    asyncio.run(go())
+
+
+def test_pruned_search_matches_exhaustive_scores():
+    rng = random.Random(7)
+    words = [f"w{i}" for i in range(60)]
+    cum = [sum(1.0 / (j + 1) for j in range(i + 1)) for i in range(60)]
+    docs = [
+        _ex(i, " ".join(rng.choices(words, cum_weights=cum, k=12))) for i in range(400)
+    ]
+    index = BM25Index()
+    index.add_many(docs)
+    avgdl = sum(index._lengths.values()) / len(index)
+
+    def brute(query):
+        out = []
+        for doc in docs:
+            toks = doc["input"].split() + ["x"]
+            score = 0.0
+            for term in set(query.split()):
+                tf = toks.count(term)
+                if tf:
+                    df = len(index.postings[term])
+                    idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+                    norm = 1.2 * (1 - 0.75 + 0.75 * len(toks) / avgdl)
+                    score += idf * tf * 2.2 / (tf + norm)
+            out.append(score)
+        return sorted(out, reverse=True)[:5]
+
+    for _ in range(50):
+        q = " ".join(rng.choices(words, cum_weights=cum, k=3))
+        got = [s for s, _ in index.search(q, 5)]
+        assert got == pytest.approx(brute(q)[: len(got)])
+
+
+def test_stores_without_search_scan_a_bounded_prefix(monkeypatch):
+    from innerloop.domain import retrieval
+
+    class ScanOnly:
+        def __init__(self, docs):
+            self.docs = docs
+            self.limits = []
+
+        async def iter_examples(self, limit=None, batch_size=1000):
+            self.limits.append(limit)
+            for doc in self.docs[:limit]:
+                yield doc
+
+    monkeypatch.setattr(retrieval, "_FALLBACK_SCAN", 3)
+    docs = [_ex(i, f"filler {i}") for i in range(10)] + [_ex(99, "rare quokka")]
+    store = ScanOnly(docs)
+    assert asyncio.run(retrieval._bm25_search(store, "filler 1", 2))
+    assert asyncio.run(retrieval._bm25_search(store, "quokka", 2)) == []
+    assert store.limits == [3, 3]
+
@@ -0,0 +1,69 @@
+import asyncio
+import importlib
+import json
+
+import httpx
+
+from innerloop.api import metrics
+
+
+def _provider(monkeypatch, handler):
+    monkeypatch.setenv("PROVIDER_COALESCE_ENABLED", "true")
+    monkeypatch.setenv("PROVIDER_CACHE_ENABLED", "false")
+    import innerloop.settings as settings
+
+    importlib.reload(settings)
+    from innerloop.domain import engine
+
+    prov = engine.OpenRouterProvider("k")
+    prov.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return prov
+
+
+def test_identical_concurrent_requests_share_one_call(monkeypatch):
+    bodies = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"choices": [{"message": {"content": "hi"}}]})
+
+    prov = _provider(monkeypatch, handler)
+
+    async def go():
+        before = metrics.snapshot().get("provider_coalesced", 0)
+        same = [prov.complete("q", model="m", temperature=0.0) for _ in range(5)]
+        other = prov.complete("q", model="m", temperature=0.5)
+        out = await asyncio.gather(*same, other)
+        assert out == ["hi"] * 6
+        assert len(bodies) == 2
+        assert metrics.snapshot()["provider_coalesced"] == before + 4
+        # Nothing is retained once the call completes.
+        assert len(prov._flight) == 0
+        await prov.complete("q", model="m", temperature=0.0)
+        assert len(bodies) == 3
+        await prov.aclose()
+
+    asyncio.run(go())
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call(monkeypatch):
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+    prov = _provider(monkeypatch, handler)
+
+    async def go():
+        first = asyncio.create_task(prov.complete("q", model="m"))
+        second = asyncio.create_task(prov.complete("q", model="m"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == "ok"
+        assert len(calls) == 1
+        await prov.aclose()
+
+    asyncio.run(go())
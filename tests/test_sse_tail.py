@@ -0,0 +1,60 @@
+import asyncio
+
+from innerloop.api.jobs.store import MemoryJobStore, SQLiteJobStore
+from innerloop.api.jobs.tailer import StoreTailer
+
+
+def _env(job_id: str, event_id: int, event: str) -> dict:
+    return {"type": event, "job_id": job_id, "ts": 0.0, "id": event_id, "data": {}}
+
+
+def test_tailer_follows_other_connection(tmp_path):
+    path = str(tmp_path / "tail.db")
+
+    async def go():
+        writer = await SQLiteJobStore.create(path)
+        reader = await SQLiteJobStore.create(path)
+        tailer = StoreTailer(reader, min_interval=0.01, max_interval=0.05)
+        try:
+            await writer.save_event("j1", 1, _env("j1", 1, "started"))
+            q = tailer.subscribe("j1", 0)
+            first = await asyncio.wait_for(q.get(), timeout=1)
+            assert first["id"] == 1
+            await writer.save_event("j1", 2, _env("j1", 2, "progress"))
+            await writer.save_event("j1", 3, _env("j1", 3, "finished"))
+            got = [
+                (await asyncio.wait_for(q.get(), timeout=1))["type"] for _ in range(2)
+            ]
+            assert got == ["progress", "finished"]
+            # terminal event drops the subscription
+            assert tailer.subscriptions == 0
+        finally:
+            await tailer.close()
+            await writer.close()
+            await reader.close()
+
+    asyncio.run(go())
+
+
+def test_tailer_multiplexes_jobs_with_one_poller():
+    async def go():
+        store = MemoryJobStore()
+        tailer = StoreTailer(store, min_interval=0.01, max_interval=0.02)
+        qa = tailer.subscribe("a", 0)
+        qb1 = tailer.subscribe("b", 0)
+        qb2 = tailer.subscribe("b", 0)
+        task = tailer._task
+        assert tailer.subscriptions == 3
+        await store.save_event("a", 1, _env("a", 1, "started"))
+        await store.save_event("b", 1, _env("b", 1, "started"))
+        assert (await asyncio.wait_for(qa.get(), timeout=1))["job_id"] == "a"
+        assert (await asyncio.wait_for(qb1.get(), timeout=1))["job_id"] == "b"
+        assert (await asyncio.wait_for(qb2.get(), timeout=1))["job_id"] == "b"
+        assert tailer._task is task
+        tailer.unsubscribe("b", qb1)
+        tailer.unsubscribe("b", qb2)
+        tailer.unsubscribe("a", qa)
+        assert tailer.subscriptions == 0
+        await tailer.close()
+
+    asyncio.run(go())
@@ -0,0 +1,120 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+
+from innerloop.api import metrics
+from innerloop.domain.eval import evaluate_batch, exact_match_viable
+from innerloop.domain.examples import Example
+from tools.mock_provider import MockConfig, create_app
+
+
+class _Chunks(httpx.AsyncByteStream):
+    """SSE body that records how many chunks the client actually pulled."""
+
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.sent = 0
+        self.closed = False
+
+    async def __aiter__(self):
+        for piece in self.pieces:
+            self.sent += 1
+            chunk = {"choices": [{"delta": {"content": piece}}]}
+            yield f"data: {json.dumps(chunk)}\n\n".encode()
+        yield b"data: [DONE]\n\n"
+
+    async def aclose(self):
+        self.closed = True
+
+
+def _provider(set_env, transport):
+    set_env(OPENROUTER_BASE_URL="http://mock/v1", PROVIDER_RETRY_BASE_S="0")
+    from innerloop.domain import engine
+
+    prov = engine.OpenRouterProvider("k")
+    prov.client = httpx.AsyncClient(transport=transport)
+    return prov
+
+
+def test_exact_match_viable():
+    assert exact_match_viable("", "Positive")
+    assert exact_match_viable("  POS", "positive")
+    assert exact_match_viable("new  yo", "New York")
+    assert not exact_match_viable("neg", "positive")
+    assert not exact_match_viable("positive!", "positive")
+
+
+def test_stream_parses_full_completion_and_usage(set_env):
+    app = create_app(MockConfig())
+    prov = _provider(set_env, httpx.ASGITransport(app=app))
+
+    async def go():
+        before = metrics.snapshot().get("provider_prompt_tokens", 0)
+        out = await prov.complete_stream("the quick brown fox", model="m")
+        assert out == "the quick brown fox"
+        assert metrics.snapshot()["provider_prompt_tokens"] > before
+        await prov.aclose()
+
+    asyncio.run(go())
+    assert app.state.stats["stream_chunks"] == 5
+
+
+def test_stream_stops_reading_once_output_diverges(set_env):
+    stream = _Chunks(["neg", "ative", " because", " the", " review"] * 20)
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(json.loads(request.content))
+        return httpx.Response(200, stream=stream)
+
+    prov = _provider(set_env, httpx.MockTransport(handler))
+    settings = SimpleNamespace(EVAL_STREAM_EARLY_STOP=True, TARGET_MODEL_DEFAULT="m")
+    examples = [Example(id="e1", input="great film", output="positive")]
+
+    async def go():
+        before = metrics.snapshot().get("provider_stream_early_stops", 0)
+        res = await evaluate_batch(prov, "classify:", examples, settings)
+        assert res.mean_scores["exact_match"] == 0.0
+        assert res.traces[0]["output"] == "neg"
+        assert metrics.snapshot()["provider_stream_early_stops"] == before + 1
+        await prov.aclose()
+
+    asyncio.run(go())
+    assert seen[0]["stream"] is True
+    assert stream.sent == 1
+    assert stream.closed
+
+
+def test_stream_runs_to_completion_when_output_matches(set_env):
+    app = create_app(MockConfig())
+    prov = _provider(set_env, httpx.ASGITransport(app=app))
+    settings = SimpleNamespace(EVAL_STREAM_EARLY_STOP=True, TARGET_MODEL_DEFAULT="m")
+    examples = [Example(id="e1", input="Positive", output="positive")]
+
+    async def go():
+        res = await evaluate_batch(prov, "", examples, settings)
+        assert res.mean_scores["exact_match"] == 1.0
+        await prov.aclose()
+
+    asyncio.run(go())
+
+
+def test_stream_error_status_is_classified_and_retried(set_env):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        if len(calls) == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, stream=_Chunks(["ok"]))
+
+    prov = _provider(set_env, httpx.MockTransport(handler))
+
+    async def go():
+        assert await prov.complete_stream("q", model="m-stream-retry") == "ok"
+        await prov.aclose()
+
+    asyncio.run(go())
+    assert len(calls) == 2
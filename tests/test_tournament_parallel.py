@@ -0,0 +1,67 @@
+import asyncio
+
+from innerloop.api.jobs.store import MemoryJobStore
+from innerloop.domain import judge, optimize_engine
+
+
+def _shorter_wins(active, peak, calls):
+    async def fake_judge_pair(task, a, b, store=None):
+        calls.append((a, b))
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.01)
+        active[0] -= 1
+        return {"winner": "A" if (len(a), a) <= (len(b), b) else "B", "confidence": 0.9}
+
+    return fake_judge_pair
+
+
+def test_groups_in_a_round_run_concurrently(monkeypatch):
+    active, peak, calls = [0], [0], []
+    monkeypatch.setattr(optimize_engine, "judge_pair", _shorter_wins(active, peak, calls))
+    cands = ["x" * n for n in (5, 3, 8, 1, 7, 2, 6, 4)]
+    ranked = asyncio.run(optimize_engine.tournament_rank(cands, "t", 2))
+    assert ranked[0] == "x"
+    assert ranked[1:] == [c for c in cands if c != "x"]
+    assert peak[0] == 4  # four groups of two in the first round
+    assert len(calls) == 7
+
+
+def test_full_ranking_orders_by_elimination_round(monkeypatch):
+    active, peak, calls = [0], [0], []
+    monkeypatch.setattr(optimize_engine, "judge_pair", _shorter_wins(active, peak, calls))
+    cands = ["x" * n for n in (5, 3, 8, 1, 7, 2, 6, 4)]
+    ranked = asyncio.run(optimize_engine.tournament_rank_full(cands, "t", 2))
+    assert ranked[:2] == ["x", "xx"]
+    assert set(ranked[2:4]) == {"xxx", "xxxx"}
+    assert len(ranked) == len(cands)
+
+
+def test_cached_results_skip_judge_calls(monkeypatch):
+    monkeypatch.setenv("USE_MODEL_STUB", "true")
+    store = MemoryJobStore()
+    cands = ["bbbb", "a", "ccc", "dd"]
+
+    async def go():
+        first = await optimize_engine.tournament_rank(cands, "t", 2, store)
+        before = judge.CALLS
+        second = await optimize_engine.tournament_rank(cands, "t", 2, store)
+        assert judge.CALLS == before
+        return first, second
+
+    first, second = asyncio.run(go())
+    assert first == second
+    assert first[0] == "a"
+
+
+def test_cached_winner_respects_argument_order(monkeypatch):
+    monkeypatch.setenv("USE_MODEL_STUB", "true")
+    store = MemoryJobStore()
+
+    async def go():
+        res = await judge.judge_pair("t", "zz", "y", store)
+        assert res["winner"] == "B"
+        assert (await judge.judge_pair("t", "zz", "y", store))["winner"] == "B"
+        assert (await judge.judge_pair("t", "y", "zz", store))["winner"] == "A"
+
+    asyncio.run(go())
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from innerloop.api.jobs.store import MemoryJobStore
+from innerloop.domain import retrieval, vectors
+
+
+@pytest.fixture
+def np():
+    return pytest.importorskip("numpy")
+
+
+def _ex(i, text, expected="x"):
+    return {"id": f"e{i}", "input": text, "expected": expected, "meta": {}}
+
+
+CORPUS = [
+    _ex(1, "translate bonjour into english", "hello"),
+    _ex(2, "add the two numbers", "7"),
+    _ex(3, "summarise the paragraph", "short"),
+]
+
+
+def test_fuse_weights_both_rankings():
+    a, b, c = (_ex(i, "") for i in "abc")
+    assert retrieval._fuse([a, b], [c, b], 0.5, 2) == [b, a]
+    assert retrieval._fuse([a, b], [c, b], 1.0, 1) == [c]
+    assert retrieval._fuse([a, b], [c, b], 0.0, 1) == [a]
+
+
+def test_vector_mode_falls_back_to_bm25_without_numpy(monkeypatch, set_env):
+    set_env(RETRIEVAL_MODE="hybrid")
+    monkeypatch.setattr(vectors, "np", None)
+    store = MemoryJobStore()
+
+    async def go():
+        await store.upsert_examples(CORPUS)
+        out = await retrieval.retrieve("numbers", 2, store)
+        assert [d["id"] for d in out] == ["e2"]
+
+    asyncio.run(go())
+
+
+def test_embeddings_are_stable_and_catch_inflections(np):
+    v = vectors.embed("Translation please", 256)
+    assert v.dtype == np.float32
+    assert np.linalg.norm(v) == pytest.approx(1.0, abs=1e-5)
+    assert np.array_equal(v, vectors.embed("translation   PLEASE", 256))
+    index = vectors.VectorIndex(256)
+    index.add_many(CORPUS)
+    # No shared token with "translate", but shared trigrams.
+    assert index.search("translation", 1)[0][1]["id"] == "e1"
+
+
+def test_index_updates_grow_and_reuse_rows(np):
+    index = vectors.VectorIndex(64)
+    index.add_many(_ex(i, f"document number {i} about topic{i}") for i in range(40))
+    assert len(index) == 40
+    assert index.search("topic17", 1)[0][1]["id"] == "e17"
+    index.add(_ex(17, "now about gardening"))
+    assert index.search("gardening", 1)[0][1]["id"] == "e17"
+    index.remove("e17")
+    assert all(d["id"] != "e17" for _, d in index.search("gardening", 40))
+    index.add(_ex(99, "brand new row"))
+    assert index.matrix.shape[0] == 40  # freed row reused
+
+
+def test_ivf_search_finds_near_duplicates(np):
+    index = vectors.VectorIndex(128, ivf_min_docs=200, nprobe=4)
+    index.add_many(
+        _ex(i, f"item {i} colour c{i % 37} shape s{i % 11}") for i in range(400)
+    )
+    assert index._centroids is not None
+    hits = index.search("item 123 colour c12 shape s2", 3)
+    assert hits[0][1]["id"] == "e123"
+
+
+def test_save_and_mmap_load(np, tmp_path):
+    index = vectors.VectorIndex(64)
+    index.add_many(CORPUS)
+    index.remove("e3")
+    index.save(tmp_path / "vec")
+    loaded = vectors.VectorIndex.load(tmp_path / "vec")
+    assert not loaded.matrix.flags.writeable
+    assert loaded.search("bonjour", 1)[0][1]["id"] == "e1"
+    loaded.add(_ex(4, "fresh entry"))
+    assert loaded.search("fresh entry", 1)[0][1]["id"] == "e4"
+    assert len(loaded) == 3
+
+
+def test_hybrid_retrieve_uses_both_signals(np, set_env):
+    set_env(RETRIEVAL_MODE="hybrid")
+    store = MemoryJobStore()
+
+    async def go():
+        await store.upsert_examples(CORPUS)
+        out = await retrieval.retrieve("translation of bonjour", 1, store)
+        assert [d["id"] for d in out] == ["e1"]
+        await store.upsert_examples([_ex(5, "summarize this paragraph")])
+        out = await retrieval.retrieve("summarization", 2, store)
+        assert {d["id"] for d in out} == {"e3", "e5"}
+
+    asyncio.run(go())
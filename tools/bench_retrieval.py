@@ -0,0 +1,99 @@
+"""Benchmark example retrieval on a synthetic corpus.
+
+    PYTHONPATH=. python tools/bench_retrieval.py --docs 1000000 --queries 200
+    PYTHONPATH=. python tools/bench_retrieval.py --mode vector --docs 100000
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import random
+import statistics
+import time
+from typing import Any, Dict, List
+
+from innerloop.domain.retrieval import BM25Index
+from innerloop.domain.vectors import VectorIndex
+
+log = logging.getLogger("gepa.bench_retrieval")
+
+
+def synth_corpus(n: int, vocab: int, length: int, seed: int) -> List[Dict[str, str]]:
+    """Zipf-distributed words, so a few terms have very long postings lists."""
+    rng = random.Random(seed)  # nosec B311 - benchmark data
+    words = [f"w{i}" for i in range(vocab)]
+    cum = list(itertools.accumulate(1.0 / (i + 1) for i in range(vocab)))
+    docs = []
+    for i in range(n):
+        toks = rng.choices(words, cum_weights=cum, k=length)
+        input_text, expected = " ".join(toks[:-2]), " ".join(toks[-2:])
+        docs.append({"id": str(i), "input": input_text, "expected": expected})
+    return docs
+
+
+def _pct(values: List[float], p: int) -> float:
+    return statistics.quantiles(values, n=100)[p - 1] if len(values) > 1 else values[0]
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    docs = synth_corpus(args.docs, args.vocab, args.length, args.seed)
+    index: Any
+    if args.mode == "vector":
+        index = VectorIndex(args.dim, ivf_min_docs=args.ivf_min_docs)
+    else:
+        index = BM25Index()
+    start = time.perf_counter()
+    index.add_many(docs)
+    build_s = time.perf_counter() - start
+
+    rng = random.Random(args.seed + 1)  # nosec B311 - benchmark data
+    queries = [
+        " ".join(rng.choice(docs)["input"].split()[: args.query_terms])
+        for _ in range(args.queries)
+    ]
+    latencies = []
+    for q in queries:
+        t0 = time.perf_counter()
+        index.search(q, args.k)
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+
+    start = time.perf_counter()
+    for doc in docs[: args.updates]:
+        index.add({**doc, "input": doc["input"] + " updated"})
+    update_ms = (time.perf_counter() - start) * 1000.0 / max(1, args.updates)
+    return {
+        "mode": args.mode,
+        "docs": args.docs,
+        "build_s": round(build_s, 3),
+        "search_p50_ms": round(_pct(latencies, 50), 3),
+        "search_p95_ms": round(_pct(latencies, 95), 3),
+        "update_ms": round(update_ms, 4),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=("bm25", "vector"), default="bm25")
+    parser.add_argument("--docs", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=256, help="vector width")
+    parser.add_argument("--ivf-min-docs", type=int, default=50_000)
+    parser.add_argument("--vocab", type=int, default=50_000)
+    parser.add_argument("--length", type=int, default=24, help="tokens per example")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--query-terms", type=int, default=4)
+    parser.add_argument("--updates", type=int, default=1000)
+    parser.add_argument("-k", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="emit results as JSON")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    result = run(args)
+    if args.json:
+        print(json.dumps(result))
+    else:
+        log.info(" ".join(f"{k}={v}" for k, v in result.items()))
+
+
+if __name__ == "__main__":
+    main()
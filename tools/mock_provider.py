@@ -0,0 +1,249 @@
+"""Local OpenAI-compatible mock provider for offline load and latency benchmarks.
+
+Run it and point the service at it::
+
+    python tools/mock_provider.py --port 9100 --latency lognormal --latency-ms 400
+    OPENROUTER_BASE_URL=http://127.0.0.1:9100/v1 OPENROUTER_API_KEY=mock \\
+        USE_MODEL_STUB=false python -m innerloop
+"""
+
+import argparse
+from collections import OrderedDict
+from dataclasses import dataclass
+import json
+import logging
+import math
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List
+
+import anyio
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+log = logging.getLogger("gepa.mock_provider")
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+
+@dataclass
+class MockConfig:
+    # Median latency for lognormal, mean for uniform, exact value for fixed.
+    latency_ms: float = 0.0
+    latency: str = "fixed"
+    # Spread: half-width for uniform (ms), sigma for lognormal.
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after_s: float = 1.0
+    # Delay between streamed chunks (``stream: true`` requests).
+    token_latency_ms: float = 0.0
+    seed: int | None = None
+    model: str = "mock-model"
+    # Distinct system prefixes remembered for cached-token reporting (LRU).
+    prefix_cache_size: int = 1024
+
+
+def _approx_tokens(text: str) -> int:
+    return len(text) // 4 + 1 if text else 0
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, list):
+        return "".join(str(p.get("text", "")) for p in content if isinstance(p, dict))
+    return str(content or "")
+
+
+class _Latency:
+    def __init__(self, cfg: MockConfig, rng: random.Random) -> None:
+        if cfg.latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"unknown latency distribution: {cfg.latency}")
+        self.cfg = cfg
+        self.rng = rng
+
+    def sample(self) -> float:
+        cfg = self.cfg
+        if cfg.latency_ms <= 0:
+            return 0.0
+        if cfg.latency == "uniform":
+            spread = cfg.jitter
+            ms = self.rng.uniform(cfg.latency_ms - spread, cfg.latency_ms + spread)
+        elif cfg.latency == "lognormal":
+            ms = self.rng.lognormvariate(math.log(cfg.latency_ms), cfg.jitter)
+        else:
+            ms = cfg.latency_ms
+        return max(0.0, ms) / 1000.0
+
+
+def create_app(cfg: MockConfig | None = None) -> FastAPI:
+    cfg = cfg or MockConfig()
+    rng = random.Random(cfg.seed)  # nosec B311 - simulated faults, not crypto
+    latency = _Latency(cfg, rng)
+    lock = threading.Lock()
+    # Recently seen system prefixes; repeats are reported as cached prompt
+    # tokens the way providers with automatic prefix caching do. Bounded so a
+    # long benchmark with varied prompts cannot grow it without limit.
+    seen_prefixes: "OrderedDict[str, None]" = OrderedDict()
+    app = FastAPI(title="gepa-next mock provider")
+    app.state.config = cfg
+    app.state.stats = dict.fromkeys(
+        ("requests", "errors", "rate_limited", "stream_chunks"), 0
+    )
+
+    def _roll() -> float:
+        with lock:
+            return rng.random()
+
+    async def _stream(
+        body: Dict[str, Any], content: str, usage: Dict[str, Any]
+    ) -> AsyncIterator[bytes]:
+        base = {
+            "id": f"mock-{app.state.stats['requests']}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model") or cfg.model,
+        }
+        # Roughly one token (four characters) per chunk.
+        for i in range(0, len(content), 4):
+            if cfg.token_latency_ms > 0:
+                await anyio.sleep(cfg.token_latency_ms / 1000.0)
+            delta = {"index": 0, "delta": {"content": content[i : i + 4]}}
+            app.state.stats["stream_chunks"] += 1
+            yield f"data: {json.dumps({**base, 'choices': [delta]})}\n\n".encode()
+        done = {"index": 0, "delta": {}, "finish_reason": "stop"}
+        yield f"data: {json.dumps({**base, 'choices': [done]})}\n\n".encode()
+        if (body.get("stream_options") or {}).get("include_usage"):
+            tail: Dict[str, Any] = {**base, "choices": [], "usage": usage}
+            yield f"data: {json.dumps(tail)}\n\n".encode()
+        yield b"data: [DONE]\n\n"
+
+    async def chat_completions(request: Request) -> Response:
+        body = await request.json()
+        stats = app.state.stats
+        stats["requests"] += 1
+        await anyio.sleep(latency.sample())
+        roll = _roll()
+        if roll < cfg.rate_limit_rate:
+            stats["rate_limited"] += 1
+            return JSONResponse(
+                {"error": {"message": "rate limited", "type": "rate_limit"}},
+                status_code=429,
+                headers={"Retry-After": f"{cfg.retry_after_s:g}"},
+            )
+        if roll < cfg.rate_limit_rate + cfg.error_rate:
+            stats["errors"] += 1
+            return JSONResponse(
+                {"error": {"message": "injected failure", "type": "server_error"}},
+                status_code=500,
+            )
+        messages: List[Dict[str, Any]] = body.get("messages") or []
+        system = "".join(
+            _text(m.get("content")) for m in messages if m.get("role") == "system"
+        )
+        user = next(
+            (
+                _text(m.get("content"))
+                for m in reversed(messages)
+                if m.get("role") == "user"
+            ),
+            "",
+        )
+        prompt_tokens = sum(_approx_tokens(_text(m.get("content"))) for m in messages)
+        cached = 0
+        if system:
+            with lock:
+                if system in seen_prefixes:
+                    cached = _approx_tokens(system)
+                    seen_prefixes.move_to_end(system)
+                elif cfg.prefix_cache_size > 0:
+                    seen_prefixes[system] = None
+                    while len(seen_prefixes) > cfg.prefix_cache_size:
+                        seen_prefixes.popitem(last=False)
+        content = user or system
+        max_tokens = body.get("max_tokens")
+        if isinstance(max_tokens, int) and max_tokens > 0:
+            content = content[: max_tokens * 4]
+        completion_tokens = _approx_tokens(content)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached},
+        }
+        if body.get("stream"):
+            return StreamingResponse(
+                _stream(body, content, usage), media_type="text/event-stream"
+            )
+        return JSONResponse(
+            {
+                "id": f"mock-{stats['requests']}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model") or cfg.model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": usage,
+            }
+        )
+
+    # Accept both a ``/v1`` base URL and a bare host.
+    app.add_api_route("/v1/chat/completions", chat_completions, methods=["POST"])
+    app.add_api_route("/chat/completions", chat_completions, methods=["POST"])
+
+    @app.get("/stats")
+    async def stats() -> Dict[str, int]:
+        return dict(app.state.stats)
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.0,
+        help="uniform half-width in ms, or lognormal sigma",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--token-latency-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--prefix-cache-size",
+        type=int,
+        default=1024,
+        help="distinct system prefixes remembered for cached-token reporting",
+    )
+    args = parser.parse_args()
+    cfg = MockConfig(
+        latency_ms=args.latency_ms,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after_s=args.retry_after,
+        token_latency_ms=args.token_latency_ms,
+        seed=args.seed,
+        prefix_cache_size=args.prefix_cache_size,
+    )
+    logging.basicConfig(level=logging.INFO)
+    log.info("mock provider config: %s", json.dumps(cfg.__dict__))
+    uvicorn.run(create_app(cfg), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()